@@ -71,12 +71,26 @@ let overlayContainer = null;
 let isActive = false;
 let ws = null;
 let captureInterval = null;
+let captureFps = null; // 서버가 허용한 FPS (없으면 CONFIG.CAPTURE_FPS)
+let captureProfile = null; // 서버가 알려준 캡처 프로파일 (최대 크기, JPEG 품질, FPS)
+let lastResult = null; // 마지막 탐지 결과 (결과 사이 위치 외삽용)
+let lastResultAt = 0; // 마지막 결과 수신 시각 (performance.now(), ms)
+let interpolationFrame = null; // requestAnimationFrame ID
+let overlayVerbose = true; // 보간 프레임(60Hz)은 그리기 로그 생략
+let frameId = 0; // 보낸 프레임 번호 (결과에 그대로 돌아옴)
+let clockSamples = []; // 최근 ping 측정 [{offset, rtt}] (서버 시계 - 클라이언트 시계, 초)
+let clockSyncInterval = null;
 
 // 설정
 const CONFIG = {
   SERVER_URL: 'ws://localhost:8765/ws',
   CAPTURE_FPS: 5, // 초당 5프레임 (서버 부하 고려)
+  PRIORITY: 'live', // 서버 스케줄러 우선순위 (live | background)
   RECONNECT_DELAY: 3000, // 재연결 대기 시간
+  INTERPOLATE: true, // 결과 사이를 속도/가속도로 외삽해서 디스플레이 주기로 그리기
+  PREDICT_MAX_AHEAD: 0.5, // 캡처(없으면 결과 수신) 후 이 시간(초)까지만 외삽 (서버 config.PREDICT_MAX_AHEAD와 같게)
+  CLOCK_SYNC_INTERVAL: 5000, // 서버 시계 차이 측정(ping) 주기 (ms)
+  CLOCK_SYNC_SAMPLES: 8, // 최근 측정 중 왕복 시간이 가장 짧은 것을 사용
 };
 
 /**
@@ -162,12 +176,15 @@ function connectWebSocket() {
     return;
   }
 
-  console.log(`🔌 WebSocket 연결 시도: ${CONFIG.SERVER_URL}`);
+  // 우선순위와 원하는 FPS를 쿼리로 전달 (서버가 허용 FPS를 알려줌)
+  const url = `${CONFIG.SERVER_URL}?priority=${CONFIG.PRIORITY}&fps=${CONFIG.CAPTURE_FPS}`;
+  console.log(`🔌 WebSocket 연결 시도: ${url}`);
 
-  ws = new WebSocket(CONFIG.SERVER_URL);
+  ws = new WebSocket(url);
 
   ws.onopen = () => {
     logger.log('✅ WebSocket 연결 성공!');
+    startClockSync();
     startCapture();
   };
 
@@ -175,12 +192,34 @@ function connectWebSocket() {
     console.log('📦 WebSocket 메시지 수신:', event.data.substring(0, 100) + '...');
     try {
       const result = JSON.parse(event.data);
+
+      // 서버가 원하는 캡처 크기/품질/FPS (연결 직후, 부하가 바뀔 때마다)
+      if (result.type === 'profile') {
+        applyCaptureProfile(result);
+        return;
+      }
+
+      // 시계 차이 측정 응답
+      if (result.type === 'pong') {
+        onPong(result);
+        return;
+      }
+
       console.log('✅ JSON 파싱 성공:', {
         players: result.players ? result.players.length : 0,
         ball: !!result.ball,
         ball_owner: result.ball_owner ? result.ball_owner.player_id : null
       });
+      if (result.type === 'prediction' || result.error) {
+        return;
+      }
+      if (result.capture_ts != null) {
+        logLatency(result);
+      }
+      lastResult = result;
+      lastResultAt = performance.now();
       renderOverlay(result);
+      startInterpolation();
     } catch (error) {
       console.error('❌ JSON 파싱 실패:', error);
     }
@@ -193,6 +232,7 @@ function connectWebSocket() {
   ws.onclose = () => {
     logger.log('🔌 WebSocket 연결 종료');
     stopCapture();
+    stopClockSync();
 
     // 활성화 상태이면 재연결 시도
     if (isActive) {
@@ -202,6 +242,76 @@ function connectWebSocket() {
   };
 }
 
+/**
+ * 서버 시계 차이 측정 시작 (NTP 방식 ping, 이전 측정 결과를 실어 보내 서버 지연 집계에 사용)
+ */
+function startClockSync() {
+  stopClockSync();
+  const ping = () => {
+    if (!ws || ws.readyState !== WebSocket.OPEN) {
+      return;
+    }
+    const best = bestClockSample();
+    ws.send(JSON.stringify({
+      type: 'ping',
+      t0: Date.now() / 1000,
+      offset: best ? best.offset : null,
+      rtt: best ? best.rtt : null,
+    }));
+  };
+  ping();
+  clockSyncInterval = setInterval(ping, CONFIG.CLOCK_SYNC_INTERVAL);
+}
+
+/**
+ * 시계 차이 측정 중지
+ */
+function stopClockSync() {
+  if (clockSyncInterval) {
+    clearInterval(clockSyncInterval);
+    clockSyncInterval = null;
+  }
+}
+
+/**
+ * ping 응답 → 시계 차이/왕복 시간 측정값 추가
+ */
+function onPong(pong) {
+  const t3 = Date.now() / 1000;
+  const rtt = (t3 - pong.t0) - (pong.t2 - pong.t1);
+  const offset = ((pong.t1 - pong.t0) + (pong.t2 - t3)) / 2;
+  clockSamples.push({ offset, rtt });
+  if (clockSamples.length > CONFIG.CLOCK_SYNC_SAMPLES) {
+    clockSamples.shift();
+  }
+}
+
+/**
+ * 왕복 시간이 가장 짧은 측정값 (네트워크 지연 비대칭 영향이 가장 작음)
+ */
+function bestClockSample() {
+  if (clockSamples.length === 0) {
+    return null;
+  }
+  return clockSamples.reduce((best, sample) => (sample.rtt < best.rtt ? sample : best));
+}
+
+/**
+ * 결과의 캡처 → 수신 지연 구간 로그 (네트워크 / 서버 큐 대기 / 추론)
+ */
+function logLatency(result) {
+  const total = Date.now() / 1000 - result.capture_ts;
+  const server = result.send_ts - result.receive_ts;
+  const queue = result.start_ts - result.receive_ts;
+  const inference = result.end_ts - result.start_ts;
+  const network = total - server;
+  const ms = (seconds) => (seconds * 1000).toFixed(0);
+  console.log(
+    `⏱️ 프레임 #${result.frame_id} 지연 ${ms(total)}ms ` +
+    `(네트워크 ${ms(network)}, 큐 ${ms(queue)}, 추론 ${ms(inference)})`
+  );
+}
+
 /**
  * 프레임 캡처 시작
  */
@@ -211,8 +321,9 @@ function startCapture() {
     return;
   }
 
-  const intervalMs = 1000 / CONFIG.CAPTURE_FPS;
-  console.log(`📹 프레임 캡처 시작 (${CONFIG.CAPTURE_FPS} FPS)`);
+  const fps = captureFps || CONFIG.CAPTURE_FPS;
+  const intervalMs = 1000 / fps;
+  console.log(`📹 프레임 캡처 시작 (${fps} FPS)`);
 
   captureInterval = setInterval(() => {
     if (!videoElement || videoElement.paused) {
@@ -223,6 +334,57 @@ function startCapture() {
   }, intervalMs);
 }
 
+/**
+ * 서버가 허용한 FPS 적용 (과부하 시 서버가 낮춤)
+ */
+function applyGrantedFps(grantedFps) {
+  const fps = Math.min(grantedFps, CONFIG.CAPTURE_FPS);
+  if (fps === captureFps) {
+    return;
+  }
+
+  logger.log(`⚠️ 서버 허용 FPS: ${grantedFps} (캡처 ${fps} FPS로 조정)`);
+  captureFps = fps;
+
+  // 캡처 중이면 새 간격으로 재시작 (0이면 서버가 여유 생길 때까지 대기)
+  if (captureInterval) {
+    stopCapture();
+  }
+  if (fps > 0) {
+    startCapture();
+  }
+}
+
+/**
+ * 서버 캡처 프로파일 적용 (다음 프레임부터 새 크기/품질, FPS는 즉시)
+ */
+function applyCaptureProfile(profile) {
+  captureProfile = profile;
+  logger.log(
+    `⚠️ 서버 캡처 프로파일: 최대 ${profile.max_width}x${profile.max_height}, ` +
+    `품질 ${profile.jpeg_quality}, ${profile.fps} FPS${profile.loaded ? ' (서버 과부하)' : ''}`
+  );
+  applyGrantedFps(profile.fps);
+}
+
+/**
+ * 캡처 크기: 비디오 비율을 유지한 채 프로파일 최대 크기 안으로 축소 (확대하지 않음)
+ */
+function captureSize(videoWidth, videoHeight) {
+  if (!captureProfile) {
+    return { width: videoWidth, height: videoHeight };
+  }
+  const scale = Math.min(
+    1,
+    captureProfile.max_width / videoWidth,
+    captureProfile.max_height / videoHeight
+  );
+  return {
+    width: Math.round(videoWidth * scale),
+    height: Math.round(videoHeight * scale),
+  };
+}
+
 /**
  * 프레임 캡처 중지
  */
@@ -256,10 +418,11 @@ function setupCanvas() {
     return false;
   }
 
-  // Canvas 크기를 비디오 크기에 맞춤 (고해상도 유지)
+  // Canvas 크기를 비디오 비율에 맞춤 (서버 프로파일 최대 크기까지만)
   if (video.videoWidth > 0 && video.videoHeight > 0) {
-    canvas.width = video.videoWidth;
-    canvas.height = video.videoHeight;
+    const size = captureSize(video.videoWidth, video.videoHeight);
+    canvas.width = size.width;
+    canvas.height = size.height;
     logger.log(`✅ Canvas 크기 설정: ${canvas.width}x${canvas.height}`);
     return true;
   }
@@ -323,16 +486,19 @@ function captureAndSendFrame() {
       return;
     }
 
-    // Canvas 크기가 변경되었으면 재설정
-    if (canvas.width !== video.videoWidth || canvas.height !== video.videoHeight) {
+    // 비디오 크기나 서버 프로파일이 바뀌었으면 재설정
+    const size = captureSize(video.videoWidth, video.videoHeight);
+    if (canvas.width !== size.width || canvas.height !== size.height) {
       setupCanvas();
     }
 
     // 비디오 프레임을 Canvas에 그리기
+    const captureTs = Date.now() / 1000;
     ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
 
-    // JPEG로 인코딩 (품질 0.8)
-    const dataUrl = canvas.toDataURL('image/jpeg', 0.8);
+    // JPEG로 인코딩 (서버 프로파일 품질, 없으면 0.8)
+    const quality = captureProfile ? captureProfile.jpeg_quality / 100 : 0.8;
+    const dataUrl = canvas.toDataURL('image/jpeg', quality);
     const base64Data = dataUrl.split(',')[1];
 
     if (!base64Data || base64Data.length === 0) {
@@ -340,8 +506,9 @@ function captureAndSendFrame() {
       return;
     }
 
-    // WebSocket으로 전송
-    ws.send(base64Data);
+    // WebSocket으로 전송 (프레임 번호/캡처 시각은 결과에 그대로 돌아옴)
+    frameId += 1;
+    ws.send(JSON.stringify({ type: 'frame', frame_id: frameId, capture_ts: captureTs, image: base64Data }));
     console.log(`📤 프레임 전송 (크기: ${base64Data.length} chars, 해상도: ${canvas.width}x${canvas.height})`);
 
   } catch (error) {
@@ -350,11 +517,98 @@ function captureAndSendFrame() {
   }
 }
 
+/**
+ * 결과를 elapsed초 뒤로 외삽 (서버 motion.predict와 같은 계산)
+ * 선수는 등속, 공은 등가속도, 속도 단위는 추적 한 스텝(frame_interval초)
+ */
+function extrapolateResult(result, elapsed) {
+  if (!result.frame_interval) {
+    return result;
+  }
+  const steps = Math.min(elapsed, CONFIG.PREDICT_MAX_AHEAD) / result.frame_interval;
+  const [cameraX, cameraY] = result.camera_shift || [0, 0];
+  const shiftX = cameraX * steps;
+  const shiftY = cameraY * steps;
+
+  const players = (result.players || []).map((p) => ({
+    ...p,
+    x: p.x + (p.vx || 0) * steps + shiftX,
+    y: p.y + (p.vy || 0) * steps + shiftY,
+  }));
+
+  let ball = result.ball;
+  const state = result.ball_state;
+  if (ball && state) {
+    ball = {
+      ...ball,
+      x: state.x + state.vx * steps + 0.5 * state.ax * steps * steps + shiftX,
+      y: state.y + state.vy * steps + 0.5 * state.ay * steps * steps + shiftY,
+    };
+  } else if (ball) {
+    ball = { ...ball, x: ball.x + shiftX, y: ball.y + shiftY };
+  }
+
+  return { ...result, players, ball };
+}
+
+/**
+ * 결과 사이 보간 루프 시작 (디스플레이 주기마다 마지막 결과를 외삽해서 다시 그림)
+ */
+function startInterpolation() {
+  if (!CONFIG.INTERPOLATE || interpolationFrame !== null) {
+    return;
+  }
+
+  const tick = () => {
+    interpolationFrame = null;
+    if (!isActive || !lastResult) {
+      return;
+    }
+    // 캡처 시각을 알면 캡처 이후 전체 지연만큼 외삽 (현재 비디오 화면에 맞춤)
+    const elapsed = lastResult.capture_ts != null
+      ? Date.now() / 1000 - lastResult.capture_ts
+      : (performance.now() - lastResultAt) / 1000;
+    // 일시정지 중이거나 외삽 범위를 넘으면 마지막으로 그린 위치 유지 (새 결과가 오면 다시 시작)
+    if (videoElement && videoElement.paused) {
+      return;
+    }
+    if (elapsed > CONFIG.PREDICT_MAX_AHEAD) {
+      return;
+    }
+    if (lastResult.frame_interval && !lastResult.hud_paused) {
+      renderOverlay(extrapolateResult(lastResult, elapsed), false);
+    }
+    interpolationFrame = requestAnimationFrame(tick);
+  };
+  interpolationFrame = requestAnimationFrame(tick);
+}
+
+/**
+ * 보간 루프 중지
+ */
+function stopInterpolation() {
+  if (interpolationFrame !== null) {
+    cancelAnimationFrame(interpolationFrame);
+    interpolationFrame = null;
+  }
+  lastResult = null;
+}
+
+/**
+ * 오버레이 그리기 로그 (보간 프레임에서는 생략)
+ */
+function overlayLog(...args) {
+  if (overlayVerbose) {
+    console.log(...args);
+  }
+}
+
 /**
  * 탐지 결과를 오버레이로 렌더링
  */
-function renderOverlay(result) {
-  console.log('🎨 renderOverlay 호출됨');
+function renderOverlay(result, verbose = true) {
+  overlayVerbose = verbose;
+  overlayLog('🎨 renderOverlay 호출됨');
 
   if (!overlayContainer) {
     console.error('❌ overlayContainer가 없음!');
@@ -368,48 +622,54 @@ function renderOverlay(result) {
 
   // 기존 오버레이 지우기
   overlayContainer.innerHTML = '';
-  console.log('🧹 기존 오버레이 지움');
+  overlayLog('🧹 기존 오버레이 지움');
 
-  // 비디오 크기 가져오기
+  // 와이드 샷이 아니면 (클로즈업, 관중, 그래픽) HUD 일시정지
+  if (result.hud_paused) {
+    overlayLog(`⏸️ HUD 일시정지 (샷 유형: ${result.shot_type})`);
+    return;
+  }
+
+  // 결과 좌표는 캡처한 프레임(canvas) 기준 (프로파일에 따라 비디오보다 작을 수 있음)
   const videoRect = videoElement.getBoundingClientRect();
-  const videoWidth = videoElement.videoWidth;
-  const videoHeight = videoElement.videoHeight;
+  const videoWidth = canvas ? canvas.width : videoElement.videoWidth;
+  const videoHeight = canvas ? canvas.height : videoElement.videoHeight;
 
-  console.log('📐 비디오 크기:', {
+  overlayLog('📐 비디오 크기:', {
     displayWidth: videoRect.width,
     displayHeight: videoRect.height,
     videoWidth,
     videoHeight
   });
 
-  // 스케일 계산 (화면에 표시되는 크기 vs 실제 비디오 크기)
+  // 스케일 계산 (화면에 표시되는 크기 vs 캡처 크기)
   const scaleX = videoRect.width / videoWidth;
   const scaleY = videoRect.height / videoHeight;
 
   // 공 소유자 ID 미리 확인
   const ballOwnerId = result.ball_owner ? result.ball_owner.player_id : null;
-  console.log('⚽ 공 소유자 ID:', ballOwnerId);
+  overlayLog('⚽ 공 소유자 ID:', ballOwnerId);
 
   // 선수 그리기
   if (result.players && result.players.length > 0) {
-    console.log(`👥 선수 ${result.players.length}명 그리기 시작`);
+    overlayLog(`👥 선수 ${result.players.length}명 그리기 시작`);
     result.players.forEach((player, index) => {
       // 공 소유자는 노란색으로
       const hasBall = (player.id === ballOwnerId);
-      console.log(`  - 선수 #${index}: ID=${player.id}, team=${player.team}, hasBall=${hasBall}`);
+      overlayLog(`  - 선수 #${index}: ID=${player.id}, team=${player.team}, hasBall=${hasBall}`);
       drawPlayer(player, scaleX, scaleY, hasBall);
     });
-    console.log('✅ 선수 그리기 완료');
+    overlayLog('✅ 선수 그리기 완료');
   } else {
-    console.log('⚠️ 선수 탐지 없음');
+    overlayLog('⚠️ 선수 탐지 없음');
   }
 
   // 공 그리기
   if (result.ball) {
-    console.log('⚽ 공 그리기');
-    drawBall(result.ball, scaleX, scaleY);
+    overlayLog('⚽ 공 그리기');
+    drawBall(result.ball, scaleX, scaleY, result.ball_state && result.ball_state.predicted);
   } else {
-    console.log('⚠️ 공 탐지 없음');
+    overlayLog('⚠️ 공 탐지 없음');
   }
 }
 
@@ -422,7 +682,7 @@ function drawPlayer(player, scaleX, scaleY, hasBall = false) {
   const width = player.width * scaleX;
   const height = player.height * scaleY;
 
-  console.log(`    🎨 drawPlayer: x=${x.toFixed(1)}, y=${y.toFixed(1)}, w=${width.toFixed(1)}, h=${height.toFixed(1)}`);
+  overlayLog(`    🎨 drawPlayer: x=${x.toFixed(1)}, y=${y.toFixed(1)}, w=${width.toFixed(1)}, h=${height.toFixed(1)}`);
 
   // 팀 색상 (공 소유자는 노란색)
   let color;
@@ -432,7 +692,7 @@ function drawPlayer(player, scaleX, scaleY, hasBall = false) {
     color = player.team === 'home' ? '#FF0000' : '#0000FF'; // 빨강/파랑
   }
 
-  console.log(`    🎨 색상: ${color}`);
+  overlayLog(`    🎨 색상: ${color}`);
 
   // 바운딩 박스
   const rect = document.createElementNS('http://www.w3.org/2000/svg', 'rect');
@@ -443,10 +703,14 @@ function drawPlayer(player, scaleX, scaleY, hasBall = false) {
   rect.setAttribute('fill', 'none');
   rect.setAttribute('stroke', color);
   rect.setAttribute('stroke-width', '2');
-  rect.setAttribute('opacity', '0.8');
+  rect.setAttribute('opacity', player.predicted ? '0.5' : '0.8');
+  if (player.predicted) {
+    // 이번 프레임 탐지 없이 추적기가 예측한 위치 → 점선
+    rect.setAttribute('stroke-dasharray', '4 3');
+  }
 
   overlayContainer.appendChild(rect);
-  console.log(`    ✅ rect 추가됨, overlayContainer 자식 수: ${overlayContainer.children.length}`);
+  overlayLog(`    ✅ rect 추가됨, overlayContainer 자식 수: ${overlayContainer.children.length}`);
 
   // 라벨
   let label;
@@ -472,7 +736,7 @@ function drawPlayer(player, scaleX, scaleY, hasBall = false) {
 /**
  * 공 그리기
  */
-function drawBall(ball, scaleX, scaleY) {
+function drawBall(ball, scaleX, scaleY, predicted = false) {
   const cx = ball.x * scaleX;
   const cy = ball.y * scaleY;
   const radius = Math.max(ball.width, ball.height) * scaleX / 2;
@@ -484,6 +748,10 @@ function drawBall(ball, scaleX, scaleY) {
   circle.setAttribute('fill', 'none');
   circle.setAttribute('stroke', '#00FF00');
   circle.setAttribute('stroke-width', '3');
+  if (predicted) {
+    // 탐지 없이 칼만 예측으로 채운 위치 → 점선
+    circle.setAttribute('stroke-dasharray', '4 3');
+  }
 
   overlayContainer.appendChild(circle);
 
@@ -559,6 +827,8 @@ function onVideoPause() {
  */
 function onVideoSeeked() {
   console.log('⏩ 비디오 탐색');
+  // 탐색 전 결과는 외삽하지 않음
+  stopInterpolation();
   // 탐색 후에는 즉시 캡처
   if (isActive && ws && ws.readyState === WebSocket.OPEN) {
     captureAndSendFrame();
@@ -601,6 +871,7 @@ function deactivate() {
 
   stopCapture();
   stopVideoCapture();
+  stopInterpolation();
 
   if (ws) {
     ws.close();
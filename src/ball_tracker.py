@@ -0,0 +1,251 @@
+"""
+공 전용 칼만 추적기 (등가속도 모델)
+
+- 상태 [x, y, vx, vy, ax, ay] (원본 프레임 좌표, 프레임 단위)
+- 예측 위치 주변 게이트(마할라노비스 거리) 안의 후보만 연관
+  → 관중석/머리 같은 오탐은 게이트 밖이라 자동으로 무시
+- 새 트랙은 높은 신뢰도(BALL_TRACK_INIT_CONFIDENCE)로만 시작, 유지는 낮은 신뢰도로도 가능
+- 짧게 놓친 구간(BALL_TRACK_MAX_GAP 프레임)은 예측 위치로 채움
+- 예측 위치/불확실성(predict_ahead)으로 공 주변 ROI만 탐지할 수 있음
+- 상태 갱신(후처리 스테이지)과 ROI 예측(공 스테이지)은 다른 스레드 → 잠금으로 같은 시점 상태만 읽음
+"""
+
+import logging
+import threading
+import numpy as np
+from typing import Optional, Tuple
+
+from config import (
+    BALL_TRACK_INIT_CONFIDENCE,
+    BALL_TRACK_GATE,
+    BALL_TRACK_MAX_GAP,
+    BALL_TRACK_MIN_HITS,
+    BALL_TRACK_PROCESS_NOISE,
+    BALL_ROI_MIN_SIZE,
+    BALL_ROI_MAX_SIZE,
+)
+from models import BallDetection, BallState
+from preprocess import STRIDE
+
+logger = logging.getLogger(__name__)
+
+# 등가속도 전이 행렬 (dt = 1 프레임)
+_F = np.array([
+    [1, 0, 1, 0, 0.5, 0],
+    [0, 1, 0, 1, 0, 0.5],
+    [0, 0, 1, 0, 1, 0],
+    [0, 0, 0, 1, 0, 1],
+    [0, 0, 0, 0, 1, 0],
+    [0, 0, 0, 0, 0, 1],
+], dtype=np.float64)
+_H = np.eye(2, 6, dtype=np.float64)
+
+# 저크(가속도 변화) 노이즈 → 프로세스 노이즈 Q = G Gᵀ q²
+_G = np.array([
+    [1 / 6, 0], [0, 1 / 6], [0.5, 0], [0, 0.5], [1, 0], [0, 1],
+], dtype=np.float64)
+
+# 놓친 프레임마다 출력 신뢰도 감쇠
+CONFIDENCE_DECAY = 0.8
+
+
+class BallTracker:
+    """
+    공 하나를 추적 (프레임 순서대로 update 호출)
+
+    update / apply_camera_motion / reset은 한 스레드(후처리 스테이지)에서만 호출하고,
+    다른 스레드는 predict_ahead / search_window로 읽기만 함
+    """
+
+    def __init__(self):
+        self.q = _G @ _G.T * BALL_TRACK_PROCESS_NOISE ** 2
+        # mean/cov를 한 번에 바꾸고 읽기 위한 잠금 (update 안에서 reset을 부르므로 재진입 가능)
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """추적 초기화 (샷 전환, 오래 놓침)"""
+        with self._lock:
+            self.mean: Optional[np.ndarray] = None
+            self.cov: Optional[np.ndarray] = None
+            self.hits = 0
+            self.frames_since_seen = 0
+            self.last_size = (0.0, 0.0)
+            self.last_confidence = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.mean is not None
+
+    @property
+    def confirmed(self) -> bool:
+        return self.active and self.hits >= BALL_TRACK_MIN_HITS
+
+    @property
+    def uncertainty(self) -> float:
+        """위치 불확실성 (px, 위치 공분산 최대 고유값의 제곱근)"""
+        if self.cov is None:
+            return float("inf")
+        return float(np.sqrt(np.linalg.eigvalsh(self.cov[:2, :2]).max()))
+
+    def predict_ahead(self, steps: int = 1) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        steps 프레임 뒤 예측 (상태는 바꾸지 않음)
+
+        Returns:
+            (예측 위치 (x, y), 위치 불확실성 px) 또는 None (추적 중 아님)
+        """
+        with self._lock:  # 후처리 스테이지가 갱신 중이면 끝난 뒤의 상태
+            mean, cov = self.mean, self.cov
+        if mean is None:
+            return None
+        for _ in range(max(1, steps)):
+            mean = _F @ mean
+            cov = _F @ cov @ _F.T + self.q
+        return mean[:2], float(np.sqrt(np.linalg.eigvalsh(cov[:2, :2]).max()))
+
+    def search_window(
+        self, frame_w: int, frame_h: int, steps: int = 1
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        steps 프레임 뒤 예측 위치 주변 탐지 영역 (x1, y1, x2, y2), 원본 좌표
+
+        3σ + 여유 64px를 덮는 정사각형 (stride 배수, BALL_ROI_MIN_SIZE ~ BALL_ROI_MAX_SIZE)
+        프레임 경계에 닿으면 크기를 유지한 채 안쪽으로 밀어 넣음
+        """
+        prediction = self.predict_ahead(steps)
+        if prediction is None:
+            return None
+        (cx, cy), uncertainty = prediction
+
+        size = int(np.ceil((6 * uncertainty + 128) / STRIDE) * STRIDE)
+        size = min(max(size, BALL_ROI_MIN_SIZE), BALL_ROI_MAX_SIZE)
+        w, h = min(size, frame_w), min(size, frame_h)
+        x1 = int(min(max(cx - w / 2, 0), frame_w - w))
+        y1 = int(min(max(cy - h / 2, 0), frame_h - h))
+        return x1, y1, x1 + w, y1 + h
+
+    def apply_camera_motion(self, affine: np.ndarray):
+        """이전 → 현재 프레임 카메라 변환(2x3)을 상태에 적용"""
+        rotation, translation = affine[:, :2], affine[:, 2]
+        transform = np.kron(np.eye(3), rotation)  # 위치/속도/가속도 블록마다 회전
+        with self._lock:
+            if not self.active:
+                return
+            # 제자리 수정 대신 새 배열로 교체 (읽는 쪽이 절반만 변환된 상태를 보지 않음)
+            mean = transform @ self.mean
+            mean[0:2] += translation
+            self.mean = mean
+            self.cov = transform @ self.cov @ transform.T
+
+    def update(self, xyxy: np.ndarray, conf: np.ndarray) -> Optional[BallDetection]:
+        """
+        Args:
+            xyxy: 공 후보 박스 (N, 4), 원본 좌표
+            conf: 후보 신뢰도 (N,)
+
+        Returns:
+            출력할 공 (연관된 탐지 또는 짧은 공백 동안의 예측 위치) 또는 None
+        """
+        with self._lock:
+            return self._update(xyxy, conf)
+
+    def _update(self, xyxy: np.ndarray, conf: np.ndarray) -> Optional[BallDetection]:
+        centers = np.stack([(xyxy[:, 0] + xyxy[:, 2]) / 2, (xyxy[:, 1] + xyxy[:, 3]) / 2], axis=1)
+        sizes = np.stack([xyxy[:, 2] - xyxy[:, 0], xyxy[:, 3] - xyxy[:, 1]], axis=1)
+
+        matched = None
+        if self.active:
+            self._predict()
+            matched = self._gate(centers, sizes, conf)
+            if matched is None and not self.confirmed:
+                # 확정 전에 놓친 트랙은 오탐이었을 가능성이 큼
+                self.reset()
+
+        if matched is not None:
+            self._correct(centers[matched], sizes[matched])
+        elif not self.active:
+            self._start(centers, sizes, conf)
+            if not self.active:
+                return None
+            matched = int(np.argmax(conf))
+        else:
+            self.frames_since_seen += 1
+            if self.frames_since_seen > BALL_TRACK_MAX_GAP:
+                logger.info("공 추적 종료 (오래 놓침)")
+                self.reset()
+                return None
+
+        if matched is not None:
+            self.hits += 1
+            self.frames_since_seen = 0
+            self.last_size = tuple(map(float, sizes[matched]))
+            self.last_confidence = float(conf[matched])
+        elif not self.confirmed:
+            return None
+
+        return BallDetection(
+            x=float(self.mean[0]),
+            y=float(self.mean[1]),
+            width=self.last_size[0],
+            height=self.last_size[1],
+            confidence=self.last_confidence * CONFIDENCE_DECAY ** self.frames_since_seen,
+        )
+
+    def state(self) -> Optional[BallState]:
+        """결과에 담을 추적 상태 (위치/속도/가속도/불확실성)"""
+        if not self.active:
+            return None
+        x, y, vx, vy, ax, ay = map(float, self.mean)
+        return BallState(
+            x=x, y=y, vx=vx, vy=vy, ax=ax, ay=ay,
+            uncertainty=self.uncertainty,
+            predicted=self.frames_since_seen > 0,
+            frames_since_seen=self.frames_since_seen,
+        )
+
+    # ============ 칼만 필터 ============
+
+    def _measurement_noise(self, size: np.ndarray) -> np.ndarray:
+        std = max(2.0, 0.25 * float(max(size)))
+        return np.eye(2) * std ** 2
+
+    def _predict(self):
+        self.mean = _F @ self.mean
+        self.cov = _F @ self.cov @ _F.T + self.q
+
+    def _gate(self, centers: np.ndarray, sizes: np.ndarray, conf: np.ndarray) -> Optional[int]:
+        """게이트 안 후보 중 (신뢰도 x 가능도)가 가장 큰 후보 인덱스"""
+        if len(centers) == 0:
+            return None
+        best, best_score = None, 0.0
+        for i in range(len(centers)):
+            innovation = centers[i] - self.mean[:2]
+            s = _H @ self.cov @ _H.T + self._measurement_noise(sizes[i])
+            d2 = float(innovation @ np.linalg.solve(s, innovation))
+            if d2 > BALL_TRACK_GATE:
+                continue
+            score = float(conf[i]) * np.exp(-0.5 * d2)
+            if score > best_score:
+                best, best_score = i, score
+        return best
+
+    def _correct(self, center: np.ndarray, size: np.ndarray):
+        s = _H @ self.cov @ _H.T + self._measurement_noise(size)
+        gain = self.cov @ _H.T @ np.linalg.inv(s)
+        self.mean = self.mean + gain @ (center - self.mean[:2])
+        self.cov = (np.eye(6) - gain @ _H) @ self.cov
+
+    def _start(self, centers: np.ndarray, sizes: np.ndarray, conf: np.ndarray):
+        """가장 신뢰도 높은 후보가 시작 임계값 이상이면 새 트랙"""
+        if len(conf) == 0:
+            return
+        i = int(np.argmax(conf))
+        if conf[i] < BALL_TRACK_INIT_CONFIDENCE:
+            return
+
+        self.mean = np.array([centers[i][0], centers[i][1], 0, 0, 0, 0], dtype=np.float64)
+        self.cov = np.diag([0, 0, 30.0 ** 2, 30.0 ** 2, 10.0 ** 2, 10.0 ** 2])
+        self.cov[:2, :2] = self._measurement_noise(sizes[i])
+        self.hits = 0
+        self.frames_since_seen = 0
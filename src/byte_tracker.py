@@ -0,0 +1,268 @@
+"""
+ByteTrack 방식 선수 추적 (IoU + 칼만 필터만 사용, ReID 없음)
+
+- 모든 트랙의 칼만 상태를 (N, 8) 배열로 한 번에 예측/보정
+- IoU 비용 행렬을 NumPy로 한 번에 계산
+- 2단계 연관: 높은 신뢰도 탐지 → 남은 트랙과 낮은 신뢰도 탐지
+  (가려져서 신뢰도가 떨어진 선수도 트랙을 유지)
+
+프레임당 1ms 미만 (선수 20~30명 기준) → 상시 추적 가능
+"""
+
+import logging
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from typing import List, Optional, Tuple
+
+from models import PlayerDetection
+from tracker import BaseTracker, iou_matrix, warp_xyah_states
+from config import (
+    BYTETRACK_HIGH_THRESHOLD,
+    BYTETRACK_NEW_TRACK_THRESHOLD,
+    BYTETRACK_MATCH_IOU,
+    BYTETRACK_LOW_MATCH_IOU,
+    BYTETRACK_MAX_AGE,
+    BYTETRACK_MIN_HITS,
+    TRACK_PREDICT_MAX_FRAMES,
+)
+
+logger = logging.getLogger(__name__)
+
+# 칼만 필터 노이즈 (박스 높이에 비례, ByteTrack 기본값)
+STD_POSITION = 1.0 / 20
+STD_VELOCITY = 1.0 / 160
+
+# 상태 [cx, cy, a(너비/높이), h, vcx, vcy, va, vh], 등속 모델
+_F = np.eye(8, dtype=np.float64)
+_F[:4, 4:] = np.eye(4)
+_H = np.eye(4, 8, dtype=np.float64)
+
+
+def _xyxy_to_xyah(boxes: np.ndarray) -> np.ndarray:
+    w = boxes[:, 2] - boxes[:, 0]
+    h = np.maximum(boxes[:, 3] - boxes[:, 1], 1e-6)
+    return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w / h, h], axis=1)
+
+
+def _xyah_to_xyxy(xyah: np.ndarray) -> np.ndarray:
+    w = xyah[:, 2] * xyah[:, 3]
+    h = xyah[:, 3]
+    return np.stack(
+        [xyah[:, 0] - w / 2, xyah[:, 1] - h / 2, xyah[:, 0] + w / 2, xyah[:, 1] + h / 2], axis=1
+    )
+
+
+def _assign(iou: np.ndarray, min_iou: float) -> Tuple[np.ndarray, np.ndarray]:
+    """IoU 최대화 일대일 할당 (min_iou 미만 쌍은 제외) → (트랙 인덱스, 탐지 인덱스)"""
+    if iou.size == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    rows, cols = linear_sum_assignment(-iou)
+    keep = iou[rows, cols] >= min_iou
+    return rows[keep], cols[keep]
+
+
+class ByteTracker(BaseTracker):
+    """
+    ByteTrack 방식 추적기
+
+    트랙 상태는 리스트 대신 배열로 보관 (예측/보정/삭제를 한 번에 처리)
+    """
+
+    def __init__(
+        self,
+        high_threshold: float = BYTETRACK_HIGH_THRESHOLD,
+        new_track_threshold: float = BYTETRACK_NEW_TRACK_THRESHOLD,
+        match_iou: float = BYTETRACK_MATCH_IOU,
+        low_match_iou: float = BYTETRACK_LOW_MATCH_IOU,
+        max_age: int = BYTETRACK_MAX_AGE,
+        min_hits: int = BYTETRACK_MIN_HITS,
+    ):
+        """
+        Args:
+            high_threshold: 1단계 연관에 쓰는 탐지 신뢰도 (미만은 2단계에서만 사용)
+            new_track_threshold: 새 트랙을 만들 수 있는 최소 신뢰도
+            match_iou: 1단계 연관 최소 IoU
+            low_match_iou: 2단계(낮은 신뢰도) 연관 최소 IoU
+            max_age: 이 프레임 수 동안 갱신되지 않으면 트랙 삭제
+            min_hits: 이 횟수 이상 연관되어야 결과에 포함 (확정 트랙)
+        """
+        self.high_threshold = high_threshold
+        self.new_track_threshold = new_track_threshold
+        self.match_iou = match_iou
+        self.low_match_iou = low_match_iou
+        self.max_age = max_age
+        self.min_hits = min_hits
+
+        self.next_id = 1
+        self.reset()
+        logger.info("ByteTracker 초기화 완료")
+
+    def reset(self):
+        """트랙 초기화 (카메라 전환 시)"""
+        self.mean = np.zeros((0, 8), dtype=np.float64)
+        self.cov = np.zeros((0, 8, 8), dtype=np.float64)
+        self.ids = np.zeros(0, dtype=int)
+        self.hits = np.zeros(0, dtype=int)
+        self.time_since_update = np.zeros(0, dtype=int)
+        self.last_players: List[Optional[PlayerDetection]] = []  # 트랙별 마지막 연관 선수 정보
+        self.frames_since_reset = 0
+
+    def apply_camera_motion(self, affine: np.ndarray):
+        """모든 트랙의 칼만 상태를 현재 프레임 좌표로 이동"""
+        warp_xyah_states(self.mean, self.cov, affine)
+
+    def get_track_count(self) -> int:
+        """현재 확정된 트랙 수"""
+        return int((self.hits >= self.min_hits).sum())
+
+    def update(
+        self,
+        players: List[PlayerDetection],
+        frame: np.ndarray,
+    ) -> List[PlayerDetection]:
+        """
+        Args:
+            players: 이번 프레임 탐지 결과
+            frame: 원본 프레임 (사용하지 않음, 인터페이스 호환용)
+
+        Returns:
+            확정 트랙 (id = 트랙 ID, 박스 = 칼만 보정 위치, vx/vy = 칼만 속도)
+            탐지와 연관되지 않은 트랙은 TRACK_PREDICT_MAX_FRAMES 동안 predicted=True로 포함
+        """
+        self.frames_since_reset += 1
+        boxes = np.array(
+            [[p.x - p.width / 2, p.y - p.height / 2, p.x + p.width / 2, p.y + p.height / 2] for p in players],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+        scores = np.array([p.confidence for p in players], dtype=np.float64)
+
+        self._predict()
+        track_boxes = _xyah_to_xyxy(self.mean[:, :4])
+        n_tracks = len(self.ids)
+
+        # 연관 결과: 트랙 인덱스 → 탐지 인덱스
+        det_for_track = np.full(n_tracks, -1, dtype=int)
+        det_used = np.zeros(len(players), dtype=bool)
+
+        # 1단계: 모든 트랙 ↔ 높은 신뢰도 탐지
+        high = np.flatnonzero(scores >= self.high_threshold)
+        rows, cols = _assign(iou_matrix(track_boxes, boxes[high]), self.match_iou)
+        det_for_track[rows] = high[cols]
+        det_used[high[cols]] = True
+
+        # 2단계: 직전 프레임까지 보이던 남은 트랙 ↔ 낮은 신뢰도 탐지
+        remaining = np.flatnonzero((det_for_track < 0) & (self.time_since_update <= 1))
+        low = np.flatnonzero(scores < self.high_threshold)
+        rows, cols = _assign(iou_matrix(track_boxes[remaining], boxes[low]), self.low_match_iou)
+        det_for_track[remaining[rows]] = low[cols]
+        det_used[low[cols]] = True
+
+        matched = np.flatnonzero(det_for_track >= 0)
+        self._correct(matched, _xyxy_to_xyah(boxes[det_for_track[matched]]))
+        self.hits[matched] += 1
+        self.time_since_update[matched] = 0
+
+        # 오래 안 보인 트랙, 한 번도 확정되지 못하고 놓친 트랙 삭제
+        lost = det_for_track < 0
+        keep = ~(
+            (self.time_since_update > self.max_age)
+            | (lost & (self.hits < self.min_hits))
+        )
+        det_for_track = det_for_track[keep]
+        self._keep(keep)
+
+        # 연관되지 않은 높은 신뢰도 탐지로 새 트랙
+        new = np.flatnonzero(~det_used & (scores >= self.new_track_threshold))
+        self._start(_xyxy_to_xyah(boxes[new]))
+        det_for_track = np.concatenate([det_for_track, new])
+
+        # 리셋 직후 첫 프레임은 바로 확정 (첫 화면부터 ID 표시)
+        if self.frames_since_reset == 1:
+            self.hits[:] = np.maximum(self.hits, self.min_hits)
+
+        for t in np.flatnonzero(det_for_track >= 0):
+            self.last_players[t] = players[det_for_track[t]]
+
+        out_boxes = _xyah_to_xyxy(self.mean[:, :4])
+        visible = (det_for_track >= 0) | (self.time_since_update <= TRACK_PREDICT_MAX_FRAMES)
+        tracked_players = []
+        for t in np.flatnonzero(visible & (self.hits >= self.min_hits)):
+            x1, y1, x2, y2 = map(float, out_boxes[t])
+            tracked_players.append(
+                self.last_players[t].model_copy(update={
+                    "id": int(self.ids[t]),
+                    "x": (x1 + x2) / 2,
+                    "y": (y1 + y2) / 2,
+                    "width": x2 - x1,
+                    "height": y2 - y1,
+                    "predicted": bool(det_for_track[t] < 0),
+                    "vx": float(self.mean[t, 4]),
+                    "vy": float(self.mean[t, 5]),
+                })
+            )
+
+        return tracked_players
+
+    # ============ 칼만 필터 (모든 트랙 일괄 처리) ============
+
+    def _predict(self):
+        h = self.mean[:, 3]
+        std = np.stack(
+            [STD_POSITION * h, STD_POSITION * h, np.full_like(h, 1e-2), STD_POSITION * h,
+             STD_VELOCITY * h, STD_VELOCITY * h, np.full_like(h, 1e-5), STD_VELOCITY * h],
+            axis=1,
+        )
+        self.mean = self.mean @ _F.T
+        self.cov = _F @ self.cov @ _F.T
+        self.cov[:, np.arange(8), np.arange(8)] += std ** 2
+        self.time_since_update += 1
+
+    def _correct(self, idx: np.ndarray, measurement: np.ndarray):
+        if len(idx) == 0:
+            return
+        mean, cov = self.mean[idx], self.cov[idx]
+        h = mean[:, 3]
+        std = np.stack(
+            [STD_POSITION * h, STD_POSITION * h, np.full_like(h, 1e-1), STD_POSITION * h], axis=1
+        )
+
+        projected_cov = _H @ cov @ _H.T
+        projected_cov[:, np.arange(4), np.arange(4)] += std ** 2
+        cov_ht = cov @ _H.T  # (M, 8, 4)
+        # K = P Hᵀ S⁻¹ (S는 대칭이므로 Sᵀ Kᵀ = H P 를 풀어서 계산)
+        gain = np.linalg.solve(projected_cov, cov_ht.transpose(0, 2, 1)).transpose(0, 2, 1)
+
+        innovation = measurement - mean[:, :4]
+        self.mean[idx] = mean + np.einsum("mij,mj->mi", gain, innovation)
+        self.cov[idx] = cov - gain @ projected_cov @ gain.transpose(0, 2, 1)
+
+    def _start(self, xyah: np.ndarray):
+        n = len(xyah)
+        if n == 0:
+            return
+        mean = np.zeros((n, 8), dtype=np.float64)
+        mean[:, :4] = xyah
+        h = xyah[:, 3]
+        std = np.stack(
+            [2 * STD_POSITION * h, 2 * STD_POSITION * h, np.full_like(h, 1e-2), 2 * STD_POSITION * h,
+             10 * STD_VELOCITY * h, 10 * STD_VELOCITY * h, np.full_like(h, 1e-5), 10 * STD_VELOCITY * h],
+            axis=1,
+        )
+        cov = np.zeros((n, 8, 8), dtype=np.float64)
+        cov[:, np.arange(8), np.arange(8)] = std ** 2
+
+        self.mean = np.concatenate([self.mean, mean])
+        self.cov = np.concatenate([self.cov, cov])
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + n)])
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=int)])
+        self.time_since_update = np.concatenate([self.time_since_update, np.zeros(n, dtype=int)])
+        self.last_players.extend([None] * n)
+        self.next_id += n
+
+    def _keep(self, mask: np.ndarray):
+        self.mean = self.mean[mask]
+        self.cov = self.cov[mask]
+        self.ids = self.ids[mask]
+        self.hits = self.hits[mask]
+        self.time_since_update = self.time_since_update[mask]
+        self.last_players = [p for p, keep in zip(self.last_players, mask) if keep]
@@ -0,0 +1,110 @@
+"""
+전역 카메라 움직임 추정
+연속 프레임 사이의 아핀 변환(회전 + 균일 스케일 + 이동)을 축소 그레이 프레임의 희소 특징점으로 계산
+
+- 선수 박스 안의 점은 제외 (선수 움직임이 아니라 배경 = 카메라 움직임만)
+- 추적기는 이 변환으로 예측 상태를 현재 프레임 좌표로 옮긴 뒤 연관
+  → 패닝 중에도 IoU 연관이 유지되어 ReID 대체 경로가 덜 필요함
+"""
+
+import logging
+import numpy as np
+import cv2
+from typing import Optional
+
+from config import CAMERA_MOTION_MAX_POINTS, CAMERA_MOTION_MIN_INLIERS
+
+logger = logging.getLogger(__name__)
+
+LK_PARAMS = dict(
+    winSize=(21, 21),
+    maxLevel=3,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+)
+
+# 박스 주변까지 제외 (그림자, 박스 오차)
+BOX_MARGIN = 0.1
+
+
+class CameraMotionEstimator:
+    """
+    프레임 순서대로 update()를 호출하면 이전 프레임 → 현재 프레임 변환을 반환
+
+    변환은 원본 프레임 좌표 기준 2x3 아핀 행렬 (x' = A @ [x, y, 1])
+    """
+
+    def __init__(
+        self,
+        max_points: int = CAMERA_MOTION_MAX_POINTS,
+        min_inliers: int = CAMERA_MOTION_MIN_INLIERS,
+    ):
+        self.max_points = max_points
+        self.min_inliers = min_inliers
+
+        self.prev_gray: Optional[np.ndarray] = None
+        self.prev_boxes = np.zeros((0, 4), dtype=np.float32)
+
+        # 마지막 추정 결과 (디버깅/통계용)
+        self.last_affine: Optional[np.ndarray] = None
+        self.last_inliers = 0
+
+    def update(self, gray: np.ndarray, scale: float, boxes: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Args:
+            gray: 현재 축소 그레이 프레임 (keyframe.prepare_flow_frame)
+            scale: 축소 비율
+            boxes: 현재 프레임 선수 박스 (N, 4) xyxy, 원본 좌표 (다음 프레임 추정 때 제외 영역)
+
+        Returns:
+            원본 좌표 2x3 아핀 행렬 또는 None (첫 프레임, 특징점 부족, 추정 실패)
+        """
+        affine = None
+        if self.prev_gray is not None and self.prev_gray.shape == gray.shape:
+            affine = self._estimate(self.prev_gray, gray, self.prev_boxes, scale)
+
+        self.prev_gray = gray
+        self.prev_boxes = boxes.reshape(-1, 4).astype(np.float32)
+        self.last_affine = affine
+        return affine
+
+    def reset(self):
+        """샷 전환 시 (이전 프레임과 연속이 아님)"""
+        self.prev_gray = None
+        self.prev_boxes = np.zeros((0, 4), dtype=np.float32)
+        self.last_affine = None
+
+    def _estimate(
+        self, prev: np.ndarray, gray: np.ndarray, boxes: np.ndarray, scale: float
+    ) -> Optional[np.ndarray]:
+        mask = np.full(prev.shape, 255, dtype=np.uint8)
+        if len(boxes):
+            w = boxes[:, 2] - boxes[:, 0]
+            h = boxes[:, 3] - boxes[:, 1]
+            padded = np.stack(
+                [boxes[:, 0] - w * BOX_MARGIN, boxes[:, 1] - h * BOX_MARGIN,
+                 boxes[:, 2] + w * BOX_MARGIN, boxes[:, 3] + h * BOX_MARGIN], axis=1
+            ) * scale
+            for x1, y1, x2, y2 in padded.astype(int):
+                mask[max(y1, 0):max(y2, 0), max(x1, 0):max(x2, 0)] = 0
+
+        points = cv2.goodFeaturesToTrack(
+            prev, maxCorners=self.max_points, qualityLevel=0.01, minDistance=8, mask=mask
+        )
+        if points is None or len(points) < self.min_inliers:
+            return None
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, points, None, **LK_PARAMS)
+        ok = status.ravel().astype(bool)
+        if ok.sum() < self.min_inliers:
+            return None
+
+        affine, inliers = cv2.estimateAffinePartial2D(
+            points[ok], next_points[ok], method=cv2.RANSAC, ransacReprojThreshold=1.0
+        )
+        self.last_inliers = int(inliers.sum()) if inliers is not None else 0
+        if affine is None or self.last_inliers < self.min_inliers:
+            return None
+
+        # 축소 좌표 → 원본 좌표 (회전/스케일은 그대로, 이동만 1/scale)
+        affine[:, 2] /= scale
+        return affine
@@ -0,0 +1,91 @@
+"""
+캡처 프로파일 협상
+서버가 필요한 만큼만 캡처하도록 클라이언트에 캡처 크기/JPEG 품질/FPS를 알림
+
+- 크기: 모델 입력 크기 x CAPTURE_SCALE (어차피 letterbox에서 버릴 픽셀은 인코딩/업로드하지 않음)
+- 과부하(모델 사용률 높음)면 모델 입력 크기 + 낮은 JPEG 품질로 디코딩/업로드 비용도 줄임
+- 켜진 고해상도 스테이지가 필요한 크기보다는 줄이지 않음
+  (슬라이스 공 탐지는 높이 BALL_SLICE_MIN_HEIGHT 이상 프레임에서만 동작)
+- FPS는 스케줄러가 허용한 값
+"""
+
+import logging
+from typing import Optional, Tuple
+
+from models import CaptureProfile
+from preprocess import letterbox_shape
+from config import (
+    INPUT_SIZE,
+    JPEG_QUALITY,
+    CAPTURE_SCALE,
+    CAPTURE_LOADED_SCALE,
+    CAPTURE_LOADED_JPEG_QUALITY,
+    CAPTURE_LOADED_UTILIZATION,
+    CAPTURE_RELEASE_UTILIZATION,
+    BALL_SLICE_SEARCH,
+    BALL_SLICE_MIN_HEIGHT,
+)
+
+logger = logging.getLogger(__name__)
+
+# 입력 크기를 모를 때 기준 (16:9 방송 화면 → 384x640)
+DEFAULT_INPUT_SHAPE = letterbox_shape(1920, 1080, INPUT_SIZE)
+
+
+def min_capture_height(slice_search: bool = BALL_SLICE_SEARCH) -> int:
+    """켜진 고해상도 스테이지가 동작하는 최소 캡처 높이 (0이면 제한 없음)"""
+    return BALL_SLICE_MIN_HEIGHT if slice_search else 0
+
+
+def capture_profile(
+    fps: float,
+    loaded: bool = False,
+    input_shape: Tuple[int, int] = DEFAULT_INPUT_SHAPE,
+    min_height: Optional[int] = None,
+) -> CaptureProfile:
+    """
+    Args:
+        fps: 허용 FPS
+        loaded: 서버 과부하 여부
+        input_shape: 모델 입력 크기 (h, w)
+        min_height: 최소 캡처 높이 (None이면 설정된 고해상도 스테이지 기준)
+    """
+    if min_height is None:
+        min_height = min_capture_height()
+    h, w = input_shape
+    # 배율은 유지하되 고해상도 스테이지가 필요한 높이까지는 키움 (비율 유지)
+    scale = max(CAPTURE_LOADED_SCALE if loaded else CAPTURE_SCALE, min_height / h)
+    return CaptureProfile(
+        max_width=int(round(w * scale)),
+        max_height=int(round(h * scale)),
+        jpeg_quality=CAPTURE_LOADED_JPEG_QUALITY if loaded else JPEG_QUALITY,
+        fps=fps,
+        loaded=loaded,
+    )
+
+
+class LoadLevel:
+    """
+    모델 사용률 → 과부하 여부 (히스테리시스)
+
+    CAPTURE_LOADED_UTILIZATION 이상이면 과부하, CAPTURE_RELEASE_UTILIZATION 아래로 내려가야 해제
+    → 경계 근처에서 프로파일이 계속 바뀌지 않음
+    """
+
+    def __init__(
+        self,
+        high: float = CAPTURE_LOADED_UTILIZATION,
+        low: float = CAPTURE_RELEASE_UTILIZATION,
+    ):
+        self.high = high
+        self.low = low
+        self.loaded = False
+
+    def update(self, utilization: float) -> bool:
+        """사용률 반영 → 과부하 여부가 바뀌었으면 True"""
+        loaded = utilization >= self.high if not self.loaded else utilization >= self.low
+        changed = loaded != self.loaded
+        if changed:
+            logger.info(f"캡처 프로파일: {'과부하' if loaded else '기본'} (모델 사용률 {utilization:.2f})")
+        self.loaded = loaded
+        return changed
@@ -17,22 +17,190 @@ CONFIDENCE_THRESHOLD = 0.25  # 탐지 신뢰도 임계값 (선수용) - 낮춰
 BALL_CONFIDENCE_THRESHOLD = 0.15  # 공 탐지 전용 임계값 (더 낮게)
 IOU_THRESHOLD = 0.4  # NMS IoU 임계값
 
+# 탐지기 캐스케이드 (nano를 먼저 실행하고 결과가 불확실할 때만 MODEL_PATH(small)로 다시 실행)
+CASCADE_MODE = False
+CASCADE_NANO_MODEL_PATH = PROJECT_ROOT / "yolov8n.pt"
+CASCADE_PLAYER_DROP = 0.3  # 최근 평균 대비 선수 수가 이 비율 이상 줄면 승격
+CASCADE_LOW_CONFIDENCE = 0.4  # 이 신뢰도 미만 선수 박스를 불확실한 박스로 봄
+CASCADE_LOW_RATIO = 0.5  # 불확실한 박스 비율이 이보다 크면 승격
+CASCADE_MIN_BOXES = 4  # 박스가 이보다 적으면 비율 판단 안 함
+
 # CoreML 설정 (Mac M-series)
 USE_COREML = False  # PyTorch로 테스트 (CoreML 추론 불안정 문제)
 COREML_MODEL_PATH = PROJECT_ROOT / "yolov8s.mlpackage"
+# 입력 크기가 고정인 내보낸 모델은 letterbox 크기별로 따로 내보냄 (h, w)
+# 16:9 방송 화면은 384x640 → 정사각형 640x640 대비 패딩 연산 약 40% 감소
+# 파일 이름: yolov8s_384x640.mlpackage (640x640은 COREML_MODEL_PATH)
+EXPORT_SHAPES = [(384, 640), (640, 640)]
 
 # 서버 설정
 HOST = "localhost"
 PORT = 8765
 CORS_ORIGINS = ["*"]  # 개발 중에는 모든 origin 허용
 
+# 수평 확장 설정 (gateway.py + node.py)
+NODE_HOST = "localhost"
+NODE_PORT = 9001  # 추론 노드 기본 포트
+# 게이트웨이가 연결할 추론 노드 목록 ("host:port,host:port" 환경변수로 덮어쓰기 가능)
+NODE_ADDRESSES = [
+    (addr.rsplit(":", 1)[0], int(addr.rsplit(":", 1)[1]))
+    for addr in (a.strip() for a in os.environ.get("SOCCERHUD_NODES", f"{NODE_HOST}:{NODE_PORT}").split(","))
+    if addr
+]
+NODE_LOAD_POLL_INTERVAL = 2.0  # 노드 부하 조회 주기 (초)
+NODE_REQUEST_TIMEOUT = 3.0  # 부하 조회/명단 요청 응답 제한 (초, 넘기면 노드를 끊고 세션 재배정)
+LOAD_REPORT_WINDOW = 2.0  # 노드 사용률 계산 윈도우 (초)
+
+# 전역 프레임 스케줄러 (admission control)
+NODE_FRAME_BUDGET_FPS = 40  # 노드 하나가 처리 가능한 전체 FPS (게이트웨이는 노드 수만큼 곱함)
+SCHEDULER_PRIORITIES = ["live", "background"]  # 앞쪽이 높은 우선순위
+SCHEDULER_QUEUE_SIZE = 2  # 세션별 대기 프레임 수 (넘치면 오래된 프레임 폐기)
+SCHEDULER_BURST = 4  # 토큰 버킷 버스트 크기
+SCHEDULER_MAX_IN_FLIGHT = 3  # 노드당 동시 처리 프레임 수 (게이트웨이는 노드 수만큼 곱함)
+SCHEDULER_SESSION_IN_FLIGHT = 2  # 세션당 동시 처리 프레임 수 (스테이지 파이프라인 겹침용)
+
+# 스테이지 파이프라인 (decode → person → ball → post)
+STAGE_QUEUE_SIZE = 2  # 스테이지 사이 큐 크기 (SCHEDULER_SESSION_IN_FLIGHT 이상이어야 제출이 거절되지 않음)
+DEBUG_SAVE_FRAMES = False  # True면 세션 처음 3프레임을 debug_frames/에 저장 (디코딩 스테이지 디스크 I/O)
+
 # 프레임 처리 설정
 TARGET_FPS = 30
 JPEG_QUALITY = 70  # 프레임 압축 품질
 
+# 캡처 프로파일 (서버가 클라이언트에 캡처 크기/JPEG 품질/FPS를 알림, 부하가 바뀌면 다시 알림)
+CAPTURE_SCALE = 2  # 최대 캡처 크기 = 모델 입력 크기 x 배율 (공 ROI는 원본 해상도로 탐지, 슬라이스 탐지가 켜지면 높이 BALL_SLICE_MIN_HEIGHT까지 키움)
+CAPTURE_LOADED_SCALE = 1  # 과부하 시 모델 입력 크기만 (축소될 픽셀은 보내지 않음, 슬라이스 탐지 최소 높이는 유지)
+CAPTURE_LOADED_JPEG_QUALITY = 50  # 과부하 시 JPEG 품질 (업로드/디코딩 감소)
+CAPTURE_LOADED_UTILIZATION = 0.85  # 모델 사용률이 이 이상이면 과부하 프로파일
+CAPTURE_RELEASE_UTILIZATION = 0.6  # 이 아래로 내려가야 기본 프로파일로 복귀 (히스테리시스)
+CAPTURE_PROFILE_INTERVAL = 5.0  # 부하 확인 주기 (초)
+
+# 적응형 품질 (프레임 지연이 목표를 계속 넘으면 더 싼 설정 단계로, 여유가 생기면 복귀)
+# 단계: 작은 입력 → 공 패스 격프레임 → 키프레임 전파 → ReID 끄기 → nano 모델 (누적 적용)
+QUALITY_ADAPTIVE = False  # 기본은 끔 (켜면 nano 단계용 모델 yolov8n.pt를 추가로 로드)
+QUALITY_TARGET_LATENCY = 2.0 / TARGET_FPS  # 목표 프레임 지연 (초, 스테이지가 겹치므로 프레임 간격 2배)
+QUALITY_WINDOW = 15  # 지연 이동 평균 프레임 수 (단계가 바뀌면 다시 채움)
+QUALITY_DOWN_FRAMES = 10  # 평균이 목표를 이만큼 연속 넘으면 한 단계 낮춤
+QUALITY_UP_FRAMES = 90  # 평균이 목표 x QUALITY_UP_RATIO 아래로 이만큼 연속이면 한 단계 복귀
+QUALITY_UP_RATIO = 0.6
+QUALITY_INPUT_SIZE = 480  # 1단계 입력 긴 변 (16:9 → 288x480)
+
+# 프레임별 마감 시간 (남은 시간이 선택 스테이지 예상 비용보다 적으면 생략)
+# 필수: 디코딩, 선수 탐지, 추적 / 선택: 공 패스, 팀 색상 분류, ReID, 명단 매칭
+DEADLINE_SCHEDULING = False  # 기본은 끔 (느린 CPU 노드에서는 선택 스테이지가 대부분 생략됨)
+FRAME_DEADLINE = 0.06  # 서버 수신(스케줄러 큐 대기 포함) 후 결과까지 허용 시간 (초)
+DEADLINE_MAX_SKIP = 10  # 선택 스테이지를 연속으로 이만큼 생략하면 한 번은 실행 (소요 시간 재측정)
+
+# 지연 추적 (프레임 ID/캡처 시각을 결과에 돌려주고 구간별 지연 집계)
+LATENCY_WINDOW = 300  # 구간별 최근 샘플 수 (평균/백분위 계산)
+
+# 정지/중복 프레임 생략 (일시정지, 버퍼링 중 같은 프레임 → 이전 결과 재사용)
+FRAME_DEDUP = True
+FRAME_DEDUP_DIFF = 6  # 64x36 그레이 썸네일의 최대 픽셀 차이가 이 이하면 같은 프레임 (작은 공 이동도 감지)
+FRAME_DEDUP_MAX_SKIP = 30  # 연속 생략이 이만큼 쌓이면 한 번은 처리
+
+# 축소 JPEG 디코딩 (DCT 단계에서 1/2, 1/4로 디코딩, 긴 변이 INPUT_SIZE 아래로는 줄이지 않음)
+# 공 ROI/슬라이스 탐지, DeepSORT ReID처럼 원본 해상도가 필요한 프레임만 전체 디코딩
+REDUCED_DECODE = True
+
+# 키프레임 모드 (K 프레임마다 YOLO, 사이 프레임은 광학 흐름으로 박스 전파)
+KEYFRAME_MODE = False
+KEYFRAME_MIN_INTERVAL = 2  # 움직임이 클 때 K
+KEYFRAME_MAX_INTERVAL = 5  # 움직임이 작을 때 K
+KEYFRAME_MOTION_LOW = 2.0  # 이보다 작으면 MAX_INTERVAL (원본 px/frame)
+KEYFRAME_MOTION_HIGH = 12.0  # 이보다 크면 MIN_INTERVAL
+KEYFRAME_FLOW_WIDTH = 480  # 광학 흐름 계산용 축소 너비
+KEYFRAME_MIN_VALID_RATIO = 0.5  # 흐름 추적 성공 박스 비율이 이보다 낮으면 즉시 탐지
+KEYFRAME_MIN_CONFIDENCE = 0.2  # 전파 박스 평균 신뢰도가 이보다 낮으면 다음 프레임 탐지
+KEYFRAME_CONF_DECAY = 0.9  # 전파 1프레임당 신뢰도 감쇠
+
+# 샷 경계(카메라 전환) 감지 → 트랙 리셋, 팀 색상 재학습, 키프레임 강제
+SHOT_THUMBNAIL_SIZE = (64, 36)  # 히스토그램 계산용 썸네일 (w, h)
+SHOT_HIST_THRESHOLD = 0.35  # HSV 히스토그램 Bhattacharyya 거리 최소 임계값
+SHOT_DIFF_THRESHOLD = 12.0  # 썸네일 밝기 평균 절대 차이 최소값 (0~255)
+SHOT_ADAPTIVE_K = 4.0  # 최근 거리 평균 + k·표준편차보다 커야 컷
+SHOT_MIN_LENGTH = 5  # 컷 직후 이 프레임 수 동안은 다시 컷으로 보지 않음 (디졸브 중복 방지)
+
+# 샷 유형 분류 (와이드 샷이 아니면 HUD 일시정지 → 추론/색상/추적 생략)
+SHOT_CLASSIFIER = True
+SHOT_PAUSE_NON_WIDE = True  # False면 분류만 하고 결과에 표시
+SHOT_CLOSE_OCCLUSION = 0.3  # 피치 영역 중 잔디가 아닌 비율이 이보다 크면 클로즈업 (선수가 화면을 가림)
+SHOT_CLASSIFIER_MODEL_PATH = PROJECT_ROOT / "shot_classifier.onnx"  # 있으면 썸네일 CNN으로 와이드/클로즈업 판단
+
+# 공 추적 (등가속도 칼만 필터, ball_tracker.py)
+BALL_TRACKING = True
+BALL_TRACK_INIT_CONFIDENCE = 0.35  # 새 공 트랙 시작 최소 신뢰도 (유지는 BALL_CONFIDENCE_THRESHOLD)
+BALL_TRACK_GATE = 9.21  # 연관 게이트 (마할라노비스 거리², 카이제곱 2자유도 99%)
+BALL_TRACK_MAX_GAP = 10  # 이 프레임 수까지는 놓쳐도 예측 위치로 표시
+BALL_TRACK_MIN_HITS = 2  # 이 횟수 이상 연관되어야 확정 (확정 전에 놓치면 버림)
+BALL_TRACK_PROCESS_NOISE = 4.0  # 저크 노이즈 (px/frame³)
+
+# 공 ROI 탐지 (예측 위치 주변을 원본 해상도로 잘라서 공 탐지)
+BALL_ROI_SEARCH = True
+BALL_ROI_MIN_SIZE = 256  # ROI 최소 크기 (원본 px, 32 배수)
+BALL_ROI_MAX_SIZE = 640  # ROI 최대 크기 (불확실성이 커지면 넓힘)
+BALL_ROI_MAX_LOST = 5  # 이 프레임 수 이상 놓치면 전체 프레임 탐지로 복귀
+BALL_ROI_MAX_STEPS = 4  # 공 추적기가 이보다 많은 프레임 뒤처지면(일시정지 등) 전체 프레임 탐지
+BALL_ROI_CONFIDENCE = 0.25  # 원본 해상도라 공이 크게 보이므로 전체 프레임보다 높은 임계값
+
+# 공 슬라이스 탐지 (공 예측이 없을 때 고해상도 프레임을 겹치는 타일로 나눠 배치 추론)
+BALL_SLICE_SEARCH = False  # 타일 수만큼 추론량이 늘어나므로 GPU 노드에서만 권장
+BALL_SLICE_SIZE = 640  # 타일 크기 (원본 px, 32 배수, 축소 없이 모델 입력)
+BALL_SLICE_OVERLAP = 0.2  # 인접 타일 겹침 비율 (경계에 걸친 공도 한 타일에 온전히 포함)
+BALL_SLICE_MIN_HEIGHT = 900  # 이보다 작은 프레임은 전체 프레임 탐지로 충분
+BALL_SLICE_MIN_PITCH = 0.05  # 잔디 비율이 이보다 낮은 타일(관중석, 광고판)은 건너뜀
+
+# 피치(잔디) 영역 마스크 (HSV 색 범위)
+PITCH_MASK_WIDTH = 160  # 마스크 계산용 축소 프레임 너비
+PITCH_HSV_LOWER = (35, 40, 40)  # 잔디 색 하한 (H 0~180, S, V)
+PITCH_HSV_UPPER = (85, 255, 255)  # 잔디 색 상한
+PITCH_MIN_COVERAGE = 0.25  # 프레임 잔디 비율이 이보다 낮으면(클로즈업) 크롭/필터하지 않음
+
+# 피치 영역 크롭 (letterbox 전에 관중석/하늘/스코어보드를 잘라내서 입력 해상도를 선수/공에 집중)
+PITCH_CROP = True
+PITCH_CROP_LINE_RATIO = 0.15  # 행/열의 잔디 비율이 이 이상이면 피치 영역
+PITCH_CROP_MARGIN = 0.08  # 피치 위쪽 여유 (프레임 높이 비율, 터치라인 근처 선수 머리/뜬 공)
+PITCH_CROP_REFRESH = 15  # 같은 샷에서도 이 프레임마다 다시 계산 (패닝 반영)
+PITCH_CROP_MOTION = 0.03  # 마지막 계산 이후 누적 카메라 이동이 프레임 너비의 이 비율을 넘으면 바로 다시 계산
+
+# 피치 밖 탐지 제거 (발 위치가 피치 밖인 관중/볼보이/벤치 → 색상/추적/임베딩 전에 제외)
+PITCH_FILTER = True
+
 # 공 소유자 판단
 BALL_OWNER_MAX_DISTANCE = 50  # 픽셀 단위, 이보다 멀면 "소유 없음"
 
+# 선수 추적
+ENABLE_TRACKING = True  # 세션 파이프라인 기본값 (bytetrack은 프레임당 1ms 미만)
+TRACKER_BACKEND = "bytetrack"  # "bytetrack" | "deepsort"
+TRACK_PREDICT_MAX_FRAMES = 5  # 탐지 없이 예측 위치만으로 보고하는 최대 프레임 수 (predicted=True)
+BYTETRACK_HIGH_THRESHOLD = 0.4  # 이 이상은 1단계 연관, 미만은 2단계(남은 트랙)에서만 사용
+BYTETRACK_NEW_TRACK_THRESHOLD = 0.5  # 새 트랙을 만들 수 있는 최소 신뢰도
+BYTETRACK_MATCH_IOU = 0.2  # 1단계 연관 최소 IoU
+BYTETRACK_LOW_MATCH_IOU = 0.5  # 2단계 연관 최소 IoU (낮은 신뢰도 탐지는 더 엄격하게)
+BYTETRACK_MAX_AGE = 30  # 이 프레임 수 동안 갱신 없으면 트랙 삭제
+BYTETRACK_MIN_HITS = 2  # 이 횟수 이상 연관되어야 확정 트랙으로 결과에 포함
+
+# 카메라 움직임 보정 (추적기 예측을 현재 프레임 좌표로 이동)
+CAMERA_MOTION_COMPENSATION = True
+CAMERA_MOTION_MAX_POINTS = 200  # 배경 특징점 최대 개수 (축소 프레임 기준)
+CAMERA_MOTION_MIN_INLIERS = 15  # RANSAC 인라이어가 이보다 적으면 보정 생략
+
+# 움직임 상태 보간 (결과의 속도/가속도로 추론 사이 시각의 위치를 외삽)
+MOTION_INTERVAL_SMOOTHING = 0.2  # 추적 한 스텝 간격(초) 지수 이동 평균 가중치
+MOTION_MAX_INTERVAL = 1.0  # 이보다 긴 간격(일시정지, 샷 전환)은 평균에 넣지 않음 (초)
+PREDICT_MAX_AHEAD = 0.5  # 기준 시각에서 이보다 멀리는 외삽하지 않음 (초, 멀수록 발산)
+
+# DeepSORT Lazy ReID (움직임만으로 연관이 확실한 탐지는 임베딩 생략)
+REID_LAZY = True
+REID_REFRESH_INTERVAL = 10  # 이 프레임마다 전체 탐지 임베딩 (갤러리 갱신)
+REID_GATE_IOU = 0.5  # 예측 박스와 IoU가 이 이상이어야 움직임만으로 연관
+REID_AMBIGUITY_IOU = 0.1  # 이 이상 겹치는 트랙/탐지가 둘 이상이면 애매 → 임베딩
+REID_EMBEDDER = "mobilenet"  # "onnx" (reid.py, onnxruntime 필요) | "mobilenet" | "torchreid"
+REID_ONNX_MODEL_PATH = PROJECT_ROOT / "osnet_x0_25.onnx"  # 입력 N x 3 x 256 x 128
+REID_INPUT_SIZE = (128, 256)  # ReID 입력 크기 (w, h)
+REID_MAX_BATCH = 32  # 동적 배치 모델의 한 번 실행 최대 크롭 수
+REID_GALLERY_SIZE = 32  # 트랙별 외형 특징 최대 보관 수
+
 # 유니폼 색상 클러스터링
 N_TEAMS = 2  # 홈팀 + 원정팀
 COLOR_MATCHING_THRESHOLD = 30  # RGB 유클리드 거리
@@ -0,0 +1,68 @@
+"""
+JPEG 디코딩 계획
+헤더에서 원본 크기를 읽고, 모델 입력에 필요한 만큼만 DCT 단계에서 축소 디코딩 (IMREAD_REDUCED_COLOR_2/4)
+
+1080p를 전체 해상도로 디코딩한 뒤 640으로 줄이는 대신 960x540으로 바로 디코딩
+원본 해상도가 필요한 스테이지(공 ROI, 슬라이스 탐지, ReID 크롭)는 전체 디코딩 요청
+"""
+
+import struct
+import numpy as np
+import cv2
+from typing import Optional, Tuple
+
+# 축소 배율 → imdecode 플래그
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+}
+
+# 크기 정보가 있는 SOF 마커 (DHT=C4, JPG=C8, DAC=CC 제외)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    JPEG 헤더의 (w, h) (디코딩 없이 마커만 훑음)
+
+    Returns:
+        (w, h) 또는 None (JPEG가 아니거나 SOF 마커 없음)
+    """
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    n = len(data)
+    while i + 4 <= n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # 채움 바이트
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # 길이 없는 마커
+            i += 2
+            continue
+        length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if marker in _SOF_MARKERS:
+            if i + 9 > n:
+                return None
+            h, w = struct.unpack(">HH", data[i + 5:i + 9])
+            return w, h
+        if marker == 0xDA:  # 스캔 시작 전에 SOF가 없으면 포기
+            return None
+        i += 2 + length
+    return None
+
+
+def plan_reduction(long_side: int, min_long_side: int) -> int:
+    """긴 변이 min_long_side 아래로 내려가지 않는 가장 큰 축소 배율 (1, 2, 4)"""
+    for factor in (4, 2):
+        if long_side // factor >= min_long_side:
+            return factor
+    return 1
+
+
+def decode(data: bytes, factor: int = 1) -> Optional[np.ndarray]:
+    """JPEG 바이트 → BGR 프레임 (factor배 축소, 실패하면 None)"""
+    return cv2.imdecode(np.frombuffer(data, np.uint8), REDUCED_FLAGS[factor])
@@ -0,0 +1,71 @@
+"""
+정지/중복 프레임 감지
+JPEG 바이트 해시(완전히 같은 프레임)와 1/8 축소 디코딩 썸네일 차이(거의 같은 프레임)로 판단
+평균 차이 대신 최대 차이 → 화면 일부의 작은 움직임(공, 선수 한 명)도 놓치지 않음
+
+영상이 일시정지/버퍼링 중이어도 확장 프로그램은 같은 프레임을 계속 보내므로
+전체 디코딩/추론 없이 이전 결과를 재사용
+"""
+
+import hashlib
+import numpy as np
+import cv2
+from typing import Optional
+
+from config import FRAME_DEDUP_DIFF, FRAME_DEDUP_MAX_SKIP
+
+# 비교용 썸네일 크기 (w, h)
+THUMBNAIL_SIZE = (64, 36)
+
+
+class FrameFingerprint:
+    """
+    프레임 순서대로 is_duplicate()를 호출
+
+    비교 기준은 마지막으로 "처리한" 프레임 (생략한 프레임끼리 비교하면 느린 변화가 누적되어도 모름)
+    """
+
+    def __init__(self, max_diff: int = FRAME_DEDUP_DIFF, max_skip: int = FRAME_DEDUP_MAX_SKIP):
+        self.max_diff = max_diff
+        self.max_skip = max_skip
+        self.digest: Optional[bytes] = None
+        self.thumbnail: Optional[np.ndarray] = None
+        self.skipped = 0
+
+    def is_duplicate(self, frame_bytes: bytes) -> bool:
+        """
+        Args:
+            frame_bytes: JPEG 바이트
+
+        Returns:
+            마지막으로 처리한 프레임과 사실상 같으면 True (False면 이 프레임이 새 기준)
+        """
+        digest = hashlib.blake2b(frame_bytes, digest_size=16).digest()
+        duplicate = False
+        thumbnail = None
+        if self.skipped < self.max_skip:
+            if digest == self.digest:
+                duplicate = True
+            elif self.thumbnail is not None:
+                thumbnail = self._thumbnail(frame_bytes)
+                duplicate = (
+                    thumbnail is not None
+                    and int(cv2.absdiff(thumbnail, self.thumbnail).max()) <= self.max_diff
+                )
+
+        if duplicate:
+            self.skipped += 1
+            return True
+
+        self.digest = digest
+        self.thumbnail = thumbnail if thumbnail is not None else self._thumbnail(frame_bytes)
+        self.skipped = 0
+        return False
+
+    @staticmethod
+    def _thumbnail(frame_bytes: bytes) -> Optional[np.ndarray]:
+        """1/8 축소 그레이 디코딩 (DCT 단계에서 축소되어 전체 디코딩보다 훨씬 빠름) → 64x36"""
+        reduced = cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if reduced is None:
+            return None
+        return cv2.resize(reduced, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
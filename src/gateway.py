@@ -0,0 +1,316 @@
+"""
+게이트웨이 서버 (수평 확장 모드)
+WebSocket은 게이트웨이가 받고, 추론은 여러 추론 노드(node.py)에 분산
+
+- 세션은 처음 배정된 노드에 고정 (sticky) → PlayerTracker 상태가 한 노드에 유지
+- 새 세션은 노드가 보고한 부하가 가장 낮은 노드로 배정
+- 노드 연결이 끊기거나 부하 조회에 응답하지 않으면 해당 세션은 다음 프레임에서 다른 노드로 재배정
+- 선수 명단/수동 매칭 API는 세션을 가진 노드로 전달 (세션을 지정하지 않으면 모든 노드)
+
+실행 예시 (한 머신에서 테스트):
+    python node.py --port 9001
+    python node.py --port 9002
+    SOCCERHUD_NODES=localhost:9001,localhost:9002 python gateway.py
+"""
+
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, WebSocket
+from fastapi.middleware.cors import CORSMiddleware
+
+from models import RosterData
+from transport import NodeClient, TransportError
+from scheduler import FrameScheduler
+from ws_session import run_session, notify_grant, latency
+from config import (
+    HOST,
+    PORT,
+    CORS_ORIGINS,
+    NODE_ADDRESSES,
+    NODE_LOAD_POLL_INTERVAL,
+    NODE_REQUEST_TIMEOUT,
+    NODE_FRAME_BUDGET_FPS,
+    SCHEDULER_MAX_IN_FLIGHT,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+class NodeRouter:
+    """
+    세션 → 추론 노드 라우팅
+
+    ws_session.run_session의 backend로 사용 (process / close 제공)
+    """
+
+    def __init__(self, addresses: List[Tuple[str, int]]):
+        self.nodes: List[NodeClient] = [NodeClient(host, port) for host, port in addresses]
+        self.assignments: Dict[str, NodeClient] = {}
+        self._poll_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """모든 노드에 연결하고 부하 폴링 시작"""
+        for node in self.nodes:
+            try:
+                await node.connect()
+            except OSError as e:
+                logger.warning(f"추론 노드 연결 실패: {node.address} ({e})")
+        self._poll_task = asyncio.create_task(self._poll_loads())
+
+    async def stop(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+        for node in self.nodes:
+            await node.close()
+
+    def choose_node(self) -> NodeClient:
+        """
+        새 세션을 배정할 노드 선택
+
+        보고된 사용률이 가장 낮은 노드, 같으면 게이트웨이가 배정한 세션 수가 적은 노드
+
+        Raises:
+            TransportError: 연결된 노드가 없는 경우
+        """
+        candidates = [node for node in self.nodes if node.connected]
+        if not candidates:
+            raise TransportError("연결된 추론 노드 없음")
+
+        return min(
+            candidates,
+            key=lambda node: (
+                round(node.load.get("utilization", 0.0), 1),
+                self.session_count(node),
+            ),
+        )
+
+    def session_count(self, node: NodeClient) -> int:
+        """게이트웨이 기준 노드에 배정된 세션 수"""
+        return sum(1 for assigned in self.assignments.values() if assigned is node)
+
+    def node_for(self, session_id: str) -> NodeClient:
+        """세션의 노드 조회 (없거나 끊겼으면 새로 배정)"""
+        node = self.assignments.get(session_id)
+        if node is None or not node.connected:
+            if node is not None:
+                logger.warning(f"세션 {session_id}: 노드 {node.address} 끊김 → 재배정 (추적 상태 초기화)")
+            node = self.choose_node()
+            self.assignments[session_id] = node
+            logger.info(f"세션 {session_id} → 노드 {node.address}")
+        return node
+
+    async def process(self, session_id: str, frame_bytes: bytes, received: Optional[float] = None) -> Optional[dict]:
+        """
+        세션의 노드에 프레임 전달 후 결과 반환 (노드가 프레임을 받지 못했으면 None)
+
+        received: 게이트웨이 수신 시각 (노드와 시계가 다를 수 있으므로 지금까지의 대기 시간으로 전달)
+        """
+        node = self.node_for(session_id)
+        header = {"type": "frame", "session_id": session_id}
+        if received is not None:
+            header["waited"] = max(0.0, time.time() - received)
+        _, body = await node.request(header, frame_bytes)
+        return json.loads(body)
+
+    async def close(self, session_id: str):
+        """세션 종료 알림 (노드가 추적 상태 폐기)"""
+        node = self.assignments.pop(session_id, None)
+        if node is not None:
+            await node.send({"type": "close", "session_id": session_id})
+
+    def nodes_for(self, session_id: Optional[str] = None) -> List[NodeClient]:
+        """
+        명단/매칭 요청을 보낼 노드
+
+        세션을 지정하면 그 세션이 배정된 노드 (아직 배정 전이면 새로 배정),
+        지정하지 않으면 연결된 모든 노드 (명단은 노드의 모든 세션이 공유)
+        """
+        if session_id is not None:
+            return [self.node_for(session_id)]
+        return [node for node in self.nodes if node.connected]
+
+    async def set_roster(self, roster: dict, session_id: Optional[str] = None) -> int:
+        """선수 명단 전달 → 전달한 노드 수"""
+        body = json.dumps(roster, ensure_ascii=False).encode("utf-8")
+        nodes = self.nodes_for(session_id)
+        await asyncio.gather(*(
+            node.request({"type": "roster"}, body, timeout=NODE_REQUEST_TIMEOUT) for node in nodes
+        ))
+        return len(nodes)
+
+    async def match_player(self, track_id: int, team: str, number: int, session_id: Optional[str] = None) -> int:
+        """수동 매칭 전달 → 전달한 노드 수"""
+        header = {"type": "match", "track_id": track_id, "team": team, "number": number}
+        nodes = self.nodes_for(session_id)
+        await asyncio.gather(*(node.request(header, timeout=NODE_REQUEST_TIMEOUT) for node in nodes))
+        return len(nodes)
+
+    async def get_roster(self, session_id: Optional[str] = None) -> dict:
+        """
+        현재 명단 (세션의 노드, 지정하지 않으면 첫 번째 연결된 노드)
+
+        Raises:
+            TransportError: 연결된 노드가 없는 경우
+        """
+        nodes = self.nodes_for(session_id)
+        if not nodes:
+            raise TransportError("연결된 추론 노드 없음")
+        _, body = await nodes[0].request({"type": "get_roster"}, timeout=NODE_REQUEST_TIMEOUT)
+        return json.loads(body)
+
+    def load(self) -> dict:
+        """연결된 노드들의 평균 모델 사용률 (캡처 프로파일 과부하 판단용)"""
+        loads = [node.load.get("utilization", 0.0) for node in self.nodes if node.connected]
+        return {"utilization": sum(loads) / len(loads) if loads else 0.0}
+
+    def status(self) -> List[dict]:
+        return [
+            {
+                "address": node.address,
+                "connected": node.connected,
+                "sessions": self.session_count(node),
+                "load": node.load,
+            }
+            for node in self.nodes
+        ]
+
+    async def _poll_loads(self):
+        """주기적으로 노드 부하 조회, 끊긴 노드는 재연결 시도"""
+        while True:
+            await asyncio.sleep(NODE_LOAD_POLL_INTERVAL)
+            await asyncio.gather(*(self._poll_node(node) for node in self.nodes))
+
+    async def _poll_node(self, node: NodeClient):
+        """
+        노드 하나의 부하 조회
+
+        NODE_REQUEST_TIMEOUT 안에 응답하지 않으면 멈춘 노드로 보고 연결을 끊음
+        → 대기 중인 프레임은 실패하고 세션은 다음 프레임에서 다른 노드로 재배정, 다음 조회 때 재연결
+        """
+        try:
+            if not node.connected:
+                await asyncio.wait_for(node.connect(), NODE_REQUEST_TIMEOUT)
+            await node.request({"type": "load"}, timeout=NODE_REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"추론 노드 응답 없음: {node.address} → 연결 해제")
+            await node.close()
+        except (OSError, TransportError):
+            pass
+
+
+# FastAPI 앱 생성
+app = FastAPI(title="SoccerHUD Gateway")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+router = NodeRouter(NODE_ADDRESSES)
+scheduler = None
+
+
+@app.on_event("startup")
+async def startup_event():
+    global scheduler
+    logger.info(f"게이트웨이 시작 중... (노드 {len(router.nodes)}개)")
+    await router.start()
+
+    # 클러스터 전체 예산 = 노드당 예산 × 노드 수
+    scheduler = FrameScheduler(
+        budget_fps=NODE_FRAME_BUDGET_FPS * len(router.nodes),
+        max_in_flight=SCHEDULER_MAX_IN_FLIGHT * len(router.nodes),
+        on_grant=notify_grant,
+    )
+    scheduler.start()
+    logger.info(f"게이트웨이 준비 완료! ws://{HOST}:{PORT}/ws")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await scheduler.stop()
+    await router.stop()
+
+
+@app.get("/health")
+async def health():
+    """상태 확인"""
+    return {
+        "status": "healthy",
+        "nodes": router.status(),
+        "scheduler": scheduler.status() if scheduler is not None else None,
+    }
+
+
+@app.get("/api/metrics")
+async def metrics():
+    """구간별 지연 (파이프라인 카운터는 각 노드에서 집계)"""
+    return {"latency": latency.summary()}
+
+
+# ============ 선수 명단 관리 API (세션의 노드로 전달) ============
+
+@app.post("/api/roster")
+async def set_roster(roster: RosterData, session_id: Optional[str] = None):
+    """선수 명단 설정 (session_id가 없으면 모든 노드)"""
+    try:
+        count = await router.set_roster(roster.model_dump(), session_id)
+    except (TransportError, asyncio.TimeoutError) as e:
+        return {"status": "error", "message": f"노드 전달 실패: {e}"}
+    return {
+        "status": "success",
+        "nodes": count,
+        "roster": {"home": len(roster.home), "away": len(roster.away)},
+    }
+
+
+@app.post("/api/match")
+async def match_player(track_id: int, team: str, number: int, session_id: Optional[str] = None):
+    """수동 매칭: 추적 ID를 특정 선수에 할당 (추적 ID는 세션별이므로 보통 session_id 지정)"""
+    try:
+        count = await router.match_player(track_id, team, number, session_id)
+    except (TransportError, asyncio.TimeoutError) as e:
+        return {"status": "error", "message": f"노드 전달 실패: {e}"}
+    return {
+        "status": "success",
+        "nodes": count,
+        "message": f"Track ID {track_id} matched to {team} #{number}",
+    }
+
+
+@app.get("/api/roster")
+async def get_roster(session_id: Optional[str] = None):
+    """현재 명단 조회"""
+    try:
+        roster = await router.get_roster(session_id)
+    except (TransportError, asyncio.TimeoutError) as e:
+        return {"status": "error", "message": f"노드 조회 실패: {e}"}
+    return {"status": "success", **roster}
+
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    """WebSocket 엔드포인트 (추론 노드로 프레임 전달)"""
+    await run_session(websocket, router, scheduler)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "gateway:app",
+        host=HOST,
+        port=PORT,
+        log_level="info",
+    )
@@ -1,27 +1,71 @@
 """
 YOLO 추론 파이프라인
 프레임 수신 → 전처리 → YOLO 추론 → 후처리 → 공 소유자 판단
+
+스테이지(decode → person → ball → post)로 나뉘어 있어
+submit()을 쓰면 스테이지별 스레드에서 프레임들이 겹쳐 처리됨
 """
 
 import time
+import threading
+import itertools
 import numpy as np
 import cv2
+from concurrent.futures import Future
 from ultralytics import YOLO
 from sklearn.cluster import KMeans
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 import logging
+from pathlib import Path
 
 from config import (
     MODEL_PATH,
+    DEBUG_SAVE_FRAMES,
     COREML_MODEL_PATH,
     USE_COREML,
+    EXPORT_SHAPES,
+    PITCH_CROP,
+    PITCH_FILTER,
+    SHOT_CLASSIFIER,
+    SHOT_PAUSE_NON_WIDE,
+    FRAME_DEDUP,
+    REDUCED_DECODE,
+    QUALITY_ADAPTIVE,
+    QUALITY_INPUT_SIZE,
+    DEADLINE_SCHEDULING,
+    FRAME_DEADLINE,
+    DEADLINE_MAX_SKIP,
     INPUT_SIZE,
     CONFIDENCE_THRESHOLD,
+    BALL_CONFIDENCE_THRESHOLD,
     IOU_THRESHOLD,
     BALL_CLASS_ID,
     PERSON_CLASS_ID,
     BALL_OWNER_MAX_DISTANCE,
     N_TEAMS,
+    KEYFRAME_MODE,
+    KEYFRAME_MIN_VALID_RATIO,
+    ENABLE_TRACKING,
+    TRACKER_BACKEND,
+    CAMERA_MOTION_COMPENSATION,
+    BALL_TRACKING,
+    CASCADE_MODE,
+    CASCADE_NANO_MODEL_PATH,
+    CASCADE_PLAYER_DROP,
+    CASCADE_LOW_CONFIDENCE,
+    CASCADE_LOW_RATIO,
+    CASCADE_MIN_BOXES,
+    BALL_ROI_SEARCH,
+    BALL_ROI_MAX_LOST,
+    BALL_ROI_MAX_STEPS,
+    BALL_ROI_CONFIDENCE,
+    BALL_SLICE_SEARCH,
+    BALL_SLICE_SIZE,
+    BALL_SLICE_OVERLAP,
+    BALL_SLICE_MIN_HEIGHT,
+    BALL_SLICE_MIN_PITCH,
+    MOTION_INTERVAL_SMOOTHING,
+    MOTION_MAX_INTERVAL,
 )
 from models import (
     BallDetection,
@@ -29,44 +73,227 @@ from models import (
     BallOwner,
     DetectionResult,
 )
-from tracker import PlayerTracker
+from tracker import create_tracker
 from player_matcher import PlayerMatcher
+from preprocess import letterbox, letterbox_shape, LetterboxInfo, Detections
+from stages import StagePipeline, StageQueueFull
+from keyframe import KeyframeScheduler, MotionPropagator, prepare_flow_frame
+from shot_detector import ShotBoundaryDetector
+from shot_classifier import ShotClassifier, WIDE
+from camera_motion import CameraMotionEstimator
+from ball_tracker import BallTracker
+from pitch import PitchMask, PitchRegionEstimator
+from slicing import tile_grid, nms
+from metrics import Metrics
+from fingerprint import FrameFingerprint
+from decode import jpeg_size, plan_reduction, decode
+from quality import QualityController, RUNGS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def load_model() -> YOLO:
+    """설정에 맞는 YOLO 모델 로드 (여러 파이프라인이 공유 가능)"""
+    if USE_COREML and COREML_MODEL_PATH.exists():
+        logger.info(f"CoreML 모델 로딩: {COREML_MODEL_PATH}")
+        # CoreML은 ultralytics로 직접 로드 가능
+        return YOLO(str(COREML_MODEL_PATH))
+
+    logger.info(f"PyTorch 모델 로딩: {MODEL_PATH}")
+    return YOLO(str(MODEL_PATH))
+
+
+def load_nano_model() -> YOLO:
+    """캐스케이드 1단계 nano 모델 로드 (CASCADE_MODE)"""
+    logger.info(f"캐스케이드 nano 모델 로딩: {CASCADE_NANO_MODEL_PATH}")
+    return YOLO(str(CASCADE_NANO_MODEL_PATH))
+
+
+def exported_model_path(shape: Tuple[int, int]) -> Path:
+    """입력 크기 (h, w)별 내보낸 모델 경로 (640x640은 기본 COREML_MODEL_PATH)"""
+    h, w = shape
+    if h == w == INPUT_SIZE:
+        return COREML_MODEL_PATH
+    return COREML_MODEL_PATH.with_name(f"{COREML_MODEL_PATH.stem}_{h}x{w}{COREML_MODEL_PATH.suffix}")
+
+
+def load_shape_variants() -> Dict[Tuple[int, int], YOLO]:
+    """
+    입력 크기가 고정인 내보낸 모델의 크기별 변형 (PyTorch는 크기가 자유로우므로 빈 dict)
+
+    내보내지 않은 크기는 건너뜀 (tests/test_coreml_export.py로 내보내기)
+    """
+    if not (USE_COREML and COREML_MODEL_PATH.exists()):
+        return {}
+    variants = {}
+    for shape in EXPORT_SHAPES:
+        path = exported_model_path(shape)
+        if path.exists():
+            logger.info(f"CoreML {shape[0]}x{shape[1]} 변형 로딩: {path}")
+            variants[tuple(shape)] = YOLO(str(path))
+    return variants
+
+
+class ModelRunner:
+    """
+    여러 파이프라인(세션)이 공유하는 YOLO 모델 래퍼
+
+    - 모델 호출을 락으로 직렬화 (ultralytics predictor는 스레드 안전하지 않음)
+    - 모델 사용 시간 누적 (노드 부하 = 모델 사용률)
+    - 입력 크기가 고정인 내보낸 모델은 imgsz에 맞는 크기별 변형으로 실행
+    """
+
+    def __init__(self, model: YOLO, variants: Optional[Dict[Tuple[int, int], YOLO]] = None):
+        """
+        Args:
+            model: 기본 모델 (변형이 없는 크기도 처리, ultralytics가 알아서 letterbox)
+            variants: 입력 크기 (h, w)별 고정 크기 모델 (load_shape_variants)
+        """
+        self.model = model
+        self.variants = variants or {}
+        self.lock = threading.Lock()
+        self.busy_time = 0.0
+        self.calls = 0
+
+    def input_shape(self, shape: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        letterbox 크기 (h, w) → 실제 모델 입력 크기
+
+        크기별 변형이 있으면 이 크기를 담을 수 있는 가장 작은 변형 (예: 4:3 → 640x640)
+        """
+        fits = [v for v in self.variants if v[0] >= shape[0] and v[1] >= shape[1]]
+        if not fits:
+            return shape
+        return min(fits, key=lambda v: v[0] * v[1])
+
+    def __call__(self, *args, imgsz=None, **kwargs):
+        model = self.model
+        if imgsz is not None:
+            model = self.variants.get(tuple(imgsz), self.model)
+            kwargs["imgsz"] = imgsz
+        with self.lock:
+            start = time.perf_counter()
+            results = model(*args, **kwargs)
+            self.busy_time += time.perf_counter() - start
+            self.calls += 1
+        return results
+
+
+class FrameContext:
+    """스테이지 사이를 오가는 프레임 하나의 처리 상태"""
+
+    def __init__(
+        self, frame_bytes: bytes, deadline: Optional[float] = None, received: Optional[float] = None
+    ):
+        self.frame_bytes = frame_bytes
+        self.start_time = time.time()
+        # 서버 수신 시각 (스케줄러 큐 대기 포함), 모르면 (직접 호출) 지금을 수신 시각으로 봄
+        self.received = received if received is not None else self.start_time
+        # 결과 마감 시각 (time.time() 기준, None이면 수신 + FRAME_DEADLINE)
+        if deadline is None and DEADLINE_SCHEDULING:
+            deadline = self.received + FRAME_DEADLINE
+        self.deadline = deadline
+        self.stages_run: List[str] = []  # 실행한 스테이지 (결과에 표시)
+        self.started_at = self.start_time  # 처리 시작 시각 (디코딩 스테이지 진입, 큐 대기 제외)
+
+        self.frame: Optional[np.ndarray] = None  # 디코딩된 BGR 프레임 (축소 디코딩일 수 있음)
+        self.frame_scale = 1.0  # frame 크기 / 원본 크기 (축소 디코딩이면 1/2, 1/4)
+        self.frame_size: Tuple[int, int] = (0, 0)  # 원본 (w, h) - 모든 좌표는 원본 기준
+        self.full_frame: Optional[np.ndarray] = None  # 필요할 때 디코딩한 원본 해상도 프레임
+        self.input: Optional[np.ndarray] = None  # letterbox된 모델 입력
+        self.letterbox: Optional[LetterboxInfo] = None
+        self.detections: Optional[Detections] = None  # 선수용 패스 결과
+        self.ball_detections: Optional[Detections] = None  # 공 전용 패스 결과
+        self.result: Optional[DetectionResult] = None
+        self.index = 0  # 세션 내 프레임 순번 (decode 스테이지에서 부여)
+        self.ball_search = "full"  # 공 탐지 방식: "full" | "roi" | "sliced" | "skipped"
+        self.pitch_region: Optional[Tuple[int, int, int, int]] = None  # letterbox 전 크롭 영역
+        self.pitch_mask: Optional[PitchMask] = None  # 샷 단위 캐시된 잔디 마스크
+        self.tier = "small"  # 탐지기 캐스케이드 단계: "nano" | "small"
+        self.quality_level = 0  # 적응형 품질 레벨 (decode 스테이지에서 고정)
+        self.quality: frozenset = frozenset()  # 이 프레임에 적용할 품질 단계 (quality.RUNGS)
+        self.keyframes = False  # 키프레임 전파 사용 (keyframe_mode 또는 품질 단계)
+
+        # 샷 경계
+        self.shot_cut = False  # 이 프레임에서 새 샷이 시작됨
+        self.shot_id = 0
+        self.shot_type = WIDE
+        self.paused = False  # 와이드 샷이 아니라 추론 생략 (HUD 일시정지)
+        self.resumed = False  # 일시정지 후 첫 프레임 (컷처럼 이전 상태 초기화)
+        self.duplicate = False  # 직전에 처리한 프레임과 같음 → 이전 결과 재사용
+
+        # 키프레임 모드
+        self.is_keyframe = True  # False면 YOLO 대신 이전 박스 전파
+        self.flow_gray: Optional[np.ndarray] = None  # 광학 흐름용 축소 그레이 프레임
+        self.flow_scale = 1.0
+
+
 class InferencePipeline:
     """YOLO 추론 및 선수/공 탐지 파이프라인"""
 
-    def __init__(self, enable_tracking: bool = False):  # 임시로 False
+    def __init__(
+        self,
+        enable_tracking: bool = ENABLE_TRACKING,
+        model: Optional[ModelRunner] = None,
+        matcher: Optional[PlayerMatcher] = None,
+        keyframe_mode: bool = KEYFRAME_MODE,
+        cascade_model: Optional[ModelRunner] = None,
+        nano_model: Optional[ModelRunner] = None,
+    ):
         """모델 로딩
 
         Args:
-            enable_tracking: DeepSORT 추적 활성화 여부 (기본: False, 임시로 비활성화)
+            enable_tracking: 선수 추적 활성화 여부 (백엔드는 config.TRACKER_BACKEND)
+            model: 이미 로드된 공유 모델 (세션 간 공유용, None이면 새로 로드)
+            matcher: 공유할 PlayerMatcher (None이면 새로 생성)
+            keyframe_mode: 키프레임에서만 YOLO 실행, 사이 프레임은 광학 흐름으로 박스 전파
+            cascade_model: 캐스케이드 1단계 공유 nano 모델 (None이고 CASCADE_MODE면 새로 로드)
+            nano_model: 적응형 품질 nano 단계용 모델 (None이면 cascade_model, 둘 다 없으면 nano 단계 없음)
         """
         logger.info("InferencePipeline 초기화 시작...")
 
-        # YOLO 모델 로드
-        if USE_COREML and COREML_MODEL_PATH.exists():
-            logger.info(f"CoreML 모델 로딩: {COREML_MODEL_PATH}")
-            # CoreML은 ultralytics로 직접 로드 가능
-            self.model = YOLO(str(COREML_MODEL_PATH))
-        else:
-            logger.info(f"PyTorch 모델 로딩: {MODEL_PATH}")
-            self.model = YOLO(str(MODEL_PATH))
+        # YOLO 모델 로드 (세션별 파이프라인은 모델을 공유)
+        self.model = model if model is not None else ModelRunner(load_model(), load_shape_variants())
+
+        # 탐지기 캐스케이드 (nano 먼저, 불확실하면 self.model로 승격)
+        if cascade_model is None and CASCADE_MODE:
+            cascade_model = ModelRunner(load_nano_model())
+        self.cascade_model = cascade_model
+        self.nano_model = nano_model if nano_model is not None else cascade_model
+        self._player_count_avg: Optional[float] = None  # 최근 선수 수 (지수 이동 평균)
+
+        # 카운터 (탐지기 단계 적중률 등, SessionManager가 합쳐서 보고)
+        self.metrics = Metrics()
+
+        # 정지/중복 프레임 생략 (마지막 결과 재사용)
+        self.fingerprint = FrameFingerprint() if FRAME_DEDUP else None
+        self._last_result: Optional[DetectionResult] = None
+
+        # 축소 JPEG 디코딩 (DeepSORT는 ReID 크롭에 원본 프레임이 필요)
+        self.reduced_decode = REDUCED_DECODE and not (enable_tracking and TRACKER_BACKEND == "deepsort")
 
-        # DeepSORT 추적 (Phase 3)
+        # 선수 추적 (Phase 3)
         self.enable_tracking = enable_tracking
         if enable_tracking:
-            self.tracker = PlayerTracker()
-            logger.info("DeepSORT 추적 활성화")
+            self.tracker = create_tracker()
+            logger.info(f"추적 활성화 ({TRACKER_BACKEND})")
         else:
             self.tracker = None
             logger.info("추적 비활성화 (YOLO만 사용)")
 
+        # 공 추적 (등가속도 칼만 필터, 추적 활성화 여부와 무관)
+        self.ball_tracker = BallTracker() if BALL_TRACKING else None
+
+        # 카메라 움직임 보정 (선수/공 추적기 예측을 현재 프레임 좌표로 이동)
+        self.camera_motion = (
+            CameraMotionEstimator()
+            if (enable_tracking or self.ball_tracker is not None) and CAMERA_MOTION_COMPENSATION
+            else None
+        )
+
         # 선수 매칭 시스템 (Phase 3)
-        self.matcher = PlayerMatcher()
+        self.matcher = matcher if matcher is not None else PlayerMatcher()
 
         # 성능 측정용
         self.frame_count = 0
@@ -75,105 +302,718 @@ class InferencePipeline:
         # 팀 색상 히스토리 (프레임 간 일관성 유지)
         self.team_colors = None  # [(r,g,b), (r,g,b)] for [home, away]
 
+        # 샷 경계 감지 (컷마다 트랙 리셋, 팀 색상 재학습, 키프레임 강제)
+        self.shot_detector = ShotBoundaryDetector()
+
+        # 피치 영역 (letterbox 전 크롭, 피치 밖 탐지 제거, 샷 분류, 샷마다 캐시)
+        self.pitch_region = (
+            PitchRegionEstimator() if (PITCH_CROP or PITCH_FILTER or SHOT_CLASSIFIER) else None
+        )
+
+        # 샷 유형 분류 (와이드 샷이 아니면 HUD 일시정지)
+        self.shot_classifier = ShotClassifier() if SHOT_CLASSIFIER else None
+        self._paused = False
+
+        # 적응형 품질 (지연이 목표를 넘으면 더 싼 설정 단계로, 이 파이프라인에 해당 없는 단계는 제외)
+        self.quality = QualityController(self._quality_rungs(keyframe_mode)) if QUALITY_ADAPTIVE else None
+
+        # 키프레임 모드 (사이 프레임은 마지막 키프레임 결과를 전파, 품질 단계로도 켜짐)
+        self.keyframe_mode = keyframe_mode
+        use_keyframes = keyframe_mode or (self.quality is not None and "keyframes" in self.quality.rungs)
+        self.keyframes = KeyframeScheduler() if use_keyframes else None
+        self.propagator = MotionPropagator() if use_keyframes else None
+        self._keyframes_active = False
+        self._propagated_players: List[PlayerDetection] = []
+        self._propagated_ball: Optional[BallDetection] = None
+
+        # 선택 스테이지별 최근 소요 시간 (초, 지수 이동 평균) → 마감 전에 끝낼 수 있는지 판단
+        self._stage_costs: Dict[str, float] = {}
+        self._skip_streaks: Dict[str, int] = {}  # 선택 스테이지별 연속 생략 횟수
+        self._budget_lock = threading.Lock()  # 위 두 상태는 공 스테이지와 후처리 스테이지가 함께 씀
+        self._track_teams: Dict[int, dict] = {}  # 트랙 ID → 마지막 팀/색상 (색상 분류 생략 프레임용)
+
+        # 움직임 상태 기준 (결과의 속도를 초 단위 시각으로 외삽할 수 있게)
+        self._frame_interval = 0.0  # 추적 한 스텝의 평균 간격 (초)
+        self._last_step_time: Optional[float] = None
+        self._camera_shift = (0.0, 0.0)  # 직전 스텝 카메라 이동 (프레임 중앙 기준 px)
+        # 공 추적기 상태가 반영한 마지막 프레임 순번 (후처리 스테이지가 씀, 공 스테이지 ROI 예측 기준)
+        self._ball_index: Optional[int] = None
+
+        # 스테이지 그래프 (submit()을 처음 호출할 때 스레드 시작)
+        # 프레임별 값은 FrameContext로 넘기고, 파이프라인 상태는 한 스테이지만 씀:
+        #   decode - fingerprint, shot_detector, shot_classifier, _paused, _keyframes_active, _decoded_frames
+        #   post   - 선수/공 추적기, propagator, 팀 색상, camera_motion, _ball_index, frame_count
+        # 뒤 스테이지 → 앞 스테이지로 되먹임하는 상태만 공유하고 잠금으로 보호:
+        #   keyframes (decode가 판단, post가 간격 조정), pitch_region (post가 카메라 이동 누적),
+        #   ball_tracker (ball이 예측 읽기), quality (decode가 레벨 읽기, 단일 int 대입),
+        #   _stage_costs/_skip_streaks (ball·post, _budget_lock)
+        self.stages = [
+            ("decode", self._stage_decode),
+            ("person", self._stage_person),
+            ("ball", self._stage_ball),
+            ("post", self._stage_postprocess),
+        ]
+        self._stage_pipeline: Optional[StagePipeline] = None
+        self._decoded_frames = 0
+
         logger.info("InferencePipeline 초기화 완료!")
 
-    def process(self, frame_bytes: bytes) -> DetectionResult:
+    def process(
+        self, frame_bytes: bytes, deadline: Optional[float] = None, received: Optional[float] = None
+    ) -> DetectionResult:
         """
-        프레임을 받아서 탐지 결과 반환
+        프레임을 받아서 탐지 결과 반환 (모든 스테이지를 현재 스레드에서 순차 실행)
+
+        스테이지는 필수(디코딩, 선수 탐지, 추적)와 선택(공 패스, 팀 색상 분류, ReID, 명단 매칭)으로 나뉘고,
+        선택 스테이지는 마감까지 남은 시간이 최근 소요 시간보다 적으면 생략
 
         Args:
             frame_bytes: JPEG 인코딩된 프레임 바이트
+            deadline: 결과 마감 시각 (time.time() 기준, None이면 수신 + FRAME_DEADLINE)
+            received: 서버 수신 시각 (스케줄러 큐 대기도 마감과 적응형 품질 지연에 포함, None이면 지금)
 
         Returns:
-            DetectionResult: 탐지 결과
+            DetectionResult: 탐지 결과 (stages_run에 실행한 스테이지)
+        """
+        ctx = FrameContext(frame_bytes, deadline, received)
+        for _, stage in self.stages:
+            stage(ctx)
+        return ctx.result
+
+    def submit(
+        self, frame_bytes: bytes, deadline: Optional[float] = None, received: Optional[float] = None
+    ) -> Future:
         """
-        start_time = time.time()
+        프레임을 스테이지 파이프라인에 제출 (스테이지별 스레드에서 겹쳐 실행)
 
-        # 1. 프레임 디코딩
-        frame = self._decode_frame(frame_bytes)
+        제출 순서대로 결과가 나오므로 세션 내 순서가 보장됨
+        deadline, received는 process()와 같음 (큐 대기 시간도 마감에 포함)
+        이벤트 루프에서 호출되므로 대기하지 않음: 첫 스테이지 큐가 가득 차 있으면
+        StageQueueFull로 실패한 Future 반환 (스케줄러 세션당 동시 처리 수가 큐 크기 이하면 생기지 않음)
 
-        # 🔍 디버깅: 처음 3프레임만 이미지로 저장
-        if self.frame_count < 3:
-            from pathlib import Path
+        Returns:
+            DetectionResult를 결과로 갖는 Future
+        """
+        if self._stage_pipeline is None:
+            self._stage_pipeline = StagePipeline(self.stages, name="inference")
+
+        result = Future()
+        stage_future = self._stage_pipeline.submit(FrameContext(frame_bytes, deadline, received), block=False)
+        if stage_future.done() and isinstance(stage_future.exception(), StageQueueFull):
+            self.metrics.incr("frames.rejected")
+
+        def done(f: Future):
+            if f.exception() is not None:
+                result.set_exception(f.exception())
+            else:
+                result.set_result(f.result().result)
+
+        stage_future.add_done_callback(done)
+        return result
+
+    def close(self):
+        """스테이지 스레드 정리 (세션 종료 시)"""
+        if self._stage_pipeline is not None:
+            self._stage_pipeline.close()
+            self._stage_pipeline = None
+
+    # ============ 스테이지 ============
+
+    def _stage_decode(self, ctx: FrameContext):
+        """1. 프레임 디코딩 + letterbox"""
+        ctx.started_at = time.time()
+        # 일시정지/버퍼링으로 같은 프레임이면 디코딩부터 전부 생략
+        # (첫 결과가 나오기 전에는 재사용할 결과가 없으므로 처리)
+        if (
+            self.fingerprint is not None
+            and self.fingerprint.is_duplicate(ctx.frame_bytes)
+            and self._last_result is not None
+        ):
+            ctx.duplicate = True
+            ctx.is_keyframe = False
+            return
+
+        ctx.index = self._decoded_frames
+        self._decoded_frames += 1
+        if self.quality is not None:
+            # 레벨은 후처리 스테이지가 바꾸므로 한 번 읽은 값으로 단계 집합을 만듦
+            ctx.quality_level = self.quality.level
+            ctx.quality = frozenset(self.quality.rungs[:ctx.quality_level])
+        if self.cascade_model is not None or "nano" in ctx.quality:
+            ctx.tier = "nano"
+        input_size = QUALITY_INPUT_SIZE if "input_shape" in ctx.quality else INPUT_SIZE
+
+        self._decode_frame(ctx, input_size)
+        ctx.stages_run.append("decode")
+
+        # 🔍 디버깅: 처음 3프레임만 이미지로 저장 (순번은 이 스테이지에서 부여하므로 프레임마다 한 번)
+        if DEBUG_SAVE_FRAMES and ctx.index < 3:
             debug_dir = Path("debug_frames")
             debug_dir.mkdir(exist_ok=True)
-            debug_path = debug_dir / f"frame_{self.frame_count}.jpg"
-            cv2.imwrite(str(debug_path), frame)
-            logger.info(f"✅ 프레임 #{self.frame_count} 저장: {debug_path} (shape={frame.shape})")
-
-        # 2. YOLO 추론 (선수용)
-        detections = self._run_yolo(frame)
-        logger.info(f"🔍 YOLO 탐지 결과: {len(detections.boxes)} 개 객체")
-
-        # 3. YOLO 추론 (공 전용 - 낮은 임계값)
-        ball_detections = self._run_yolo_for_ball(frame)
-
-        # 4. 공과 선수 분리
-        ball = self._extract_ball(ball_detections, frame)
-        players = self._extract_players(detections, frame)
+            debug_path = debug_dir / f"frame_{ctx.index}.jpg"
+            cv2.imwrite(str(debug_path), ctx.frame)
+            logger.info(f"✅ 프레임 #{ctx.index} 저장: {debug_path} (shape={ctx.frame.shape})")
+
+        # 샷 경계/키프레임 결정은 프레임 순서대로 실행되는 이 스테이지에서
+        ctx.shot_cut = self.shot_detector.update(ctx.frame)
+        ctx.shot_id = self.shot_detector.shot_id
+
+        # 관중석/하늘/스코어보드를 잘라낸 피치 영역만 letterbox (샷마다 캐시)
+        if self.pitch_region is not None:
+            region = self.pitch_region.update(ctx.frame, ctx.shot_cut, ctx.frame_scale)
+            ctx.pitch_region = region if PITCH_CROP else None
+            ctx.pitch_mask = self.pitch_region.mask
+
+        # 클로즈업/관중/그래픽 → 추론 없이 일시정지 결과
+        if self.shot_classifier is not None and ctx.pitch_mask is not None:
+            ctx.shot_type = self.shot_classifier.classify(ctx.pitch_mask, self.shot_detector.thumbnail)
+        paused = SHOT_PAUSE_NON_WIDE and ctx.shot_type != WIDE
+        ctx.resumed = self._paused and not paused
+        self._paused = ctx.paused = paused
+        if paused:
+            ctx.is_keyframe = False
+            return
+
+        w, h = ctx.frame_size
+        if ctx.pitch_region is not None:
+            x1, y1, x2, y2 = ctx.pitch_region
+            w, h = x2 - x1, y2 - y1
+
+        # 16:9 → 384x640 직사각형 입력 (내보낸 모델은 크기별 변형에 맞춤)
+        shape = self.model.input_shape(letterbox_shape(w, h, input_size))
+        ctx.input, ctx.letterbox = letterbox(ctx.frame, input_size, shape, ctx.pitch_region, ctx.frame_scale)
+
+        # 광학 흐름용 축소 그레이 프레임 (키프레임 전파, 카메라 움직임 추정 공용)
+        ctx.keyframes = self.keyframe_mode or "keyframes" in ctx.quality
+        if ctx.keyframes or self.camera_motion is not None:
+            ctx.flow_gray, ctx.flow_scale = prepare_flow_frame(ctx.frame)
+            ctx.flow_scale *= ctx.frame_scale  # 원본 좌표 → 흐름 프레임 비율
+
+        if ctx.keyframes:
+            if ctx.shot_cut or ctx.resumed or not self._keyframes_active:
+                # 이전 샷의 박스는 전파할 수 없음 (품질 단계로 막 켜졌을 때도 기준 박스가 없음)
+                self.keyframes.force_keyframe()
+            ctx.is_keyframe = self.keyframes.next_is_keyframe()
+        self._keyframes_active = ctx.keyframes
+
+    def _stage_person(self, ctx: FrameContext):
+        """2. YOLO 추론 (선수용, 키프레임만)"""
+        if not ctx.is_keyframe:
+            return
+        ctx.detections = self._run_yolo(ctx)
+        ctx.stages_run.append("person")
+        logger.info(f"🔍 YOLO 탐지 결과: {len(ctx.detections)} 개 객체")
+
+    def _stage_ball(self, ctx: FrameContext):
+        """3. YOLO 추론 (공 전용 - 낮은 임계값, 키프레임만)"""
+        if not ctx.is_keyframe:
+            return
+        # 품질 단계(홀수 프레임) 또는 마감 시간 부족이면 공 전용 패스 생략
+        # (후처리가 선수 패스의 공 후보 사용, 캐스케이드 승격도 하지 않음)
+        if ("ball_every_other" in ctx.quality and ctx.index % 2) or not self._within_budget(ctx, "ball"):
+            ctx.ball_search = "skipped"
+            ctx.ball_detections = None
+            self.metrics.incr(f"detector.{ctx.tier}")
+            return
+
+        start = time.perf_counter()
+        # 공을 추적 중이면 예측 위치 주변만 원본 해상도로 탐지 (전체 프레임 탐지 생략)
+        roi = self._ball_roi(ctx)
+        if roi is not None:
+            # 선수 패스(축소 해상도)의 공 후보도 함께 → ROI 밖으로 튄 공도 게이트에서 판단
+            ctx.ball_search = "roi"
+            ctx.ball_detections = Detections.concat([self._run_yolo_for_ball_roi(ctx, roi), ctx.detections])
+        # 공 예측이 없는 고해상도 프레임(컷 직후 등)은 원본 해상도 타일로 다시 찾기
+        elif self._wants_sliced_search(ctx):
+            ctx.ball_search = "sliced"
+            ctx.ball_detections = self._run_yolo_for_ball_sliced(ctx)
+        else:
+            ctx.ball_detections = self._run_yolo_for_ball(ctx)
+        self._record_cost("ball", time.perf_counter() - start)
+        ctx.stages_run.append("ball")
+
+        # 캐스케이드: nano 결과가 불확실하면 small로 선수/공 패스를 다시 실행
+        if self.cascade_model is not None:
+            if ctx.shot_cut:
+                self._player_count_avg = None  # 이전 샷의 선수 수와 비교하지 않음
+            # nano 품질 단계면 승격하지 않음
+            reason = self._escalation_reason(ctx) if ctx.tier == "nano" and "nano" not in ctx.quality else None
+            if reason is not None:
+                logger.info(f"🔍 캐스케이드 승격 ({reason})")
+                self.metrics.incr(f"escalation.{reason}")
+                ctx.tier = "small"
+                self._stage_person(ctx)
+                self._stage_ball(ctx)
+                return
+            self._update_player_count(ctx)
+        self.metrics.incr(f"detector.{ctx.tier}")
+
+    def _stage_postprocess(self, ctx: FrameContext):
+        """4~6. 공/선수 추출 (또는 전파), 팀 분류, 추적, 공 소유자 계산"""
+        if ctx.duplicate:
+            self.metrics.incr("frames.duplicate")
+            # 화면이 멈춰 있으므로 외삽하지 않음
+            now = time.time()
+            ctx.result = self._last_result.model_copy(update={
+                "timestamp": now, "stages_run": [], "reference_time": ctx.start_time, "frame_interval": 0.0,
+                "start_ts": ctx.started_at, "end_ts": now,
+            })
+            return
+        self.metrics.incr("frames.processed")
+
+        frame = ctx.frame
+        self.metrics.incr(f"shot.{ctx.shot_type}")
+
+        if ctx.shot_cut or ctx.resumed:
+            self._on_shot_cut()
+
+        if ctx.paused:
+            # 일시정지 동안 공 추적기는 갱신되지 않으므로 재개 후 예측은 의미 없음
+            if self.ball_tracker is not None:
+                self.ball_tracker.reset()
+                self._ball_index = ctx.index
+            ctx.result = self._last_result = self._paused_result(ctx)
+            return
+
+        # 4. 사이 프레임은 이전 박스 전파, 전파가 불안정하면 바로 탐지
+        propagated = None
+        if not ctx.is_keyframe:
+            propagated = self._propagate(ctx)
+            if propagated is None:
+                ctx.is_keyframe = True
+                ctx.detections = self._run_yolo(ctx)
+                ctx.stages_run.append("person")
+                if self._within_budget(ctx, "ball"):
+                    ctx.ball_detections = self._run_yolo_for_ball(ctx)
+                    ctx.stages_run.append("ball")
+
+        if propagated is not None:
+            players, ball = propagated
+            ball_candidates = self._ball_to_detections(ball)
+        else:
+            # 공과 선수 분리 (공 전용 패스를 건너뛴 프레임은 선수 패스의 공 클래스 후보 사용)
+            ball_candidates = ctx.ball_detections if ctx.ball_detections is not None else ctx.detections
+            ball = self._extract_ball(ball_candidates, frame)
+            person_detections = ctx.detections
+            if PITCH_FILTER and ctx.pitch_mask is not None:
+                person_detections = self._drop_off_pitch(person_detections, ctx.pitch_mask)
+            # 두 팀 색상을 알기 전에는 항상 분류 (생략하면 팀이 계속 unknown)
+            colors = self._within_budget(ctx, "colors", force=self.team_colors is None)
+            players = self._extract_players(person_detections, frame, ctx.frame_scale, colors)
+            if colors:
+                ctx.stages_run.append("colors")
+            if ctx.keyframes:
+                self._reset_propagation(ctx, players, ball)
         logger.info(f"🔍 추출 완료: 선수 {len(players)}명, 공 {'O' if ball else 'X'}")
 
-        # 5. DeepSORT 추적 (Phase 3)
-        if self.enable_tracking and self.tracker and players:
+        # 카메라 움직임 보정 (선수/공 추적기 예측을 현재 프레임 좌표로)
+        if self.camera_motion is not None:
+            self._compensate_camera_motion(ctx, players)
+
+        # 공 추적 (게이트 안 후보만 연관, 짧게 놓치면 예측 위치)
+        if self.ball_tracker is not None:
+            ball = self._track_ball(ball_candidates)
+            self._ball_index = ctx.index
+
+        # 5. 선수 추적 (Phase 3, 선수가 없는 프레임도 트랙 나이를 올리기 위해 호출)
+        if self.enable_tracking and self.tracker:
+            reid = False
+            if hasattr(self.tracker, "reid_enabled"):
+                reid = "reid_off" not in ctx.quality and self._within_budget(ctx, "reid")
+                self.tracker.reid_enabled = reid
+            start = time.perf_counter()
             players = self.tracker.update(players, frame)
+            ctx.stages_run.append("tracking")
+            if reid:
+                self._record_cost("reid", time.perf_counter() - start)
+                ctx.stages_run.append("reid")
+            players = self._fill_teams(players)
+
             # 추적 ID에 선수 명단 정보 추가
-            players = self.matcher.enrich_players(players)
+            if self._within_budget(ctx, "roster"):
+                start = time.perf_counter()
+                players = self.matcher.enrich_players(players)
+                self._record_cost("roster", time.perf_counter() - start)
+                ctx.stages_run.append("roster")
 
         # 6. 공 소유자 계산
         ball_owner = self._calculate_ball_owner(ball, players)
+        self._update_frame_interval(ctx.start_time)
 
         # 성능 측정
-        elapsed = time.time() - start_time
+        elapsed = time.time() - ctx.start_time
         self.total_time += elapsed
         self.frame_count += 1
         avg_fps = self.frame_count / self.total_time if self.total_time > 0 else 0
-
-        return DetectionResult(
-            timestamp=time.time(),
+        if self.quality is not None:
+            self.quality.update(time.time() - ctx.received)  # 수신 → 결과 지연 (큐 대기 포함)
+            self.metrics.incr(f"quality.level_{ctx.quality_level}")
+        if ctx.deadline is not None:
+            self.metrics.incr("deadline.met" if time.time() <= ctx.deadline else "deadline.missed")
+
+        now = time.time()
+        ctx.result = DetectionResult(
+            timestamp=now,
             fps=avg_fps,
             ball=ball,
+            ball_state=self.ball_tracker.state() if self.ball_tracker is not None else None,
             players=players,
             ball_owner=ball_owner,
+            keyframe=ctx.is_keyframe,
+            shot_id=ctx.shot_id,
+            shot_type=ctx.shot_type,
+            quality_level=ctx.quality_level,
+            stages_run=list(dict.fromkeys(ctx.stages_run)),  # 캐스케이드 승격으로 다시 실행한 스테이지는 한 번만
+            reference_time=ctx.start_time,
+            frame_interval=self._frame_interval,
+            camera_shift=list(self._camera_shift),
+            start_ts=ctx.started_at,
+            end_ts=now,
+        )
+        self._last_result = ctx.result
+
+    # ============ 단계별 구현 ============
+
+    def _paused_result(self, ctx: FrameContext) -> DetectionResult:
+        """와이드 샷이 아닌 프레임: 선수/공 없이 HUD 일시정지만 알림"""
+        now = time.time()
+        self.total_time += now - ctx.start_time
+        self.frame_count += 1
+        return DetectionResult(
+            timestamp=now,
+            fps=self.frame_count / self.total_time if self.total_time > 0 else 0,
+            players=[],
+            keyframe=False,
+            shot_id=ctx.shot_id,
+            shot_type=ctx.shot_type,
+            hud_paused=True,
+            quality_level=ctx.quality_level,
+            stages_run=ctx.stages_run,
+            reference_time=ctx.start_time,
+            start_ts=ctx.started_at,
+            end_ts=now,
+        )
+
+    def _on_shot_cut(self):
+        """카메라 전환: 이전 샷에 묶인 상태 초기화"""
+        if self.tracker is not None:
+            self.tracker.reset()
+        if self.camera_motion is not None:
+            self.camera_motion.reset()
+        if self.ball_tracker is not None:
+            self.ball_tracker.reset()
+        # 다음 클러스터링에서 팀 색상을 처음부터 다시 학습
+        self.team_colors = None
+        self._track_teams = {}
+        # 컷 전후 위치는 이어지지 않으므로 다음 스텝 간격은 평균에 넣지 않음
+        self._last_step_time = None
+        self._camera_shift = (0.0, 0.0)
+
+    def _compensate_camera_motion(self, ctx: FrameContext, players: List[PlayerDetection]):
+        """
+        이전 → 현재 프레임 카메라 변환을 추정해서 선수/공 추적기 예측 상태에 적용
+
+        캐시된 피치 마스크에도 이동량을 알려서 패닝/줌이 크면 다음 디코딩에서 다시 계산
+        """
+        boxes = np.array(
+            [[p.x - p.width / 2, p.y - p.height / 2, p.x + p.width / 2, p.y + p.height / 2] for p in players],
+            dtype=np.float32,
+        ).reshape(-1, 4)
+        affine = self.camera_motion.update(ctx.flow_gray, ctx.flow_scale, boxes)
+        if affine is None:
+            self._camera_shift = (0.0, 0.0)
+            return
+        center = np.array(ctx.frame_size, dtype=np.float64) / 2
+        shift = affine[:, :2] @ center + affine[:, 2] - center
+        self._camera_shift = (float(shift[0]), float(shift[1]))
+        if self.pitch_region is not None:
+            # 모서리 이동 = 중앙 이동 + 회전/줌으로 벌어지는 만큼
+            corners = np.array([[-1, -1], [1, -1], [-1, 1], [1, 1]], dtype=np.float64) * center
+            moved = corners @ affine[:, :2].T + shift
+            displacement = float(np.linalg.norm(moved - corners, axis=1).max())
+            self.pitch_region.add_camera_motion(displacement / ctx.frame_size[0])
+        if self.tracker is not None:
+            self.tracker.apply_camera_motion(affine)
+        if self.ball_tracker is not None:
+            self.ball_tracker.apply_camera_motion(affine)
+
+    def _track_ball(self, candidates: Detections) -> Optional[BallDetection]:
+        """공 클래스 후보로 공 추적기 갱신 → 출력할 공"""
+        keep = (candidates.cls == BALL_CLASS_ID) & (candidates.conf >= BALL_CONFIDENCE_THRESHOLD)
+        return self.ball_tracker.update(candidates.xyxy[keep], candidates.conf[keep])
+
+    def _ball_to_detections(self, ball: Optional[BallDetection]) -> Detections:
+        """전파된 공 하나를 공 추적기 입력 형식으로"""
+        if ball is None:
+            return Detections.empty()
+        return Detections(
+            xyxy=np.array(
+                [[ball.x - ball.width / 2, ball.y - ball.height / 2, ball.x + ball.width / 2, ball.y + ball.height / 2]],
+                dtype=np.float32,
+            ),
+            conf=np.array([ball.confidence], dtype=np.float32),
+            cls=np.array([BALL_CLASS_ID]),
         )
 
-    def _decode_frame(self, frame_bytes: bytes) -> np.ndarray:
-        """JPEG 바이트를 OpenCV 이미지로 디코딩"""
-        nparr = np.frombuffer(frame_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        return frame
+    def _decode_frame(self, ctx: FrameContext, input_size: int = INPUT_SIZE):
+        """
+        JPEG 바이트를 OpenCV 이미지로 디코딩
+
+        모델 입력(긴 변 input_size)에 충분한 만큼만 축소 디코딩
+        (피치 크롭 중이면 캐시된 피치 영역의 긴 변 기준)
+        이 프레임에서 원본 해상도가 필요할 것 같으면(공 ROI/슬라이스 탐지) 처음부터 전체 디코딩
+        """
+        size = jpeg_size(ctx.frame_bytes) if self.reduced_decode else None
+        factor = 1
+        if size is not None:
+            ctx.frame_size = size
+            long_side = max(size)
+            region = self.pitch_region.region if (PITCH_CROP and self.pitch_region is not None) else None
+            if region is not None:
+                long_side = max(region[2] - region[0], region[3] - region[1])
+            if not self._wants_full_frame(ctx):
+                factor = plan_reduction(long_side, input_size)
+
+        ctx.frame = decode(ctx.frame_bytes, factor)
+        if ctx.frame is None:
+            raise ValueError("JPEG 디코딩 실패")
+        if factor == 1:
+            ctx.frame_size = (ctx.frame.shape[1], ctx.frame.shape[0])
+            ctx.full_frame = ctx.frame
+        ctx.frame_scale = 1.0 / factor
+        self.metrics.incr("decode.full" if factor == 1 else f"decode.reduced_{factor}")
+
+    def _full_frame(self, ctx: FrameContext) -> np.ndarray:
+        """원본 해상도 프레임 (축소 디코딩한 프레임이면 이때 한 번 더 디코딩)"""
+        if ctx.full_frame is None:
+            ctx.full_frame = decode(ctx.frame_bytes)
+            self.metrics.incr("decode.upgrade")
+        return ctx.full_frame
+
+    def _wants_full_frame(self, ctx: FrameContext) -> bool:
+        """디코딩 전에 이 프레임이 원본 해상도 스테이지를 쓸지 추정 (틀리면 _full_frame이 다시 디코딩)"""
+        if self._ball_roi_steps(ctx) is not None:
+            return True
+        return self._wants_sliced_search(ctx)
+
+    def _wants_sliced_search(self, ctx: FrameContext) -> bool:
+        return BALL_SLICE_SEARCH and ctx.frame_size[1] >= BALL_SLICE_MIN_HEIGHT
+
+    def _within_budget(self, ctx: FrameContext, stage: str, force: bool = False) -> bool:
+        """
+        선택 스테이지를 마감 전에 끝낼 수 있는지 (최근 소요 시간 기준, 처음 한 번은 측정을 위해 실행)
+
+        DEADLINE_MAX_SKIP번 연속 생략했으면 한 번은 실행 (생략만 하면 소요 시간이 갱신되지 않음)
+        생략하면 카운터에 기록 (skipped.{stage})
+        공 스테이지와 후처리 스테이지가 함께 쓰므로 잠금 안에서 판단
+        """
+        with self._budget_lock:
+            if (
+                force
+                or ctx.deadline is None
+                or time.time() + self._stage_costs.get(stage, 0.0) <= ctx.deadline
+                or self._skip_streaks.get(stage, 0) >= DEADLINE_MAX_SKIP
+            ):
+                self._skip_streaks[stage] = 0
+                return True
+            self._skip_streaks[stage] = self._skip_streaks.get(stage, 0) + 1
+        logger.info(f"⏱️ 마감 시간 부족 → {stage} 생략")
+        self.metrics.incr(f"skipped.{stage}")
+        return False
+
+    def _record_cost(self, stage: str, seconds: float):
+        """선택 스테이지 소요 시간 갱신 (지수 이동 평균)"""
+        with self._budget_lock:
+            previous = self._stage_costs.get(stage)
+            self._stage_costs[stage] = seconds if previous is None else 0.8 * previous + 0.2 * seconds
+
+    def _update_frame_interval(self, now: float):
+        """추적 한 스텝 간격 갱신 (지수 이동 평균, 일시정지 같은 긴 공백은 제외)"""
+        if self._last_step_time is not None:
+            interval = now - self._last_step_time
+            if 0 < interval <= MOTION_MAX_INTERVAL:
+                if self._frame_interval == 0:
+                    self._frame_interval = interval
+                else:
+                    self._frame_interval += MOTION_INTERVAL_SMOOTHING * (interval - self._frame_interval)
+        self._last_step_time = now
+
+    def _fill_teams(self, players: List[PlayerDetection]) -> List[PlayerDetection]:
+        """색상 분류를 생략한 프레임의 선수는 같은 트랙의 마지막 팀/색상 사용"""
+        filled = []
+        for player in players:
+            if player.team == "unknown" and player.id in self._track_teams:
+                player = player.model_copy(update=self._track_teams[player.id])
+            filled.append(player)
+        self._track_teams = {
+            p.id: {"team": p.team, "color": p.color} for p in filled if p.team != "unknown"
+        }
+        return filled
+
+    def _quality_rungs(self, keyframe_mode: bool) -> Tuple[str, ...]:
+        """이 파이프라인에 적용할 수 있는 품질 단계 (이미 켜졌거나 쓸 수 없는 단계 제외)"""
+        skip = set()
+        if keyframe_mode:
+            skip.add("keyframes")
+        if not hasattr(self.tracker, "reid_enabled"):
+            skip.add("reid_off")  # ByteTrack은 ReID를 쓰지 않음
+        if self.nano_model is None:
+            skip.add("nano")
+        return tuple(rung for rung in RUNGS if rung not in skip)
+
+    def _detector(self, ctx: FrameContext) -> ModelRunner:
+        """이 프레임에 쓸 탐지기 (캐스케이드 1단계면 nano)"""
+        return self.nano_model if ctx.tier == "nano" else self.model
+
+    def _escalation_reason(self, ctx: FrameContext) -> Optional[str]:
+        """
+        nano 결과가 불확실한 이유 (None이면 nano 결과 사용)
 
-    def _run_yolo(self, frame: np.ndarray):
+        - ball_missing: 공 추적기가 직전까지 공을 보고 있었는데 공 후보가 없음
+        - player_drop: 선수 수가 최근 평균보다 크게 줄어듦
+        - low_confidence: 낮은 신뢰도 선수 박스가 대부분
+        """
+        detections = ctx.detections
+        ball_detections = ctx.ball_detections if ctx.ball_detections is not None else detections
+        tracker = self.ball_tracker
+        if tracker is not None and tracker.confirmed and tracker.frames_since_seen == 0:
+            balls = (ball_detections.cls == BALL_CLASS_ID) & (ball_detections.conf >= BALL_CONFIDENCE_THRESHOLD)
+            if not balls.any():
+                return "ball_missing"
+
+        person_conf = detections.conf[detections.cls == PERSON_CLASS_ID]
+        if (
+            self._player_count_avg is not None
+            and len(person_conf) < (1 - CASCADE_PLAYER_DROP) * self._player_count_avg
+        ):
+            return "player_drop"
+
+        if len(person_conf) >= CASCADE_MIN_BOXES and (person_conf < CASCADE_LOW_CONFIDENCE).mean() > CASCADE_LOW_RATIO:
+            return "low_confidence"
+        return None
+
+    def _update_player_count(self, ctx: FrameContext):
+        """최종 탐지의 선수 수로 최근 평균 갱신 (공 스테이지는 프레임 순서대로 실행)"""
+        count = int((ctx.detections.cls == PERSON_CLASS_ID).sum())
+        if self._player_count_avg is None:
+            self._player_count_avg = float(count)
+        else:
+            self._player_count_avg = 0.8 * self._player_count_avg + 0.2 * count
+
+    def _run_yolo(self, ctx: FrameContext) -> Detections:
         """YOLO 추론 실행 (일반 - 선수용)"""
-        results = self.model(
-            frame,
-            imgsz=INPUT_SIZE,
+        results = self._detector(ctx)(
+            ctx.input,
+            imgsz=list(ctx.input.shape[:2]),
             conf=CONFIDENCE_THRESHOLD,
             iou=IOU_THRESHOLD,
             verbose=False,  # 로그 출력 안함
         )
-        return results[0]  # 첫 번째 이미지 결과만 사용
+        # 첫 번째 이미지 결과만 사용, 프레임 좌표로 복원
+        return Detections.from_yolo(results[0], ctx.letterbox)
 
-    def _run_yolo_for_ball(self, frame: np.ndarray):
+    def _run_yolo_for_ball(self, ctx: FrameContext) -> Detections:
         """
         YOLO 추론 실행 (공 전용 - 낮은 임계값)
 
         사전학습 모델이 축구공을 잘 탐지하지 못하므로
         낮은 신뢰도로 재실행
         """
-        from config import BALL_CONFIDENCE_THRESHOLD
-
-        results = self.model(
-            frame,
-            imgsz=INPUT_SIZE,
+        results = self._detector(ctx)(
+            ctx.input,
+            imgsz=list(ctx.input.shape[:2]),
             conf=BALL_CONFIDENCE_THRESHOLD,  # 낮은 임계값
             iou=IOU_THRESHOLD,
             classes=[BALL_CLASS_ID],  # sports ball만
             verbose=False,
         )
-        return results[0]
+        return Detections.from_yolo(results[0], ctx.letterbox)
+
+    def _ball_roi_steps(self, ctx: FrameContext) -> Optional[int]:
+        """
+        공 추적기 상태에서 이 프레임까지 예측할 스텝 수 (None이면 ROI 탐지 안 함)
+
+        스테이지가 겹쳐 실행되므로 공 추적기는 이 프레임보다 몇 프레임 뒤처져 있을 수 있음
+        → 추적기에 마지막으로 반영된 프레임 순번과의 차이만큼 예측
+        (일시정지/실패한 프레임도 후처리가 다음에 반영한 순번으로 따라잡으므로 차이가 쌓이지 않음)
+        차이가 BALL_ROI_MAX_STEPS를 넘으면 예측을 믿지 않고 전체 프레임 탐지
+        """
+        tracker = self.ball_tracker
+        last = self._ball_index
+        if not BALL_ROI_SEARCH or tracker is None or last is None or not tracker.active:
+            return None
+        if tracker.frames_since_seen >= BALL_ROI_MAX_LOST:
+            return None
+        steps = ctx.index - last
+        if steps > BALL_ROI_MAX_STEPS:
+            return None
+        return steps
+
+    def _ball_roi(self, ctx: FrameContext) -> Optional[Tuple[int, int, int, int]]:
+        """공 ROI 탐지 영역 (None이면 전체 프레임 탐지, 뒤처진 스텝만큼 앞으로 예측한 위치 기준)"""
+        steps = self._ball_roi_steps(ctx)
+        if steps is None:
+            return None
+        w, h = ctx.frame_size
+        return self.ball_tracker.search_window(w, h, steps=steps)
+
+    def _run_yolo_for_ball_roi(self, ctx: FrameContext, roi: Tuple[int, int, int, int]) -> Detections:
+        """ROI를 원본 해상도 그대로(축소 없이) 공 클래스만 탐지 → 프레임 좌표"""
+        x1, y1, x2, y2 = roi
+        crop, info = letterbox(self._full_frame(ctx)[y1:y2, x1:x2], max(x2 - x1, y2 - y1))
+        results = self._detector(ctx)(
+            crop,
+            imgsz=list(crop.shape[:2]),
+            conf=BALL_ROI_CONFIDENCE,
+            iou=IOU_THRESHOLD,
+            classes=[BALL_CLASS_ID],
+            verbose=False,
+        )
+        detections = Detections.from_yolo(results[0], info)
+        detections.xyxy[:, 0::2] += x1
+        detections.xyxy[:, 1::2] += y1
+        return detections
+
+    def _run_yolo_for_ball_sliced(self, ctx: FrameContext) -> Detections:
+        """
+        겹치는 원본 해상도 타일을 한 배치로 공 탐지 → 교차 타일 NMS → 프레임 좌표
+
+        잔디가 거의 없는 타일(관중석, 광고판)은 추론하지 않음
+        """
+        frame = self._full_frame(ctx)
+        h, w = frame.shape[:2]
+        pitch = ctx.pitch_mask if ctx.pitch_mask is not None else PitchMask.from_frame(frame)
+        tiles = [
+            tile for tile in tile_grid(w, h, BALL_SLICE_SIZE, BALL_SLICE_OVERLAP)
+            if pitch.ratio(tile) >= BALL_SLICE_MIN_PITCH
+        ]
+        if not tiles:
+            return Detections.empty()
+
+        # 모든 타일이 같은 stride 배수 크기 → letterbox 없이 그대로 모델 입력
+        tile_w, tile_h = tiles[0][2] - tiles[0][0], tiles[0][3] - tiles[0][1]
+        identity = LetterboxInfo(1.0, 0, 0, tile_w, tile_h)
+        results = self._detector(ctx)(
+            [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles],
+            imgsz=[tile_h, tile_w],
+            conf=BALL_CONFIDENCE_THRESHOLD,
+            iou=IOU_THRESHOLD,
+            classes=[BALL_CLASS_ID],
+            verbose=False,
+        )
+
+        parts = []
+        for (x1, y1, _, _), result in zip(tiles, results):
+            detections = Detections.from_yolo(result, identity)
+            detections.xyxy[:, 0::2] += x1
+            detections.xyxy[:, 1::2] += y1
+            parts.append(detections)
+        merged = Detections.concat(parts)
+        keep = nms(merged.xyxy, merged.conf, IOU_THRESHOLD)
+        return Detections(merged.xyxy[keep], merged.conf[keep], merged.cls[keep])
 
     def _extract_ball(
-        self, detections, frame: np.ndarray
+        self, detections: Detections, frame: np.ndarray
     ) -> Optional[BallDetection]:
         """
         공 탐지 결과 추출
@@ -181,24 +1021,18 @@ class InferencePipeline:
         Note: 사전학습 모델이 축구공을 잘 탐지하지 못하므로
         낮은 신뢰도의 탐지도 허용 (추후 파인튜닝으로 개선 예정)
         """
-        boxes = detections.boxes
-
-        # BALL_CONFIDENCE_THRESHOLD import 추가 필요
-        from config import BALL_CONFIDENCE_THRESHOLD
-
         best_ball = None
         best_conf = 0.0
 
-        for i in range(len(boxes)):
-            cls = int(boxes.cls[i])
-            conf = float(boxes.conf[i])
+        for i in range(len(detections)):
+            cls = int(detections.cls[i])
+            conf = float(detections.conf[i])
 
             # sports ball이고 최소 임계값 이상이면
             if cls == BALL_CLASS_ID and conf >= BALL_CONFIDENCE_THRESHOLD:
                 # 가장 신뢰도 높은 공 선택
                 if conf > best_conf:
-                    box = boxes.xyxy[i].cpu().numpy()
-                    x1, y1, x2, y2 = box
+                    x1, y1, x2, y2 = detections.xyxy[i]
 
                     best_ball = BallDetection(
                         x=float((x1 + x2) / 2),
@@ -211,20 +1045,38 @@ class InferencePipeline:
 
         return best_ball
 
+    def _drop_off_pitch(self, detections: Detections, pitch: PitchMask) -> Detections:
+        """
+        발 위치(박스 아래 중앙)가 피치 밖인 person 탐지 제거 (관중, 볼보이, 벤치)
+
+        색상 추출/KMeans/추적/임베딩 전에 걸러서 이후 단계 비용을 줄임
+        클로즈업처럼 잔디가 적은 샷은 피치를 알 수 없으므로 그대로 둠
+        """
+        if not pitch.is_wide or len(detections) == 0:
+            return detections
+        feet = np.stack([(detections.xyxy[:, 0] + detections.xyxy[:, 2]) / 2, detections.xyxy[:, 3]], axis=1)
+        keep = (detections.cls != PERSON_CLASS_ID) | pitch.contains(feet)
+        if not keep.all():
+            logger.info(f"🔍 피치 밖 탐지 {int((~keep).sum())}개 제외")
+        return Detections(detections.xyxy[keep], detections.conf[keep], detections.cls[keep])
+
     def _extract_players(
-        self, detections, frame: np.ndarray
+        self, detections: Detections, frame: np.ndarray, frame_scale: float = 1.0, colors: bool = True
     ) -> List[PlayerDetection]:
-        """선수 탐지 결과 추출"""
-        boxes = detections.boxes
+        """
+        선수 탐지 결과 추출 (frame_scale: 축소 디코딩 비율, 박스는 원본 좌표)
+
+        colors=False면 유니폼 색상/팀 분류 생략 (team="unknown", 추적 후 트랙의 이전 팀 사용)
+        """
         players = []
 
-        logger.info(f"🔍 _extract_players: 총 {len(boxes)} 개 박스")
+        logger.info(f"🔍 _extract_players: 총 {len(detections)} 개 박스")
 
         # person 클래스만 필터링
         person_indices = []
-        for i in range(len(boxes)):
-            cls = int(boxes.cls[i])
-            conf = float(boxes.conf[i])
+        for i in range(len(detections)):
+            cls = int(detections.cls[i])
+            conf = float(detections.conf[i])
             logger.info(f"  - 박스 #{i}: class={cls}, conf={conf:.3f}")
             if cls == PERSON_CLASS_ID:
                 person_indices.append(i)
@@ -234,24 +1086,31 @@ class InferencePipeline:
         if not person_indices:
             return players
 
-        # 유니폼 색상 추출
-        uniform_colors = []
-        for i in person_indices:
-            box = boxes.xyxy[i].cpu().numpy()
-            color = self._extract_uniform_color(box, frame)
-            uniform_colors.append(color)
-
-        # 팀 분류 (K-means)
-        team_labels = self._cluster_teams(uniform_colors)
+        if colors:
+            start = time.perf_counter()
+            # 유니폼 색상 추출
+            uniform_colors = []
+            for i in person_indices:
+                color = self._extract_uniform_color(detections.xyxy[i] * frame_scale, frame)
+                uniform_colors.append(color)
+
+            # 팀 분류 (K-means)
+            team_labels = self._cluster_teams(uniform_colors)
+            self._record_cost("colors", time.perf_counter() - start)
+        else:
+            uniform_colors = [[128, 128, 128]] * len(person_indices)
+            team_labels = [None] * len(person_indices)
 
         # PlayerDetection 객체 생성
         for idx, i in enumerate(person_indices):
-            box = boxes.xyxy[i].cpu().numpy()
-            conf = float(boxes.conf[i])
-            x1, y1, x2, y2 = map(float, box)  # numpy float32 → Python float
+            conf = float(detections.conf[i])
+            x1, y1, x2, y2 = map(float, detections.xyxy[i])  # numpy float32 → Python float
 
             team_label = team_labels[idx]
-            team_name = "home" if team_label == 0 else "away"
+            if team_label is None:
+                team_name = "unknown"
+            else:
+                team_name = "home" if team_label == 0 else "away"
 
             players.append(
                 PlayerDetection(
@@ -268,6 +1127,60 @@ class InferencePipeline:
 
         return players
 
+    def _reset_propagation(
+        self,
+        ctx: FrameContext,
+        players: List[PlayerDetection],
+        ball: Optional[BallDetection],
+    ):
+        """키프레임 탐지 결과를 전파 기준으로 저장 (박스 순서: 선수들, 공)"""
+        self._propagated_players = players
+        self._propagated_ball = ball
+
+        items = players + ([ball] if ball is not None else [])
+        boxes = np.array(
+            [[p.x - p.width / 2, p.y - p.height / 2, p.x + p.width / 2, p.y + p.height / 2] for p in items],
+            dtype=np.float32,
+        ).reshape(-1, 4)
+        confidences = np.array([p.confidence for p in items], dtype=np.float32)
+        self.propagator.reset(ctx.flow_gray, boxes, confidences)
+
+    def _propagate(
+        self, ctx: FrameContext
+    ) -> Optional[Tuple[List[PlayerDetection], Optional[BallDetection]]]:
+        """
+        마지막 키프레임 결과를 현재 프레임으로 전파
+
+        Returns:
+            (선수 리스트, 공) 또는 None (흐름 추적 실패 → 즉시 탐지 필요)
+        """
+        boxes, confidences, valid_ratio = self.propagator.propagate(ctx.flow_gray, ctx.flow_scale)
+        mean_conf = float(confidences.mean()) if len(confidences) else 0.0
+        self.keyframes.update(self.propagator.motion, valid_ratio, mean_conf)
+
+        if len(boxes) == 0 or valid_ratio < KEYFRAME_MIN_VALID_RATIO:
+            return None
+
+        def moved(item, box, conf):
+            x1, y1, x2, y2 = map(float, box)
+            return item.model_copy(update={
+                "x": (x1 + x2) / 2,
+                "y": (y1 + y2) / 2,
+                "width": x2 - x1,
+                "height": y2 - y1,
+                "confidence": float(conf),
+            })
+
+        players = [
+            moved(player, boxes[i], confidences[i])
+            for i, player in enumerate(self._propagated_players)
+        ]
+        ball = None
+        if self._propagated_ball is not None:
+            ball = moved(self._propagated_ball, boxes[-1], confidences[-1])
+
+        return players, ball
+
     def _extract_uniform_color(
         self, box: np.ndarray, frame: np.ndarray
     ) -> List[int]:
@@ -308,9 +1221,22 @@ class InferencePipeline:
         # K-means 클러스터링
         kmeans = KMeans(n_clusters=N_TEAMS, random_state=42, n_init=10)
         labels = kmeans.fit_predict(uniform_colors)
+        centers = kmeans.cluster_centers_
+
+        # 같은 샷 안에서는 이전 팀 색상과 가장 가까운 순서로 라벨 정렬 (home/away 뒤바뀜 방지)
+        if self.team_colors is not None:
+            prev = np.array(self.team_colors, dtype=float)
+            order = min(
+                itertools.permutations(range(N_TEAMS)),
+                key=lambda perm: sum(
+                    np.linalg.norm(centers[c] - prev[team]) for team, c in enumerate(perm)
+                ),
+            )
+            centers = centers[list(order)]
+            labels = np.argsort(order)[labels]
 
         # 팀 색상 저장 (다음 프레임에서 일관성 유지용)
-        self.team_colors = kmeans.cluster_centers_.astype(int).tolist()
+        self.team_colors = centers.astype(int).tolist()
 
         return labels.tolist()
 
@@ -327,6 +1253,8 @@ class InferencePipeline:
         Returns:
             BallOwner 또는 None (공이 없거나 너무 멀 때)
         """
+        # 이번 프레임에 실제로 보인 선수만 (추적기 예측 위치는 제외)
+        players = [p for p in players if not p.predicted]
         if ball is None or len(players) == 0:
             return None
 
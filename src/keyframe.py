@@ -0,0 +1,199 @@
+"""
+키프레임 탐지 + 움직임 전파
+YOLO는 K 프레임마다(키프레임) 또는 신뢰도가 떨어졌을 때만 실행하고,
+사이 프레임에서는 이전 박스를 광학 흐름으로 옮겨서 사용
+
+- 축소된 그레이 프레임에서 희소 Lucas-Kanade 광학 흐름 (박스 안 격자 점)
+- 흐름이 실패한 박스는 등속 모델(α-β, 정상상태 칼만)로 예측
+- 장면 움직임이 크면 K를 줄이고, 작으면 늘림
+"""
+
+import logging
+import threading
+import numpy as np
+import cv2
+from typing import Optional, Tuple
+
+from config import (
+    KEYFRAME_MIN_INTERVAL,
+    KEYFRAME_MAX_INTERVAL,
+    KEYFRAME_MOTION_LOW,
+    KEYFRAME_MOTION_HIGH,
+    KEYFRAME_FLOW_WIDTH,
+    KEYFRAME_MIN_VALID_RATIO,
+    KEYFRAME_MIN_CONFIDENCE,
+    KEYFRAME_CONF_DECAY,
+)
+
+logger = logging.getLogger(__name__)
+
+# 박스 하나에서 추적할 점 격자 (GRID x GRID)
+GRID = 3
+
+# α-β 필터 게인 (측정된 이동량을 속도에 반영하는 비율)
+VELOCITY_GAIN = 0.5
+
+LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+)
+
+
+def prepare_flow_frame(frame: np.ndarray, width: int = KEYFRAME_FLOW_WIDTH) -> Tuple[np.ndarray, float]:
+    """
+    광학 흐름용 축소 그레이 프레임 생성
+
+    Returns:
+        (그레이 프레임, 축소 비율 = 축소 크기 / 원본 크기)
+    """
+    h, w = frame.shape[:2]
+    scale = min(1.0, width / w)
+    if scale < 1.0:
+        frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), scale
+
+
+class MotionPropagator:
+    """
+    박스 목록을 프레임 간 광학 흐름으로 전파
+
+    박스는 원본 프레임 좌표 xyxy (N, 4), 흐름 계산만 축소 프레임에서 수행
+    """
+
+    def __init__(self):
+        self.prev_gray: Optional[np.ndarray] = None
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.velocities = np.zeros((0, 2), dtype=np.float32)  # 원본 좌표 px/frame
+        self.confidences = np.zeros(0, dtype=np.float32)
+        self.motion = 0.0  # 최근 전역 움직임 크기 (원본 좌표 px/frame)
+
+    def reset(self, gray: np.ndarray, boxes: np.ndarray, confidences: np.ndarray):
+        """키프레임: 새 탐지 박스로 상태 초기화"""
+        self.prev_gray = gray
+        self.boxes = boxes.astype(np.float32).reshape(-1, 4)
+        self.velocities = np.zeros((len(self.boxes), 2), dtype=np.float32)
+        self.confidences = confidences.astype(np.float32)
+
+    def propagate(self, gray: np.ndarray, scale: float) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        이전 박스를 현재 프레임으로 전파
+
+        Args:
+            gray: 현재 축소 그레이 프레임
+            scale: 축소 비율 (prepare_flow_frame 반환값)
+
+        Returns:
+            (전파된 박스 (N, 4), 박스별 신뢰도 (N,), 흐름이 유효했던 박스 비율)
+        """
+        n = len(self.boxes)
+        if self.prev_gray is None or n == 0:
+            self.prev_gray = gray
+            return self.boxes, self.confidences, 0.0
+
+        # 박스마다 GRID x GRID 점 (가장자리 배경을 피하려고 안쪽 60%만)
+        ts = np.linspace(0.2, 0.8, GRID, dtype=np.float32)
+        gx, gy = np.meshgrid(ts, ts)
+        gx, gy = gx.ravel(), gy.ravel()
+        x1, y1, x2, y2 = (self.boxes[:, i:i + 1] for i in range(4))
+        points = np.stack(
+            [x1 + (x2 - x1) * gx, y1 + (y2 - y1) * gy], axis=-1
+        ).reshape(-1, 1, 2) * scale
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(
+            self.prev_gray, gray, points.astype(np.float32), None, **LK_PARAMS
+        )
+
+        displacement = (next_points - points).reshape(n, GRID * GRID, 2) / scale
+        valid = status.reshape(n, GRID * GRID).astype(bool)
+
+        # 박스별 중앙값 이동량 (점 절반 이상이 추적되어야 유효)
+        box_valid = valid.sum(axis=1) >= (GRID * GRID) // 2 + 1
+        measured = np.zeros((n, 2), dtype=np.float32)
+        for i in np.flatnonzero(box_valid):
+            measured[i] = np.median(displacement[i][valid[i]], axis=0)
+
+        # 측정 성공 박스는 α-β 갱신, 실패 박스는 등속 예측
+        self.velocities[box_valid] += VELOCITY_GAIN * (measured[box_valid] - self.velocities[box_valid])
+        step = np.where(box_valid[:, None], measured, self.velocities)
+        self.boxes = self.boxes + np.tile(step, 2)
+
+        self.confidences = self.confidences * np.where(
+            box_valid, KEYFRAME_CONF_DECAY, KEYFRAME_CONF_DECAY ** 3
+        ).astype(np.float32)
+
+        if box_valid.any():
+            self.motion = float(np.median(np.linalg.norm(measured[box_valid], axis=1)))
+
+        self.prev_gray = gray
+        return self.boxes, self.confidences, float(box_valid.mean())
+
+
+class KeyframeScheduler:
+    """
+    키프레임 결정
+
+    - 마지막 키프레임 이후 interval 프레임이 지나면 키프레임
+    - interval은 장면 움직임에 따라 MIN~MAX 사이에서 조정
+    - 전파 신뢰도가 떨어지면 다음 프레임을 강제로 키프레임
+
+    next_is_keyframe / force_keyframe는 디코딩 스테이지, update는 후처리 스테이지에서
+    호출되므로 상태는 잠금 안에서만 읽고 씀
+    """
+
+    def __init__(
+        self,
+        min_interval: int = KEYFRAME_MIN_INTERVAL,
+        max_interval: int = KEYFRAME_MAX_INTERVAL,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.since_keyframe = 0
+        self._force = True  # 첫 프레임은 항상 키프레임
+        self._lock = threading.Lock()
+
+        # 통계
+        self.keyframes = 0
+        self.frames = 0
+
+    def next_is_keyframe(self) -> bool:
+        """다음 프레임이 키프레임인지 결정 (프레임 순서대로 호출)"""
+        with self._lock:
+            self.frames += 1
+            if self._force or self.since_keyframe + 1 >= self.interval:
+                self._force = False
+                self.since_keyframe = 0
+                self.keyframes += 1
+                return True
+
+            self.since_keyframe += 1
+            return False
+
+    def force_keyframe(self):
+        """다음 프레임을 키프레임으로 (신뢰도 하락, 카메라 전환 등)"""
+        with self._lock:
+            self._force = True
+
+    def update(self, motion: float, valid_ratio: float, confidence: float):
+        """
+        전파 결과로 interval 조정 및 강제 키프레임 판단
+
+        Args:
+            motion: 전역 움직임 크기 (원본 좌표 px/frame)
+            valid_ratio: 흐름이 유효했던 박스 비율
+            confidence: 전파된 박스의 평균 신뢰도
+        """
+        # 움직임이 LOW 이하면 MAX, HIGH 이상이면 MIN, 사이는 선형 보간
+        t = (motion - KEYFRAME_MOTION_LOW) / max(KEYFRAME_MOTION_HIGH - KEYFRAME_MOTION_LOW, 1e-6)
+        t = min(1.0, max(0.0, t))
+        interval = int(round(self.max_interval - t * (self.max_interval - self.min_interval)))
+        force = valid_ratio < KEYFRAME_MIN_VALID_RATIO or confidence < KEYFRAME_MIN_CONFIDENCE
+        with self._lock:
+            self.interval = interval
+            self._force = self._force or force
+
+    @property
+    def detector_call_ratio(self) -> float:
+        """전체 프레임 중 YOLO를 실행한 비율"""
+        return self.keyframes / self.frames if self.frames else 1.0
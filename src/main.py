@@ -4,14 +4,14 @@ FastAPI WebSocket 서버
 """
 
 import logging
-import asyncio
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List
-import base64
 
-from inference import InferencePipeline
+from sessions import SessionManager, LocalBackend
+from models import RosterData
+from scheduler import FrameScheduler
+from ws_session import run_session, notify_grant, latency
 from config import HOST, PORT, CORS_ORIGINS
 
 # 로깅 설정
@@ -33,16 +33,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# YOLO 파이프라인 (서버 시작 시 한 번만 로드)
-pipeline = None
+# 세션별 YOLO 파이프라인 (모델은 서버 시작 시 한 번만 로드해서 공유)
+sessions = None
+backend = None
+scheduler = None
 
 
 @app.on_event("startup")
 async def startup_event():
     """서버 시작 시 모델 로딩"""
-    global pipeline
+    global sessions, backend, scheduler
     logger.info("서버 시작 중...")
-    pipeline = InferencePipeline()
+    sessions = SessionManager()
+    backend = LocalBackend(sessions)
+
+    # 전역 프레임 예산 + 세션별 공정 스케줄링
+    scheduler = FrameScheduler(on_grant=notify_grant)
+    scheduler.start()
     logger.info(f"서버 준비 완료! ws://{HOST}:{PORT}/ws")
 
 
@@ -59,23 +66,23 @@ async def root():
 @app.get("/health")
 async def health():
     """상태 확인"""
-    return {"status": "healthy", "model_loaded": pipeline is not None}
-
-
-# ============ Phase 3: 선수 명단 관리 API ============
+    return {
+        "status": "healthy",
+        "model_loaded": sessions is not None,
+        "load": sessions.load() if sessions is not None else None,
+        "scheduler": scheduler.status() if scheduler is not None else None,
+    }
 
-class PlayerInfo(BaseModel):
-    """선수 정보"""
-    name: str
-    number: int
-    position: str = None
 
+@app.get("/api/metrics")
+async def metrics():
+    """파이프라인 카운터 (탐지기 캐스케이드 단계별 적중률 등) + 구간별 지연"""
+    if sessions is None:
+        return {"status": "error", "message": "Pipeline not initialized"}
+    return {**sessions.metrics(), "latency": latency.summary()}
 
-class RosterData(BaseModel):
-    """팀 명단"""
-    home: List[PlayerInfo]
-    away: List[PlayerInfo]
 
+# ============ Phase 3: 선수 명단 관리 API ============
 
 @app.post("/api/roster")
 async def set_roster(roster: RosterData):
@@ -93,20 +100,20 @@ async def set_roster(roster: RosterData):
         ]
     }
     """
-    if pipeline is None:
+    if sessions is None:
         return {"status": "error", "message": "Pipeline not initialized"}
 
     # Pydantic 모델을 dict로 변환
     home_players = [p.model_dump() for p in roster.home]
     away_players = [p.model_dump() for p in roster.away]
 
-    pipeline.matcher.set_roster(home_players, away_players)
+    sessions.matcher.set_roster(home_players, away_players)
 
     logger.info(f"명단 설정: 홈 {len(home_players)}명, 원정 {len(away_players)}명")
 
     return {
         "status": "success",
-        "roster": pipeline.matcher.get_roster_summary()
+        "roster": sessions.matcher.get_roster_summary()
     }
 
 
@@ -122,10 +129,10 @@ async def match_player(track_id: int, team: str, number: int):
         "number": 7
     }
     """
-    if pipeline is None:
+    if sessions is None:
         return {"status": "error", "message": "Pipeline not initialized"}
 
-    pipeline.matcher.match_player(track_id, team, number)
+    sessions.matcher.match_player(track_id, team, number)
 
     return {
         "status": "success",
@@ -136,13 +143,13 @@ async def match_player(track_id: int, team: str, number: int):
 @app.get("/api/roster")
 async def get_roster():
     """현재 명단 조회"""
-    if pipeline is None:
+    if sessions is None:
         return {"status": "error", "message": "Pipeline not initialized"}
 
     return {
         "status": "success",
-        "roster": pipeline.matcher.roster,
-        "summary": pipeline.matcher.get_roster_summary()
+        "roster": sessions.matcher.roster,
+        "summary": sessions.matcher.get_roster_summary()
     }
 
 
@@ -176,60 +183,9 @@ async def receive_log(log: ExtensionLog):
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket 엔드포인트
-    프레임을 받아서 YOLO 추론 후 결과 반환
+    프레임을 받아서 YOLO 추론 후 결과 반환 (연결마다 별도 세션)
     """
-    await websocket.accept()
-    logger.info("WebSocket 클라이언트 연결됨")
-
-    frame_count = 0
-
-    # 즉시 테스트 메시지 전송
-    logger.info("테스트 메시지 전송 중...")
-    await websocket.send_json({"test": "hello from server", "status": "connected"})
-    logger.info("테스트 메시지 전송 완료")
-
-    try:
-        while True:
-            # 프레임 수신
-            data = await websocket.receive_text()
-            frame_count += 1
-
-            logger.info(f"프레임 #{frame_count} 수신 (크기: {len(data)} bytes)")
-
-            # JSON 파싱 (또는 직접 Base64 디코딩)
-            # 일단 간단하게 Base64 문자열로 받는다고 가정
-            try:
-                # "data:image/jpeg;base64," 프리픽스 제거
-                if data.startswith("data:image"):
-                    data = data.split(",")[1]
-
-                # Base64 디코딩
-                frame_bytes = base64.b64decode(data)
-                logger.info(f"프레임 #{frame_count} 디코딩 완료 ({len(frame_bytes)} bytes)")
-
-                # YOLO 추론
-                result = pipeline.process(frame_bytes)
-                logger.info(f"프레임 #{frame_count} 처리 완료 - 선수: {len(result.players)}명, 공: {'O' if result.ball else 'X'}")
-
-                # 결과 전송 (Pydantic 모델이 자동으로 JSON 변환)
-                result_json = result.model_dump()
-                logger.info(f"프레임 #{frame_count} JSON 생성 완료 (크기: {len(str(result_json))} chars)")
-
-                await websocket.send_json(result_json)
-                logger.info(f"프레임 #{frame_count} 응답 전송 완료")
-
-            except Exception as e:
-                logger.error(f"프레임 처리 중 에러: {e}")
-                import traceback
-                logger.error(traceback.format_exc())
-                await websocket.send_json(
-                    {"error": str(e), "status": "processing_failed"}
-                )
-
-    except WebSocketDisconnect:
-        logger.info("WebSocket 클라이언트 연결 끊김")
-    except Exception as e:
-        logger.error(f"WebSocket 에러: {e}")
+    await run_session(websocket, backend, scheduler)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+"""
+파이프라인 카운터
+세션 파이프라인마다 이벤트 횟수를 세고, SessionManager가 합쳐서 /api/metrics로 보고
+
+이름은 "그룹.항목" 형식 (예: detector.nano, detector.small)
+→ 같은 그룹 안의 비율(적중률)을 shares()로 계산
+
+구간별 지연(네트워크, 큐 대기, 추론 등)은 LatencyStats가 최근 샘플로 평균/백분위 계산
+"""
+
+import threading
+from collections import Counter, deque
+from typing import Deque, Dict, Iterable
+
+import numpy as np
+
+from config import LATENCY_WINDOW
+
+
+class Metrics:
+    """이름별 누적 카운터 (스테이지 스레드에서 동시에 증가해도 안전)"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def incr(self, name: str, n: int = 1):
+        with self.lock:
+            self.counts[name] += n
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
+
+
+def merge(snapshots: Iterable[Dict[str, int]]) -> Dict[str, int]:
+    """여러 파이프라인 카운터 합산"""
+    total: Counter = Counter()
+    for snapshot in snapshots:
+        total.update(snapshot)
+    return dict(total)
+
+
+def shares(counts: Dict[str, int], group: str) -> Dict[str, float]:
+    """
+    그룹 안 항목별 비율 (예: shares(counts, "detector") → {"nano": 0.9, "small": 0.1})
+
+    Returns:
+        항목 → 비율 (그룹 카운트가 없으면 빈 dict)
+    """
+    prefix = group + "."
+    items = {name[len(prefix):]: n for name, n in counts.items() if name.startswith(prefix)}
+    total = sum(items.values())
+    if total == 0:
+        return {}
+    return {name: round(n / total, 3) for name, n in sorted(items.items())}
+
+
+class LatencyStats:
+    """구간 이름별 최근 지연 샘플 (초) → 평균/백분위 요약"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self.samples: Dict[str, Deque[float]] = {}
+        self.counts: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self.lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+            self.samples[name].append(seconds)
+            self.counts[name] += 1
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Returns:
+            구간 → {"count": 누적 샘플 수, "mean_ms", "p50_ms", "p95_ms", "max_ms": 최근 window개 기준}
+        """
+        with self.lock:
+            samples = {name: np.array(values) * 1000 for name, values in self.samples.items()}
+            counts = dict(self.counts)
+        return {
+            name: {
+                "count": counts[name],
+                "mean_ms": round(float(ms.mean()), 1),
+                "p50_ms": round(float(np.percentile(ms, 50)), 1),
+                "p95_ms": round(float(np.percentile(ms, 95)), 1),
+                "max_ms": round(float(ms.max()), 1),
+            }
+            for name, ms in sorted(samples.items())
+        }
@@ -16,6 +16,19 @@ class BallDetection(BaseModel):
     confidence: float
 
 
+class BallState(BaseModel):
+    """공 추적 상태 (칼만 필터, 원본 프레임 좌표, 프레임 단위)"""
+    x: float
+    y: float
+    vx: float
+    vy: float
+    ax: float
+    ay: float
+    uncertainty: float  # 위치 불확실성 (px, 1σ)
+    predicted: bool = False  # True면 이번 프레임 탐지 없이 예측한 위치
+    frames_since_seen: int = 0
+
+
 class PlayerDetection(BaseModel):
     """선수 탐지 결과"""
     id: int
@@ -26,6 +39,9 @@ class PlayerDetection(BaseModel):
     team: str  # "home" | "away" | "unknown"
     color: List[int]  # RGB [r, g, b]
     confidence: float
+    predicted: bool = False  # True면 이번 프레임 탐지 없이 추적기가 예측한 위치
+    vx: float = 0.0  # 박스 중심 속도 (px/프레임, 카메라 이동 제외, 추적 중일 때만)
+    vy: float = 0.0
     # Phase 3에서 추가될 필드
     number: Optional[int] = None
     name: Optional[str] = None
@@ -44,5 +60,55 @@ class DetectionResult(BaseModel):
     timestamp: float
     fps: float
     ball: Optional[BallDetection] = None
+    ball_state: Optional[BallState] = None  # 공 추적 상태 (추적 중일 때만)
     players: List[PlayerDetection]
     ball_owner: Optional[BallOwner] = None
+    keyframe: bool = True  # False면 YOLO 없이 이전 키프레임 박스를 전파한 결과
+    shot_id: int = 0  # 샷(카메라 컷) 번호, 바뀌면 트랙 ID가 새로 시작됨
+    shot_type: str = "wide"  # 샷 유형 ("wide" | "close" | "other")
+    hud_paused: bool = False  # 와이드 샷이 아니라 추론을 건너뜀 (선수/공 없음)
+    quality_level: int = 0  # 적응형 품질 레벨 (0 = 기본, 높을수록 싼 설정)
+    stages_run: List[str] = []  # 이 프레임에서 실행한 스테이지 (마감 시간 때문에 생략한 선택 스테이지는 빠짐)
+    # 움직임 상태 기준 (위치 = 이 시각의 위치, 속도/가속도는 추적 한 스텝(frame_interval초) 단위)
+    reference_time: float = 0.0  # 프레임 캡처 시각 (서버 시계, 클라이언트 시계 차이를 모르면 서버 수신 시각)
+    frame_interval: float = 0.0  # 추적 한 스텝의 평균 간격 (초, 0이면 외삽하지 않음)
+    camera_shift: List[float] = [0.0, 0.0]  # 직전 스텝 카메라 이동 (px/프레임, 화면 속도 = 트랙 속도 + 이 값)
+    # 지연 추적 (초, frame_id/capture_ts는 클라이언트가 보낸 값을 그대로 돌려줌)
+    frame_id: Optional[int] = None
+    capture_ts: Optional[float] = None  # 클라이언트 캡처 시각 (클라이언트 시계)
+    receive_ts: Optional[float] = None  # 서버 WebSocket 수신
+    start_ts: float = 0.0  # 추론 시작 (디코딩 스테이지 진입, 추론 노드 시계)
+    end_ts: float = 0.0  # 추론 끝 (결과 생성)
+    send_ts: Optional[float] = None  # 서버 WebSocket 전송 직전
+
+
+class Prediction(BaseModel):
+    """요청한 시각의 예측 위치 (WebSocket "prediction" 메시지)"""
+    type: str = "prediction"
+    time: float  # 요청 시각 (reference_time과 같은 시계)
+    reference_time: float  # 외삽에 쓴 결과의 기준 시각
+    players: List[PlayerDetection]
+    ball: Optional[BallDetection] = None
+
+
+class CaptureProfile(BaseModel):
+    """서버가 원하는 캡처 설정 (WebSocket "profile" 메시지)"""
+    type: str = "profile"
+    max_width: int  # 비율을 유지한 채 이 박스 안으로 축소해서 캡처 (확대하지 않음)
+    max_height: int
+    jpeg_quality: int  # 0~100
+    fps: float  # 스케줄러가 허용한 FPS
+    loaded: bool = False  # True면 서버 과부하 프로파일
+
+
+class PlayerInfo(BaseModel):
+    """선수 정보"""
+    name: str
+    number: int
+    position: str = None
+
+
+class RosterData(BaseModel):
+    """팀 명단 (/api/roster 요청)"""
+    home: List[PlayerInfo]
+    away: List[PlayerInfo]
@@ -0,0 +1,66 @@
+"""
+움직임 상태로 임의 시각의 위치 예측
+추론은 10~30 FPS지만 HUD는 60Hz로 그리므로, 결과 사이 위치를 외삽해서 부드럽게 표시
+
+- 결과의 위치는 reference_time(프레임 수신 시각) 기준
+- 선수: 등속 (vx, vy), 공: 등가속도 (ball_state의 vx, vy, ax, ay), 단위는 추적 한 스텝
+- 초 단위 시각 차이는 frame_interval(추적 스텝 평균 간격)로 스텝 수로 바꿈
+- 카메라 이동(camera_shift)은 트랙 속도에 빠져 있으므로 모든 대상에 더함
+- 기준 시각에서 PREDICT_MAX_AHEAD초 넘게는 외삽하지 않음 (멀리 갈수록 발산)
+"""
+
+import logging
+from typing import Optional
+
+from config import PREDICT_MAX_AHEAD
+from models import BallDetection, DetectionResult, Prediction
+
+logger = logging.getLogger(__name__)
+
+
+def steps_until(result: DetectionResult, time: float) -> float:
+    """결과의 기준 시각에서 time까지 추적 스텝 수 (외삽 범위로 자름)"""
+    if result.frame_interval <= 0:
+        return 0.0
+    elapsed = min(max(time - result.reference_time, -PREDICT_MAX_AHEAD), PREDICT_MAX_AHEAD)
+    return elapsed / result.frame_interval
+
+
+def predict(result: DetectionResult, time: float) -> Prediction:
+    """
+    결과를 time 시각으로 외삽
+
+    Args:
+        result: 마지막 탐지 결과
+        time: 예측할 시각 (result.reference_time과 같은 시계, 초)
+
+    Returns:
+        Prediction: 옮긴 선수/공 위치 (크기, 팀 등 나머지 정보는 그대로)
+    """
+    steps = steps_until(result, time)
+    shift_x, shift_y = (s * steps for s in result.camera_shift)
+
+    players = [
+        p.model_copy(update={"x": p.x + p.vx * steps + shift_x, "y": p.y + p.vy * steps + shift_y})
+        for p in result.players
+    ]
+    return Prediction(
+        time=time,
+        reference_time=result.reference_time,
+        players=players,
+        ball=_predict_ball(result, steps, shift_x, shift_y),
+    )
+
+
+def _predict_ball(
+    result: DetectionResult, steps: float, shift_x: float, shift_y: float
+) -> Optional[BallDetection]:
+    ball, state = result.ball, result.ball_state
+    if ball is None:
+        return None
+    if state is None:
+        return ball.model_copy(update={"x": ball.x + shift_x, "y": ball.y + shift_y})
+    return ball.model_copy(update={
+        "x": state.x + state.vx * steps + 0.5 * state.ax * steps ** 2 + shift_x,
+        "y": state.y + state.vy * steps + 0.5 * state.ay * steps ** 2 + shift_y,
+    })
@@ -0,0 +1,131 @@
+"""
+추론 노드 프로세스
+게이트웨이로부터 TCP(길이 프리픽스 프레임)로 프레임을 받아 추론 후 결과 반환
+
+실행 예시 (한 머신에서 노드 2개):
+    python node.py --port 9001
+    python node.py --port 9002
+"""
+
+import json
+import time
+import asyncio
+import argparse
+import logging
+
+from transport import read_message, write_message, TransportError
+from config import NODE_HOST, NODE_PORT, ENABLE_TRACKING
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+class InferenceNode:
+    """
+    추론 노드 서버
+
+    - 세션 상태(PlayerTracker 등)는 노드 안의 SessionManager가 보관
+    - 추론은 세션별 스테이지 파이프라인에서 실행 (모델 공유, 세션 내 제출 순서 = 처리 순서)
+    - 선수 명단/수동 매칭 요청은 게이트웨이가 전달 (명단은 노드의 모든 세션 공유)
+    - 프레임/부하 응답에 현재 부하를 실어 보냄 (게이트웨이 라우팅용)
+    """
+
+    def __init__(self, backend):
+        """
+        Args:
+            backend: async process(session_id, frame_bytes, received) -> dict,
+                     async close(session_id), load(), set_roster(home, away),
+                     match_player(track_id, team, number), roster() 를 제공하는 백엔드 (보통 LocalBackend)
+        """
+        self.backend = backend
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """게이트웨이 연결 하나 처리"""
+        peer = writer.get_extra_info("peername")
+        logger.info(f"게이트웨이 연결됨: {peer}")
+
+        write_lock = asyncio.Lock()
+
+        async def reply(header: dict, body: bytes = b""):
+            async with write_lock:
+                await write_message(writer, header, body)
+
+        try:
+            while True:
+                header, body = await read_message(reader)
+                # 세션 순서는 세션 파이프라인의 제출 순서로 보장되므로 응답 대기 없이 다음 메시지 수신
+                asyncio.create_task(self._dispatch(header, body, reply))
+        except TransportError:
+            logger.info(f"게이트웨이 연결 끊김: {peer}")
+        finally:
+            writer.close()
+
+    async def _dispatch(self, header: dict, body: bytes, reply):
+        """메시지 타입별 처리"""
+        msg_type = header.get("type")
+        request_id = header.get("request_id")
+
+        try:
+            if msg_type == "frame":
+                # 게이트웨이에서 기다린 시간만큼 앞당긴 수신 시각 (마감 시간 기준)
+                received = time.time() - header.get("waited", 0.0)
+                result = await self.backend.process(header["session_id"], body, received=received)
+                await reply(
+                    {"type": "result", "request_id": request_id, "load": self.backend.load()},
+                    json.dumps(result, ensure_ascii=False).encode("utf-8"),
+                )
+            elif msg_type == "close":
+                await self.backend.close(header["session_id"])
+            elif msg_type == "load":
+                await reply({"type": "load", "request_id": request_id, "load": self.backend.load()})
+            elif msg_type == "roster":
+                roster = json.loads(body)
+                self.backend.set_roster(roster["home"], roster["away"])
+                await reply({"type": "ok", "request_id": request_id})
+            elif msg_type == "match":
+                self.backend.match_player(header["track_id"], header["team"], header["number"])
+                await reply({"type": "ok", "request_id": request_id})
+            elif msg_type == "get_roster":
+                await reply(
+                    {"type": "roster", "request_id": request_id},
+                    json.dumps(self.backend.roster(), ensure_ascii=False).encode("utf-8"),
+                )
+            else:
+                await reply({"type": "error", "request_id": request_id,
+                             "message": f"알 수 없는 메시지 타입: {msg_type}"})
+        except Exception as e:
+            logger.error(f"노드 처리 중 에러: {e}")
+            await reply({"type": "error", "request_id": request_id, "message": str(e)})
+
+    async def serve(self, host: str = NODE_HOST, port: int = NODE_PORT):
+        """TCP 서버 실행"""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        logger.info(f"추론 노드 준비 완료! tcp://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SoccerHUD 추론 노드")
+    parser.add_argument("--host", default=NODE_HOST)
+    parser.add_argument("--port", type=int, default=NODE_PORT)
+    parser.add_argument(
+        "--tracking", action=argparse.BooleanOptionalAction, default=ENABLE_TRACKING,
+        help="선수 추적 활성화 (백엔드는 config.TRACKER_BACKEND)",
+    )
+    args = parser.parse_args()
+
+    # 모델 로딩은 무거우므로 실제 실행 시에만 import
+    from sessions import SessionManager, LocalBackend
+
+    node = InferenceNode(LocalBackend(SessionManager(enable_tracking=args.tracking)))
+    asyncio.run(node.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+피치(잔디) 영역 마스크
+축소 프레임의 HSV 색 범위로 잔디 픽셀을 판단
+
+- 관중석/광고판/하늘처럼 공이 있을 수 없는 영역을 건너뛰는 데 사용
+- 160px 너비 마스크라 프레임당 1ms 미만
+- 피치 영역 박스는 샷마다 캐시 (PitchRegionEstimator) → letterbox 전에 크롭
+  (카메라가 크게 움직이면 주기 전이라도 다시 계산)
+- 잔디 덩어리의 볼록 껍질 = 피치 → 발 위치가 피치 밖인 탐지(관중, 벤치) 제거
+"""
+
+import logging
+import threading
+import numpy as np
+import cv2
+from typing import Optional, Tuple
+
+from config import (
+    PITCH_MASK_WIDTH,
+    PITCH_HSV_LOWER,
+    PITCH_HSV_UPPER,
+    PITCH_MIN_COVERAGE,
+    PITCH_CROP_LINE_RATIO,
+    PITCH_CROP_MARGIN,
+    PITCH_CROP_REFRESH,
+    PITCH_CROP_MOTION,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _build_grass_lut() -> np.ndarray:
+    """
+    BGR(채널당 상위 5비트) → 잔디 여부 룩업 테이블 (32x32x32)
+
+    32768색을 한 번만 HSV로 변환해두면 프레임마다 cvtColor + inRange 대신 인덱싱 한 번
+    """
+    levels = np.arange(32, dtype=np.uint8) * 8 + 4  # 구간 중앙값
+    b, g, r = np.meshgrid(levels, levels, levels, indexing="ij")
+    colors = np.stack([b, g, r], axis=-1).reshape(-1, 1, 3)
+    hsv = cv2.cvtColor(colors, cv2.COLOR_BGR2HSV)
+    return cv2.inRange(hsv, PITCH_HSV_LOWER, PITCH_HSV_UPPER).reshape(32, 32, 32)
+
+
+GRASS_LUT = _build_grass_lut()
+
+# 피치 영역 경계 여유 (마스크 px, 터치라인 위 선수 발)
+AREA_DILATE = 2
+
+
+class PitchMask:
+    """
+    축소 잔디 마스크 (255 = 잔디)
+
+    원본 좌표 영역의 잔디 비율을 바로 조회할 수 있도록 축소 비율을 함께 보관
+    """
+
+    def __init__(self, mask: np.ndarray, scale: float):
+        self.mask = mask
+        self.scale = scale  # 원본 → 마스크 좌표 비율
+        self.coverage = float(np.count_nonzero(mask)) / max(mask.size, 1)
+        self._area: Optional[np.ndarray] = None
+
+    @property
+    def is_wide(self) -> bool:
+        """잔디가 충분히 보이는 샷 (클로즈업/관중 샷이 아님)"""
+        return self.coverage >= PITCH_MIN_COVERAGE
+
+    @classmethod
+    def from_frame(
+        cls, frame: np.ndarray, width: int = PITCH_MASK_WIDTH, frame_scale: float = 1.0
+    ) -> "PitchMask":
+        """BGR 프레임 → 잔디 마스크 (frame_scale: 축소 디코딩 비율, 조회 좌표는 원본 기준)"""
+        h, w = frame.shape[:2]
+        scale = width / w
+        # 간격 샘플링으로 먼저 줄인 뒤 INTER_AREA (shot_detector와 같은 방식)
+        step = max(1, w // (width * 4))
+        small = cv2.resize(
+            frame[::step, ::step], (width, max(1, round(h * scale))), interpolation=cv2.INTER_AREA
+        )
+        quantized = small >> 3
+        return cls(GRASS_LUT[quantized[..., 0], quantized[..., 1], quantized[..., 2]], scale * frame_scale)
+
+    @property
+    def area(self) -> np.ndarray:
+        """
+        피치 영역 마스크 (가장 큰 잔디 덩어리의 볼록 껍질, 255 = 피치)
+
+        선수 발은 잔디 위지만 선수 자신이 잔디를 가리므로 잔디 픽셀 대신 껍질로 판단
+        """
+        if self._area is None:
+            closed = cv2.morphologyEx(self.mask, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8))
+            contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            area = np.zeros_like(self.mask)
+            if contours:
+                hull = cv2.convexHull(max(contours, key=cv2.contourArea))
+                cv2.fillPoly(area, [hull], 255)
+                area = cv2.dilate(area, np.ones((2 * AREA_DILATE + 1,) * 2, np.uint8))
+            self._area = area
+        return self._area
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        """원본 좌표 점 (N, 2)이 피치 영역 안인지 (N,) bool"""
+        area = self.area
+        ix = np.clip((points[:, 0] * self.scale).astype(int), 0, area.shape[1] - 1)
+        iy = np.clip((points[:, 1] * self.scale).astype(int), 0, area.shape[0] - 1)
+        return area[iy, ix] > 0
+
+    def ratio(self, box: Tuple[float, float, float, float]) -> float:
+        """원본 좌표 영역 (x1, y1, x2, y2)의 잔디 비율 (0~1)"""
+        x1, y1, x2, y2 = (int(round(v * self.scale)) for v in box)
+        region = self.mask[max(y1, 0):max(y2, y1 + 1), max(x1, 0):max(x2, x1 + 1)]
+        if region.size == 0:
+            return 0.0
+        return float(np.count_nonzero(region)) / region.size
+
+    def bounding_box(self, frame_w: int, frame_h: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        피치 영역 박스 (x1, y1, x2, y2), 원본 좌표
+
+        잔디 비율이 PITCH_CROP_LINE_RATIO 이상인 행/열의 범위 + 위쪽 여유
+        Returns:
+            None이면 잔디가 적은 샷(클로즈업, 관중) → 크롭하지 않음
+        """
+        if not self.is_wide:
+            return None
+        grass = self.mask > 0
+        rows = np.flatnonzero(grass.mean(axis=1) >= PITCH_CROP_LINE_RATIO)
+        cols = np.flatnonzero(grass.mean(axis=0) >= PITCH_CROP_LINE_RATIO)
+        if len(rows) == 0 or len(cols) == 0:
+            return None
+
+        # 마스크 한 칸 = 원본 1/scale px → 칸 경계까지 포함
+        x1 = int(cols[0] / self.scale)
+        x2 = int(np.ceil((cols[-1] + 1) / self.scale))
+        y1 = int((rows[0] / self.scale) - PITCH_CROP_MARGIN * frame_h)
+        y2 = int(np.ceil((rows[-1] + 1) / self.scale))
+        return max(x1, 0), max(y1, 0), min(x2, frame_w), min(y2, frame_h)
+
+
+class PitchRegionEstimator:
+    """
+    프레임 순서대로 update()를 호출하면 letterbox 전에 잘라낼 피치 영역을 반환
+    (같은 시점의 잔디 마스크는 mask로 조회 → 피치 밖 탐지 제거용)
+
+    샷 전환 시, 마지막 계산 이후 카메라가 PITCH_CROP_MOTION 넘게 움직였을 때(패닝/줌),
+    그리고 같은 샷에서도 PITCH_CROP_REFRESH 프레임마다 다시 계산
+    (계산 사이 프레임은 이전 마스크/박스 재사용)
+
+    update는 디코딩 스테이지, add_camera_motion은 후처리 스테이지에서 호출되므로
+    누적 이동량은 잠금 안에서만 더하고 비움
+    """
+
+    def __init__(self, refresh: int = PITCH_CROP_REFRESH, max_motion: float = PITCH_CROP_MOTION):
+        self.refresh = refresh
+        self.max_motion = max_motion
+        self.mask: Optional[PitchMask] = None
+        self.region: Optional[Tuple[int, int, int, int]] = None
+        self.frames_since_update = refresh  # 첫 프레임에 바로 계산
+        self.motion_since_update = 0.0  # 마지막 계산 이후 누적 카메라 이동 (프레임 너비 비율)
+        self._motion_lock = threading.Lock()
+
+    def add_camera_motion(self, displacement: float):
+        """
+        카메라 움직임 추정 결과 반영 (후처리 스테이지에서 호출)
+
+        Args:
+            displacement: 이전 → 현재 프레임에서 화면 모서리가 움직인 최대 거리 (프레임 너비 비율)
+        """
+        with self._motion_lock:
+            self.motion_since_update += displacement
+
+    def update(
+        self, frame: np.ndarray, shot_cut: bool = False, frame_scale: float = 1.0
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Args:
+            frame: BGR 프레임
+            shot_cut: 이 프레임에서 새 샷이 시작됨
+            frame_scale: frame이 원본보다 축소 디코딩된 비율 (영역은 원본 좌표)
+
+        Returns:
+            피치 영역 (x1, y1, x2, y2) 또는 None (전체 프레임 사용)
+        """
+        self.frames_since_update += 1
+        with self._motion_lock:
+            refresh = (
+                shot_cut
+                or self.frames_since_update >= self.refresh
+                or self.motion_since_update >= self.max_motion
+            )
+            if refresh:
+                self.motion_since_update = 0.0  # 지금 프레임으로 다시 계산하므로 이전 이동은 반영됨
+        if refresh:
+            h, w = frame.shape[:2]
+            self.mask = PitchMask.from_frame(frame, frame_scale=frame_scale)
+            self.region = self.mask.bounding_box(int(round(w / frame_scale)), int(round(h / frame_scale)))
+            self.frames_since_update = 0
+        return self.region
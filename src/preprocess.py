@@ -0,0 +1,156 @@
+"""
+YOLO 입력 전처리 및 좌표 변환
+letterbox(비율 유지 리사이즈 + 패딩)를 모델 호출 전에 직접 수행해서
+디코딩/전처리 단계를 추론 단계와 분리 (다음 프레임 전처리를 현재 프레임 추론과 겹쳐 실행)
+"""
+
+import math
+from functools import lru_cache
+import numpy as np
+import cv2
+from typing import List, Optional, Tuple
+
+from config import INPUT_SIZE
+
+STRIDE = 32  # YOLOv8 최대 stride (입력 크기는 이 배수여야 함)
+PAD_VALUE = 114  # ultralytics LetterBox와 같은 패딩 색
+
+
+class LetterboxInfo:
+    """letterbox 변환 정보 (모델 입력 좌표 → 원본 프레임 좌표 복원용)"""
+
+    def __init__(
+        self, scale: float, pad_x: int, pad_y: int, frame_w: int, frame_h: int,
+        offset_x: int = 0, offset_y: int = 0,
+    ):
+        self.scale = scale
+        self.pad_x = pad_x
+        self.pad_y = pad_y
+        self.frame_w = frame_w
+        self.frame_h = frame_h
+        self.offset_x = offset_x  # 크롭 영역 왼쪽 위 (원본 좌표, 크롭하지 않았으면 0)
+        self.offset_y = offset_y
+
+    def to_frame(self, xyxy: np.ndarray) -> np.ndarray:
+        """모델 입력 좌표의 박스 (N, 4)를 원본 프레임 좌표로 변환 (프레임 밖은 잘라냄)"""
+        boxes = xyxy.astype(np.float32, copy=True)
+        xs, ys = boxes[:, 0::2], boxes[:, 1::2]  # x1,x2 / y1,y2 뷰
+        xs -= self.pad_x
+        ys -= self.pad_y
+        boxes /= self.scale
+        xs += self.offset_x
+        ys += self.offset_y
+        np.clip(xs, 0, self.frame_w, out=xs)
+        np.clip(ys, 0, self.frame_h, out=ys)
+        return boxes
+
+
+class Detections:
+    """
+    프레임 좌표계로 변환된 탐지 결과
+
+    ultralytics Results 대신 numpy 배열만 들고 다녀서 후처리 단계가 모델과 독립적
+    """
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy  # (N, 4) float32, 프레임 좌표
+        self.conf = conf  # (N,) float32
+        self.cls = cls    # (N,) int
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    @classmethod
+    def from_yolo(cls, result, letterbox: LetterboxInfo) -> "Detections":
+        """ultralytics 결과 하나를 프레임 좌표로 변환"""
+        boxes = result.boxes
+        if len(boxes) == 0:
+            return cls.empty()
+
+        return cls(
+            xyxy=letterbox.to_frame(boxes.xyxy.cpu().numpy()),
+            conf=boxes.conf.cpu().numpy().astype(np.float32),
+            cls=boxes.cls.cpu().numpy().astype(int),
+        )
+
+    @classmethod
+    def empty(cls) -> "Detections":
+        return cls(
+            xyxy=np.zeros((0, 4), dtype=np.float32),
+            conf=np.zeros(0, dtype=np.float32),
+            cls=np.zeros(0, dtype=int),
+        )
+
+    @classmethod
+    def concat(cls, parts: List["Detections"]) -> "Detections":
+        """여러 탐지 결과를 하나로 (예: ROI 탐지 + 전체 프레임 탐지)"""
+        return cls(
+            xyxy=np.concatenate([p.xyxy for p in parts]).astype(np.float32),
+            conf=np.concatenate([p.conf for p in parts]).astype(np.float32),
+            cls=np.concatenate([p.cls for p in parts]).astype(int),
+        )
+
+
+@lru_cache(maxsize=32)
+def _geometry(w: int, h: int, size: int) -> Tuple[float, int, int, int, int]:
+    """프레임 크기별 (scale, new_w, new_h, out_w, out_h) - 세션마다 프레임 크기가 고정이라 캐시"""
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    out_w = int(math.ceil(new_w / STRIDE) * STRIDE)
+    out_h = int(math.ceil(new_h / STRIDE) * STRIDE)
+    return scale, new_w, new_h, out_w, out_h
+
+
+def letterbox_shape(w: int, h: int, size: int = INPUT_SIZE) -> Tuple[int, int]:
+    """letterbox 결과 크기 (h, w) - 16:9 프레임은 size 640 기준 384x640"""
+    _, _, _, out_w, out_h = _geometry(w, h, size)
+    return out_h, out_w
+
+
+def letterbox(
+    frame: np.ndarray,
+    size: int = INPUT_SIZE,
+    shape: Optional[Tuple[int, int]] = None,
+    region: Optional[Tuple[int, int, int, int]] = None,
+    frame_scale: float = 1.0,
+) -> Tuple[np.ndarray, LetterboxInfo]:
+    """
+    긴 변을 size에 맞추고 stride 배수가 되도록 최소한만 패딩
+    (ultralytics가 PyTorch 모델에 적용하는 rect letterbox와 동일한 크기)
+
+    Args:
+        frame: 원본 BGR 프레임
+        size: 긴 변 길이
+        shape: 출력 크기 (h, w) 지정 (입력 크기가 고정인 내보낸 모델용, letterbox_shape 이상)
+        region: 이 영역 (x1, y1, x2, y2)만 잘라서 letterbox (원본 좌표, 복원 좌표는 전체 프레임 기준)
+        frame_scale: frame이 원본보다 축소 디코딩된 비율 (복원 좌표는 원본 기준)
+
+    Returns:
+        (모델 입력 이미지, LetterboxInfo)
+    """
+    frame_h, frame_w = frame.shape[:2]
+    offset_x = offset_y = 0
+    if region is not None:
+        offset_x, offset_y, x2, y2 = region
+        frame = frame[
+            int(offset_y * frame_scale):int(round(y2 * frame_scale)),
+            int(offset_x * frame_scale):int(round(x2 * frame_scale)),
+        ]
+    h, w = frame.shape[:2]
+    scale, new_w, new_h, out_w, out_h = _geometry(w, h, size)
+    if shape is not None:
+        out_h, out_w = max(shape[0], out_h), max(shape[1], out_w)
+    pad_x = (out_w - new_w) // 2
+    pad_y = (out_h - new_h) // 2
+
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((out_h, out_w, 3), PAD_VALUE, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = frame
+
+    return canvas, LetterboxInfo(
+        scale * frame_scale, pad_x, pad_y,
+        int(round(frame_w / frame_scale)), int(round(frame_h / frame_scale)),
+        offset_x, offset_y,
+    )
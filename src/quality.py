@@ -0,0 +1,101 @@
+"""
+적응형 품질 조절
+최근 프레임 지연이 목표(TARGET_FPS 기준)를 계속 넘으면 더 싼 설정 단계로 내려가고,
+여유가 생기면 다시 올라감
+
+단계(rung)는 누적 적용 (레벨 n = 앞쪽 n개 단계 모두 적용):
+    input_shape       입력 긴 변 QUALITY_INPUT_SIZE
+    ball_every_other  공 전용 패스 격프레임 (건너뛴 프레임은 선수 패스의 공 후보)
+    keyframes         키프레임 모드 (사이 프레임은 광학 흐름 전파)
+    reid_off          DeepSORT ReID 임베딩 생략 (움직임/IoU로만 연관)
+    nano              nano 탐지기만 사용 (캐스케이드 승격 없음)
+
+파이프라인에 해당 없는 단계(이미 키프레임 모드, ByteTrack, nano 모델 없음)는 사다리에서 뺌
+"""
+
+import logging
+from collections import deque
+from typing import FrozenSet, Sequence
+
+from config import (
+    QUALITY_TARGET_LATENCY,
+    QUALITY_WINDOW,
+    QUALITY_DOWN_FRAMES,
+    QUALITY_UP_FRAMES,
+    QUALITY_UP_RATIO,
+)
+
+logger = logging.getLogger(__name__)
+
+RUNGS = ("input_shape", "ball_every_other", "keyframes", "reid_off", "nano")
+
+
+class QualityController:
+    """
+    프레임 순서대로 update(지연)를 호출하면 레벨을 조절
+
+    - 창(QUALITY_WINDOW) 평균이 목표 초과 QUALITY_DOWN_FRAMES번 연속 → 한 단계 낮춤
+    - 목표 x QUALITY_UP_RATIO 미만 QUALITY_UP_FRAMES번 연속 → 한 단계 복귀
+    - 레벨이 바뀌면 창을 비움 (바뀐 설정의 지연만으로 다음 판단, 진동 방지)
+    """
+
+    def __init__(
+        self,
+        rungs: Sequence[str] = RUNGS,
+        target: float = QUALITY_TARGET_LATENCY,
+        window: int = QUALITY_WINDOW,
+        down_frames: int = QUALITY_DOWN_FRAMES,
+        up_frames: int = QUALITY_UP_FRAMES,
+    ):
+        self.rungs = tuple(rungs)
+        self.target = target
+        self.down_frames = down_frames
+        self.up_frames = up_frames
+
+        self.level = 0
+        self.latencies: deque = deque(maxlen=window)
+        self.over = 0  # 목표 초과 연속 횟수
+        self.under = 0  # 여유 연속 횟수
+
+    @property
+    def active(self) -> FrozenSet[str]:
+        """현재 레벨에서 적용 중인 단계"""
+        return frozenset(self.rungs[:self.level])
+
+    def update(self, latency: float) -> bool:
+        """
+        Args:
+            latency: 프레임 하나의 수신 → 결과 지연 (초)
+
+        Returns:
+            레벨이 바뀌었으면 True
+        """
+        self.latencies.append(latency)
+        if len(self.latencies) < self.latencies.maxlen:
+            return False
+
+        mean = sum(self.latencies) / len(self.latencies)
+        if mean > self.target:
+            self.over, self.under = self.over + 1, 0
+        elif mean < self.target * QUALITY_UP_RATIO:
+            self.over, self.under = 0, self.under + 1
+        else:
+            self.over = self.under = 0
+
+        if self.over >= self.down_frames and self.level < len(self.rungs):
+            self._set_level(self.level + 1, mean)
+            return True
+        if self.under >= self.up_frames and self.level > 0:
+            self._set_level(self.level - 1, mean)
+            return True
+        return False
+
+    def _set_level(self, level: int, mean: float):
+        step = self.rungs[max(level, self.level) - 1]
+        logger.info(
+            f"품질 레벨 {self.level} → {level} ({'+' if level > self.level else '-'}{step}, "
+            f"평균 지연 {mean * 1000:.0f}ms / 목표 {self.target * 1000:.0f}ms)"
+        )
+        self.level = level
+        self.latencies.clear()
+        self.over = self.under = 0
@@ -0,0 +1,127 @@
+"""
+ONNX Runtime 기반 ReID 임베더
+선수 크롭을 미리 할당한 배치 텐서 하나에 바로 리사이즈해서 한 번에 추론
+
+deep_sort_realtime의 mobilenet 임베더는 크롭마다 torchvision 전처리를 거치므로
+선수가 많은 와이드 샷에서 전처리 비용이 추론만큼 큼
+"""
+
+import threading
+import logging
+import numpy as np
+import cv2
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from config import REID_ONNX_MODEL_PATH, REID_INPUT_SIZE, REID_MAX_BATCH
+
+logger = logging.getLogger(__name__)
+
+# ImageNet 정규화 (RGB)
+MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32).reshape(1, 3, 1, 1) * 255
+STD = np.array([0.229, 0.224, 0.225], dtype=np.float32).reshape(1, 3, 1, 1) * 255
+
+
+class OnnxReIDEmbedder:
+    """
+    ReID 특징 추출기 (ONNX 모델, 입력 N x 3 x H x W, 출력 N x D)
+
+    - 크롭 버퍼 (B, H, W, 3) uint8 / 입력 텐서 (B, 3, H, W) float32를 한 번만 할당
+    - 모델 배치 차원이 고정이면 그 크기로, 동적이면 REID_MAX_BATCH로 나눠 실행
+    - 출력은 L2 정규화 (DeepSORT 코사인 거리용)
+    """
+
+    _shared: Dict[str, "OnnxReIDEmbedder"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        model_path: Path = REID_ONNX_MODEL_PATH,
+        input_size: Tuple[int, int] = REID_INPUT_SIZE,
+        max_batch: int = REID_MAX_BATCH,
+        session=None,
+    ):
+        """
+        Args:
+            model_path: ONNX 모델 경로
+            input_size: 모델 입력 크기 (w, h)
+            max_batch: 동적 배치 모델의 한 번 실행 최대 크롭 수
+            session: 이미 만든 InferenceSession (None이면 model_path로 생성)
+        """
+        if session is None:
+            # onnxruntime은 이 임베더를 쓸 때만 필요
+            import onnxruntime as ort
+
+            session = ort.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+            logger.info(f"ReID ONNX 모델 로딩: {model_path}")
+
+        self.session = session
+        model_input = session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        batch_dim = model_input.shape[0]
+        self.batch_size = batch_dim if isinstance(batch_dim, int) and batch_dim > 0 else max_batch
+        self.fixed_batch = isinstance(batch_dim, int) and batch_dim > 0
+
+        self.width, self.height = input_size
+        self.crops = np.zeros((self.batch_size, self.height, self.width, 3), dtype=np.uint8)
+        self.tensor = np.zeros((self.batch_size, 3, self.height, self.width), dtype=np.float32)
+
+        # 버퍼를 공유하므로 호출은 직렬화
+        self.lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, model_path: Path = REID_ONNX_MODEL_PATH) -> "OnnxReIDEmbedder":
+        """모델 경로별로 하나만 로드해서 세션(트래커) 간 공유"""
+        key = str(model_path)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(model_path)
+            return cls._shared[key]
+
+    def __call__(self, frame: np.ndarray, boxes: np.ndarray) -> List[np.ndarray]:
+        """
+        Args:
+            frame: 원본 BGR 프레임
+            boxes: 선수 박스 (N, 4) ltwh
+
+        Returns:
+            박스별 L2 정규화 특징 리스트
+        """
+        features = []
+        with self.lock:
+            for start in range(0, len(boxes), self.batch_size):
+                chunk = boxes[start:start + self.batch_size]
+                features.append(self._run(frame, chunk))
+
+        if not features:
+            return []
+        return list(np.concatenate(features))
+
+    def _run(self, frame: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        n = len(boxes)
+        self._fill(frame, boxes)
+
+        # BGR(HWC) → RGB(CHW) + 정규화를 미리 할당한 텐서에 바로 기록
+        batch = self.tensor if self.fixed_batch else self.tensor[:n]
+        np.subtract(
+            self.crops[:len(batch), :, :, ::-1].transpose(0, 3, 1, 2), MEAN, out=batch
+        )
+        np.divide(batch, STD, out=batch)
+
+        output = self.session.run(None, {self.input_name: batch})[0][:n]
+        output = output.reshape(n, -1).astype(np.float32)
+        return output / np.maximum(np.linalg.norm(output, axis=1, keepdims=True), 1e-12)
+
+    def _fill(self, frame: np.ndarray, boxes: np.ndarray):
+        """박스 영역을 크롭 버퍼에 입력 크기로 리사이즈 (프레임 밖은 잘라냄)"""
+        frame_h, frame_w = frame.shape[:2]
+        for i, (left, top, w, h) in enumerate(boxes):
+            x1 = int(min(max(left, 0), frame_w - 1))
+            y1 = int(min(max(top, 0), frame_h - 1))
+            x2 = int(min(max(left + w, x1 + 1), frame_w))
+            y2 = int(min(max(top + h, y1 + 1), frame_h))
+            cv2.resize(
+                frame[y1:y2, x1:x2], (self.width, self.height),
+                dst=self.crops[i], interpolation=cv2.INTER_LINEAR,
+            )
@@ -0,0 +1,331 @@
+"""
+전역 프레임 스케줄러
+서버 전체의 프레임 예산(FPS)을 세션들에게 공정하게 나눠줌
+
+- 우선순위 클래스: live(실시간 시청) > background(오프라인 작업), 상위 클래스를 먼저 처리
+- 같은 클래스 안에서는 세션별 큐를 Deficit Round-Robin으로 처리
+- 세션마다 허용 FPS(granted)를 계산해서 클라이언트에 알려줌
+  → 과부하 시 모든 스트림이 예측 불가능하게 느려지는 대신 각자 정해진 속도로 보냄
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from config import (
+    NODE_FRAME_BUDGET_FPS,
+    SCHEDULER_PRIORITIES,
+    SCHEDULER_QUEUE_SIZE,
+    SCHEDULER_BURST,
+    SCHEDULER_MAX_IN_FLIGHT,
+    SCHEDULER_SESSION_IN_FLIGHT,
+    TARGET_FPS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SessionQueue:
+    """세션 하나의 스케줄링 상태"""
+
+    def __init__(self, session_id: str, priority: str, requested_fps: float, weight: float):
+        self.session_id = session_id
+        self.priority = priority
+        self.requested_fps = requested_fps
+        self.weight = weight
+
+        self.queue: Deque = deque()  # (job, future)
+        self.deficit = 0.0
+        self.in_flight = 0  # 백엔드에서 처리 중인 프레임 수
+        self.granted_fps = 0.0
+        self.dropped = 0
+
+
+class FrameScheduler:
+    """
+    전역 프레임 예산 + 세션별 공정 큐잉
+
+    사용 흐름:
+        scheduler.register(session_id, priority, requested_fps)
+        result = await scheduler.submit(session_id, job)  # job: 인자 없는 코루틴 함수
+        scheduler.unregister(session_id)
+    """
+
+    def __init__(
+        self,
+        budget_fps: float = NODE_FRAME_BUDGET_FPS,
+        queue_size: int = SCHEDULER_QUEUE_SIZE,
+        max_in_flight: int = SCHEDULER_MAX_IN_FLIGHT,
+        max_session_in_flight: int = SCHEDULER_SESSION_IN_FLIGHT,
+        on_grant: Optional[Callable[[str, float], Awaitable]] = None,
+    ):
+        """
+        Args:
+            budget_fps: 서버 전체가 처리할 수 있는 초당 프레임 수
+            queue_size: 세션별 대기 큐 크기 (넘치면 가장 오래된 프레임 폐기)
+            max_in_flight: 동시에 백엔드로 보낼 최대 프레임 수
+                (백엔드 내부 큐에 쌓이면 DRR 순서가 무의미해지므로 작게 유지)
+            max_session_in_flight: 세션 하나가 동시에 처리 중일 수 있는 프레임 수
+                (2 이상이면 스테이지 파이프라인에서 같은 세션의 프레임이 겹쳐 처리됨,
+                 백엔드가 제출 순서대로 처리하므로 세션 내 순서는 유지)
+            on_grant: 세션의 허용 FPS가 바뀌었을 때 호출할 콜백 (session_id, granted_fps)
+        """
+        self.budget_fps = budget_fps
+        self.queue_size = queue_size
+        self.max_in_flight = max_in_flight
+        self.max_session_in_flight = max_session_in_flight
+        self.on_grant = on_grant
+        self._in_flight = 0
+
+        self.sessions: Dict[str, SessionQueue] = {}
+        # 우선순위 클래스별 라운드로빈 순서
+        self._rounds: Dict[str, Deque[str]] = {p: deque() for p in SCHEDULER_PRIORITIES}
+
+        self._wakeup = asyncio.Event()
+        self._tokens = float(SCHEDULER_BURST)
+        self._last_refill = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    # ============ 세션 등록 / 허용 FPS ============
+
+    def register(
+        self,
+        session_id: str,
+        priority: str = "live",
+        requested_fps: float = TARGET_FPS,
+        weight: float = 1.0,
+    ) -> float:
+        """세션 등록 후 허용 FPS 반환"""
+        if priority not in SCHEDULER_PRIORITIES:
+            logger.warning(f"알 수 없는 우선순위 '{priority}' → live로 처리")
+            priority = "live"
+
+        weight = max(weight, 0.1)  # 0이면 DRR에서 영원히 선택되지 않음
+        self.sessions[session_id] = SessionQueue(session_id, priority, requested_fps, weight)
+        self._rounds[priority].append(session_id)
+        self._reallocate()
+        return self.sessions[session_id].granted_fps
+
+    def unregister(self, session_id: str):
+        """세션 제거 (대기 중인 프레임은 폐기)"""
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return
+
+        self._rounds[session.priority].remove(session_id)
+        while session.queue:
+            _, future = session.queue.popleft()
+            if not future.done():
+                future.set_result(None)
+        self._reallocate()
+
+    def update_request(self, session_id: str, requested_fps: float):
+        """세션이 원하는 FPS 변경"""
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session.requested_fps = requested_fps
+            self._reallocate()
+
+    def granted_fps(self, session_id: str) -> float:
+        session = self.sessions.get(session_id)
+        return session.granted_fps if session else 0.0
+
+    def _reallocate(self):
+        """
+        허용 FPS 재계산
+
+        우선순위 순서대로 남은 예산을 나눠주고,
+        클래스 안에서는 가중치 기반 max-min 공정 분배 (요청보다 많이 주지 않음)
+        """
+        remaining = self.budget_fps
+
+        for priority in SCHEDULER_PRIORITIES:
+            members = [self.sessions[sid] for sid in self._rounds[priority]]
+            grants = _max_min_fair(
+                remaining,
+                [s.requested_fps for s in members],
+                [s.weight for s in members],
+            )
+            for session, grant in zip(members, grants):
+                self._set_grant(session, grant)
+            remaining = max(0.0, remaining - sum(grants))
+
+    def _set_grant(self, session: SessionQueue, grant: float):
+        grant = round(grant, 1)
+        if abs(grant - session.granted_fps) < 0.1:
+            return
+
+        session.granted_fps = grant
+        logger.info(
+            f"세션 {session.session_id} ({session.priority}): "
+            f"요청 {session.requested_fps:.1f} FPS → 허용 {grant:.1f} FPS"
+        )
+        if self.on_grant is not None:
+            asyncio.ensure_future(self.on_grant(session.session_id, grant))
+
+    # ============ 프레임 제출 / 디스패치 ============
+
+    def submit(self, session_id: str, job: Callable[[], Awaitable]) -> asyncio.Future:
+        """
+        프레임 처리 작업 제출
+
+        Returns:
+            작업 결과를 담을 Future (큐가 넘쳐 폐기되면 결과는 None)
+        """
+        session = self.sessions[session_id]
+        future = asyncio.get_running_loop().create_future()
+
+        if len(session.queue) >= self.queue_size:
+            # 실시간 스트림이므로 오래된 프레임부터 버림
+            _, stale = session.queue.popleft()
+            if not stale.done():
+                stale.set_result(None)
+            session.dropped += 1
+
+        session.queue.append((job, future))
+        self._wakeup.set()
+        return future
+
+    def start(self):
+        """디스패치 루프 시작 (이벤트 루프 안에서 호출)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _dispatch_loop(self):
+        """예산 속도(토큰 버킷)에 맞춰 다음 세션의 프레임을 실행"""
+        while True:
+            if self._in_flight >= self.max_in_flight or not self._has_ready():
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            await self._take_token()
+
+            # 토큰을 기다리는 동안 세션이 끊겼을 수 있으므로 다시 선택
+            session = self._next_session()
+            if session is None:
+                self._tokens += 1.0
+                continue
+
+            job, future = session.queue.popleft()
+            session.in_flight += 1
+            self._in_flight += 1
+            asyncio.create_task(self._run(session, job, future))
+
+    async def _take_token(self):
+        """토큰 하나 확보 (예산 FPS를 넘지 않도록 대기)"""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                float(SCHEDULER_BURST),
+                self._tokens + (now - self._last_refill) * self.budget_fps,
+            )
+            self._last_refill = now
+
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return
+
+            await asyncio.sleep((1.0 - self._tokens) / self.budget_fps)
+
+    async def _run(self, session: SessionQueue, job, future: asyncio.Future):
+        try:
+            result = await job()
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            session.in_flight -= 1
+            self._in_flight -= 1
+            self._wakeup.set()
+
+    def _has_ready(self) -> bool:
+        return any(self._is_ready(s) for s in self.sessions.values())
+
+    def _is_ready(self, session: SessionQueue) -> bool:
+        return bool(session.queue) and session.in_flight < self.max_session_in_flight
+
+    def _next_session(self) -> Optional[SessionQueue]:
+        """
+        다음에 처리할 세션 선택
+
+        상위 우선순위 클래스부터 확인하고, 클래스 안에서는 Deficit Round-Robin
+        (방문할 때마다 weight만큼 deficit 적립, 프레임 하나에 1 소모)
+        """
+        for priority in SCHEDULER_PRIORITIES:
+            round_robin = self._rounds[priority]
+            ready = set()
+            for sid in round_robin:
+                session = self.sessions[sid]
+                if not session.queue:
+                    session.deficit = 0.0  # 큐가 빈 세션은 적립분을 이월하지 않음 (표준 DRR)
+                elif self._is_ready(session):
+                    ready.add(sid)
+            if not ready:
+                continue
+
+            # 준비된 세션 중 하나가 프레임을 낼 수 있을 때까지 deficit 적립
+            while True:
+                for _ in range(len(round_robin)):
+                    session = self.sessions[round_robin[0]]
+                    round_robin.rotate(-1)
+                    if session.session_id in ready and session.deficit >= 1.0:
+                        session.deficit -= 1.0
+                        return session
+                for sid in ready:
+                    self.sessions[sid].deficit += self.sessions[sid].weight
+
+        return None
+
+    def status(self) -> dict:
+        return {
+            "budget_fps": self.budget_fps,
+            "in_flight": self._in_flight,
+            "sessions": [
+                {
+                    "session_id": s.session_id,
+                    "priority": s.priority,
+                    "requested_fps": s.requested_fps,
+                    "granted_fps": s.granted_fps,
+                    "queued": len(s.queue),
+                    "dropped": s.dropped,
+                }
+                for s in self.sessions.values()
+            ],
+        }
+
+
+def _max_min_fair(budget: float, demands: List[float], weights: List[float]) -> List[float]:
+    """
+    가중치 max-min 공정 분배 (water-filling)
+
+    요청이 적은 세션은 요청만큼 받고, 남은 예산을 나머지 세션이 가중치 비율로 나눔
+    """
+    grants = [0.0] * len(demands)
+    active = [i for i, d in enumerate(demands) if d > 0]
+
+    while active and budget > 1e-6:
+        total_weight = sum(weights[i] for i in active)
+        share = budget / total_weight
+
+        satisfied = [i for i in active if demands[i] - grants[i] <= share * weights[i]]
+        if not satisfied:
+            for i in active:
+                grants[i] += share * weights[i]
+            break
+
+        for i in satisfied:
+            budget -= demands[i] - grants[i]
+            grants[i] = demands[i]
+        active = [i for i in active if i not in satisfied]
+
+    return grants
@@ -0,0 +1,191 @@
+"""
+세션 관리
+WebSocket 연결(세션)마다 별도의 InferencePipeline을 두어 추적 상태를 분리
+YOLO 모델과 선수 명단(PlayerMatcher)은 모든 세션이 공유
+"""
+
+import time
+import asyncio
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from inference import InferencePipeline, ModelRunner, load_model, load_nano_model, load_shape_variants
+from metrics import merge, shares
+from stages import StageQueueFull
+from capture_profile import DEFAULT_INPUT_SHAPE
+from player_matcher import PlayerMatcher
+from models import DetectionResult
+from config import LOAD_REPORT_WINDOW, ENABLE_TRACKING, CASCADE_MODE, QUALITY_ADAPTIVE
+
+logger = logging.getLogger(__name__)
+
+
+class SessionManager:
+    """
+    세션 ID → InferencePipeline 매핑
+
+    - 세션별 PlayerTracker / 팀 색상 상태 유지
+    - 모델은 한 번만 로드해서 공유
+    - 노드 부하(최근 윈도우의 모델 사용률) 보고
+    - 세션 파이프라인 카운터 합산 보고 (종료된 세션 포함)
+    """
+
+    def __init__(self, enable_tracking: bool = ENABLE_TRACKING):
+        """
+        Args:
+            enable_tracking: 세션 파이프라인의 추적 활성화 여부
+        """
+        self.enable_tracking = enable_tracking
+        self.model = ModelRunner(load_model(), load_shape_variants())
+        # nano 모델은 캐스케이드 1단계와 적응형 품질 마지막 단계가 공유
+        self.nano_model = ModelRunner(load_nano_model()) if (CASCADE_MODE or QUALITY_ADAPTIVE) else None
+        self.cascade_model = self.nano_model if CASCADE_MODE else None
+        self.matcher = PlayerMatcher()
+
+        self.pipelines: Dict[str, InferencePipeline] = {}
+        self._lock = threading.Lock()
+        self._closed_counts: Dict[str, int] = {}  # 종료된 세션 카운터 합계
+
+        # 부하 측정용 (윈도우 시작 시점의 모델 누적 사용 시간)
+        self._window_start = time.time()
+        self._window_busy_start = 0.0
+        self._utilization = 0.0
+
+        logger.info("SessionManager 초기화 완료")
+
+    def get(self, session_id: str) -> InferencePipeline:
+        """세션 파이프라인 조회 (없으면 생성)"""
+        with self._lock:
+            pipeline = self.pipelines.get(session_id)
+            if pipeline is None:
+                pipeline = InferencePipeline(
+                    enable_tracking=self.enable_tracking,
+                    model=self.model,
+                    matcher=self.matcher,
+                    cascade_model=self.cascade_model,
+                    nano_model=self.nano_model,
+                )
+                self.pipelines[session_id] = pipeline
+                logger.info(f"세션 생성: {session_id} (활성 세션 {len(self.pipelines)}개)")
+            return pipeline
+
+    def process(self, session_id: str, frame_bytes: bytes, received: Optional[float] = None) -> DetectionResult:
+        """세션 파이프라인으로 프레임 처리 (현재 스레드에서 순차 실행)"""
+        return self.get(session_id).process(frame_bytes, received=received)
+
+    def submit(self, session_id: str, frame_bytes: bytes, received: Optional[float] = None) -> Future:
+        """
+        세션의 스테이지 파이프라인에 프레임 제출 (DetectionResult Future 반환)
+
+        received: 서버 수신 시각 (마감 시간 기준, 스케줄러 큐 대기 포함)
+        """
+        return self.get(session_id).submit(frame_bytes, received=received)
+
+    def close(self, session_id: str):
+        """세션 종료 (추적 상태 폐기, 스테이지 스레드 정리)"""
+        with self._lock:
+            pipeline = self.pipelines.pop(session_id, None)
+
+        if pipeline is not None:
+            pipeline.close()
+            with self._lock:
+                self._closed_counts = merge([self._closed_counts, pipeline.metrics.snapshot()])
+            logger.info(f"세션 종료: {session_id} (활성 세션 {len(self.pipelines)}개)")
+
+    def load(self) -> dict:
+        """
+        현재 부하 보고
+
+        Returns:
+            {"sessions": 활성 세션 수, "utilization": 최근 윈도우의 모델 사용률 (0~1),
+             "frames": 누적 모델 호출 수}
+        """
+        now = time.time()
+        window = now - self._window_start
+        if window >= LOAD_REPORT_WINDOW:
+            busy = self.model.busy_time - self._window_busy_start
+            self._utilization = min(1.0, busy / window)
+            self._window_start = now
+            self._window_busy_start = self.model.busy_time
+
+        return {
+            "sessions": len(self.pipelines),
+            "utilization": round(self._utilization, 3),
+            "frames": self.model.calls,
+        }
+
+
+    def metrics(self) -> dict:
+        """
+        모든 세션 카운터 합계
+
+        Returns:
+            {"sessions": 활성 세션 수, "counters": 이름별 합계,
+             "detector_tiers": 탐지기 단계별 처리 비율 (캐스케이드 적중률),
+             "frames": 처리한 프레임 / 중복으로 생략한 프레임 비율,
+             "decode": 전체 / 축소 디코딩 비율,
+             "quality": 적응형 품질 레벨별 프레임 비율}
+        """
+        with self._lock:
+            snapshots = [p.metrics.snapshot() for p in self.pipelines.values()]
+            counts = merge(snapshots + [self._closed_counts])
+        return {
+            "sessions": len(snapshots),
+            "counters": counts,
+            "detector_tiers": shares(counts, "detector"),
+            "frames": shares(counts, "frames"),  # 처리 / 중복 생략 비율
+            "decode": shares(counts, "decode"),  # 전체 / 축소 디코딩 비율 (upgrade = 축소 후 재디코딩)
+            "quality": shares(counts, "quality"),  # 품질 레벨별 프레임 비율
+        }
+
+
+class LocalBackend:
+    """
+    같은 프로세스의 SessionManager로 프레임을 처리하는 비동기 백엔드
+
+    프레임은 세션의 스테이지 파이프라인에서 처리되어 이벤트 루프를 막지 않음
+    (제출 순서 = 처리 순서)
+    """
+
+    def __init__(self, sessions: SessionManager):
+        self.sessions = sessions
+
+    async def process(self, session_id: str, frame_bytes: bytes, received: Optional[float] = None) -> Optional[dict]:
+        """
+        프레임 처리 후 JSON 직렬화 가능한 dict 반환 (received: 서버 수신 시각)
+
+        세션 파이프라인이 가득 차서 받지 못한 프레임은 None (스케줄러 큐 초과처럼 폐기)
+        """
+        try:
+            result = await asyncio.wrap_future(self.sessions.submit(session_id, frame_bytes, received))
+        except StageQueueFull:
+            logger.warning(f"세션 {session_id}: 스테이지 큐 가득 참 → 프레임 폐기")
+            return None
+        return result.model_dump()
+
+    async def close(self, session_id: str):
+        """세션 종료 (남은 프레임 처리를 기다리므로 별도 스레드에서 실행)"""
+        await asyncio.get_running_loop().run_in_executor(None, self.sessions.close, session_id)
+
+    def load(self) -> dict:
+        return self.sessions.load()
+
+    def set_roster(self, home: List[dict], away: List[dict]):
+        """선수 명단 설정 (모든 세션 공유)"""
+        self.sessions.matcher.set_roster(home, away)
+        logger.info(f"명단 설정: 홈 {len(home)}명, 원정 {len(away)}명")
+
+    def match_player(self, track_id: int, team: str, number: int):
+        """수동 매칭: 추적 ID를 특정 선수에 할당"""
+        self.sessions.matcher.match_player(track_id, team, number)
+
+    def roster(self) -> dict:
+        """현재 명단과 팀별 인원"""
+        matcher = self.sessions.matcher
+        return {"roster": matcher.roster, "summary": matcher.get_roster_summary()}
+
+    def input_shape(self) -> Tuple[int, int]:
+        """캡처 프로파일 기준 모델 입력 크기 (h, w), 16:9 프레임 기준"""
+        return self.sessions.model.input_shape(DEFAULT_INPUT_SHAPE)
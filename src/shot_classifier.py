@@ -0,0 +1,86 @@
+"""
+샷 유형 분류 (wide / close / other)
+HUD는 전술 와이드 샷에서만 의미가 있으므로 나머지 샷은 추론을 건너뜀
+
+1. 잔디 비율 (PitchMask) - 잔디가 거의 없으면 관중/그래픽/실내 → other
+2. 와이드 vs 클로즈업
+   - 썸네일 CNN (SHOT_CLASSIFIER_MODEL_PATH가 있을 때, 입력 1 x 3 x 36 x 64, 출력 [wide, close])
+   - 없으면 피치 영역 중 잔디가 아닌 비율 (클로즈업은 선수가 화면 대부분을 가림)
+
+샷 단위로 캐시된 잔디 마스크가 바뀔 때만 다시 분류 (프레임마다 실행하지 않음)
+"""
+
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Optional
+
+from config import SHOT_CLOSE_OCCLUSION, SHOT_CLASSIFIER_MODEL_PATH
+from pitch import PitchMask
+
+logger = logging.getLogger(__name__)
+
+WIDE, CLOSE, OTHER = "wide", "close", "other"
+
+# CNN 출력 순서
+CNN_CLASSES = (WIDE, CLOSE)
+
+
+class ShotClassifier:
+    """잔디 마스크(+ 썸네일)로 샷 유형 판단"""
+
+    def __init__(self, model_path: Path = SHOT_CLASSIFIER_MODEL_PATH, session=None):
+        """
+        Args:
+            model_path: 썸네일 CNN ONNX 경로 (없으면 잔디 비율만 사용)
+            session: 이미 만든 InferenceSession (테스트용)
+        """
+        if session is None and model_path.exists():
+            # onnxruntime은 CNN 모델이 있을 때만 필요
+            import onnxruntime as ort
+
+            session = ort.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+            logger.info(f"샷 분류 CNN 로딩: {model_path}")
+        self.session = session
+        self.input_name = session.get_inputs()[0].name if session is not None else None
+
+        # 마지막 분류 (같은 마스크면 재사용)
+        self._mask: Optional[PitchMask] = None
+        self.shot_type = WIDE
+
+    def classify(self, pitch: PitchMask, thumbnail: Optional[np.ndarray] = None) -> str:
+        """
+        Args:
+            pitch: 샷 단위로 캐시된 잔디 마스크
+            thumbnail: 64x36 BGR 썸네일 (ShotBoundaryDetector.thumbnail, CNN 입력)
+
+        Returns:
+            "wide" | "close" | "other"
+        """
+        if pitch is self._mask:
+            return self.shot_type
+        self._mask = pitch
+
+        previous = self.shot_type
+        if not pitch.is_wide:
+            self.shot_type = OTHER
+        elif self.session is not None and thumbnail is not None:
+            self.shot_type = self._classify_cnn(thumbnail)
+        else:
+            self.shot_type = CLOSE if self._occlusion(pitch) > SHOT_CLOSE_OCCLUSION else WIDE
+
+        if self.shot_type != previous:
+            logger.info(f"샷 유형: {previous} → {self.shot_type}")
+        return self.shot_type
+
+    def _occlusion(self, pitch: PitchMask) -> float:
+        """피치 영역 중 잔디가 아닌 비율 (와이드 샷은 선수/라인이 작아서 낮음)"""
+        area = pitch.area > 0
+        if not area.any():
+            return 1.0
+        return float(np.count_nonzero(area & (pitch.mask == 0))) / np.count_nonzero(area)
+
+    def _classify_cnn(self, thumbnail: np.ndarray) -> str:
+        tensor = thumbnail[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+        logits = self.session.run(None, {self.input_name: np.ascontiguousarray(tensor)})[0]
+        return CNN_CLASSES[int(np.argmax(logits[0]))]
@@ -0,0 +1,62 @@
+"""
+슬라이스(타일) 추론 보조 함수
+고해상도 프레임을 겹치는 타일로 나누고, 타일별 결과를 교차 타일 NMS로 합침
+
+640 한 장으로 축소하면 멀리 있는 공은 몇 픽셀만 남아 놓치므로
+공 예측이 없을 때(컷 직후 등) 원본 해상도 타일을 한 배치로 추론해서 다시 찾음
+"""
+
+import numpy as np
+from typing import List, Tuple
+
+from preprocess import STRIDE
+
+
+def _starts(length: int, size: int, step: int) -> List[int]:
+    """한 축의 타일 시작 위치 (마지막 타일은 끝에 맞춤)"""
+    if length <= size:
+        return [0]
+    starts = list(range(0, length - size, step))
+    starts.append(length - size)
+    return starts
+
+
+def tile_grid(
+    frame_w: int, frame_h: int, size: int, overlap: float
+) -> List[Tuple[int, int, int, int]]:
+    """
+    겹치는 타일 목록 (x1, y1, x2, y2)
+
+    모든 타일은 같은 크기(size, 프레임이 더 작으면 stride 배수로 내림)라서 한 배치로 묶을 수 있음
+    """
+    tile_w = min(size, frame_w // STRIDE * STRIDE)
+    tile_h = min(size, frame_h // STRIDE * STRIDE)
+    step_x = max(1, int(tile_w * (1 - overlap)))
+    step_y = max(1, int(tile_h * (1 - overlap)))
+    return [
+        (x, y, x + tile_w, y + tile_h)
+        for y in _starts(frame_h, tile_h, step_y)
+        for x in _starts(frame_w, tile_w, step_x)
+    ]
+
+
+def nms(xyxy: np.ndarray, conf: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    탐욕적 NMS (타일 경계에서 같은 공이 두 번 잡힌 경우 제거)
+
+    Returns:
+        남길 인덱스 (신뢰도 내림차순)
+    """
+    order = np.argsort(-conf)
+    areas = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+    keep = []
+    while len(order):
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(xyxy[i, 2], xyxy[rest, 2]) - np.maximum(xyxy[i, 0], xyxy[rest, 0]), 0, None)
+        h = np.clip(np.minimum(xyxy[i, 3], xyxy[rest, 3]) - np.maximum(xyxy[i, 1], xyxy[rest, 1]), 0, None)
+        inter = w * h
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=int)
@@ -0,0 +1,111 @@
+"""
+스테이지 파이프라인 실행기
+각 스테이지를 전용 스레드에서 실행하고 스테이지 사이를 크기 제한 큐로 연결
+
+    decode → person → ball → post
+     (N+1)    (N)
+
+- 프레임 N이 추론 중일 때 프레임 N+1의 디코딩/letterbox를 동시에 수행
+- 스테이지마다 스레드 하나 + FIFO 큐 → 제출 순서대로 결과가 나옴 (세션 내 순서 보장)
+- 처리량은 모든 스테이지 시간의 합이 아니라 가장 느린 스테이지에 수렴
+"""
+
+import queue
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+from config import STAGE_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class StageQueueFull(Exception):
+    """첫 스테이지 큐가 가득 차서 프레임을 받지 못함 (대기하지 않는 제출)"""
+
+
+class StagePipeline:
+    """
+    스테이지 그래프 실행기 (선형 그래프)
+
+    각 스테이지 함수는 컨텍스트 객체를 받아 제자리에서 갱신
+    한 스테이지에서 예외가 나면 해당 프레임의 Future만 실패 처리하고 다음 프레임은 계속 진행
+    """
+
+    def __init__(
+        self,
+        stages: List[Tuple[str, Callable]],
+        queue_size: int = STAGE_QUEUE_SIZE,
+        name: str = "pipeline",
+    ):
+        """
+        Args:
+            stages: [(스테이지 이름, 함수(ctx))] 실행 순서대로
+            queue_size: 스테이지 사이 큐 크기 (가득 차면 앞 스테이지가 대기 → 메모리 제한)
+            name: 스레드 이름 접두사
+        """
+        self.stage_names = [stage_name for stage_name, _ in stages]
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self._threads = []
+
+        for index, (stage_name, fn) in enumerate(stages):
+            thread = threading.Thread(
+                target=self._worker,
+                args=(index, fn),
+                name=f"{name}-{stage_name}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, ctx, block: bool = True) -> Future:
+        """
+        프레임 컨텍스트 제출
+
+        Args:
+            block: 첫 스테이지 큐가 가득 차 있으면 빌 때까지 대기
+                (False면 바로 StageQueueFull로 실패한 Future 반환 → 이벤트 루프에서 호출할 때)
+
+        Returns:
+            모든 스테이지를 통과한 ctx를 결과로 갖는 Future
+        """
+        future = Future()
+        try:
+            self._queues[0].put((ctx, future), block=block)
+        except queue.Full:
+            future.set_exception(StageQueueFull(f"스테이지 큐 가득 참 ({self._queues[0].maxsize})"))
+        return future
+
+    def close(self):
+        """모든 스테이지 스레드 종료 (큐에 남은 프레임은 처리 후 종료)"""
+        self._queues[0].put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+
+    def _worker(self, index: int, fn: Callable):
+        """스테이지 하나의 워커 루프"""
+        in_queue = self._queues[index]
+        out_queue = self._queues[index + 1] if index + 1 < len(self._queues) else None
+
+        while True:
+            item = in_queue.get()
+            if item is _STOP:
+                if out_queue is not None:
+                    out_queue.put(_STOP)
+                return
+
+            ctx, future = item
+            try:
+                fn(ctx)
+            except Exception as e:
+                logger.error(f"스테이지 '{self.stage_names[index]}' 실패: {e}")
+                future.set_exception(e)
+                continue
+
+            if out_queue is not None:
+                out_queue.put((ctx, future))
+            else:
+                future.set_result(ctx)
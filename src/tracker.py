@@ -1,27 +1,124 @@
 """
-DeepSORT 기반 선수 추적 시스템
+선수 추적 시스템
 프레임 간 선수 ID 일관성 유지
+
+백엔드는 config.TRACKER_BACKEND로 선택
+- "bytetrack": IoU + 칼만 필터만 사용 (byte_tracker.py, 프레임당 1ms 미만)
+- "deepsort": 외형 임베딩 기반 ReID 포함 (느림)
 """
 
 import numpy as np
-from typing import List, Tuple, Optional
-from deep_sort_realtime.deepsort_tracker import DeepSort
+from typing import Dict, List, Tuple, Optional
 import logging
 
 from models import PlayerDetection
+from config import (
+    TRACKER_BACKEND,
+    TRACK_PREDICT_MAX_FRAMES,
+    REID_LAZY,
+    REID_REFRESH_INTERVAL,
+    REID_GATE_IOU,
+    REID_AMBIGUITY_IOU,
+    REID_EMBEDDER,
+    REID_GALLERY_SIZE,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class PlayerTracker:
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """박스 (N, 4) x (M, 4) xyxy → IoU 행렬 (N, M)"""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float64)
+
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+def warp_xyah_states(mean: np.ndarray, cov: np.ndarray, affine: np.ndarray):
+    """
+    칼만 상태 [cx, cy, a, h, vcx, vcy, va, vh]를 카메라 움직임 아핀 변환으로 이동 (제자리 수정)
+
+    Args:
+        mean: (N, 8)
+        cov: (N, 8, 8)
+        affine: 2x3 (회전 + 균일 스케일 + 이동)
+    """
+    if len(mean) == 0:
+        return
+    rotation, translation = affine[:, :2], affine[:, 2]
+    scale = float(np.sqrt(abs(np.linalg.det(rotation))))
+
+    mean[:, 0:2] = mean[:, 0:2] @ rotation.T + translation
+    mean[:, 4:6] = mean[:, 4:6] @ rotation.T
+    mean[:, 3] *= scale
+    mean[:, 7] *= scale
+
+    # 위치/속도 블록은 회전, 높이 성분은 스케일
+    transform = np.eye(8)
+    transform[0:2, 0:2] = rotation
+    transform[4:6, 4:6] = rotation
+    transform[3, 3] = transform[7, 7] = scale
+    cov[:] = transform @ cov @ transform.T
+
+
+class BaseTracker:
+    """추적기 인터페이스 (InferencePipeline은 이 메서드들만 사용)"""
+
+    def update(
+        self,
+        players: List[PlayerDetection],
+        frame: np.ndarray,
+    ) -> List[PlayerDetection]:
+        """
+        탐지 결과를 받아 추적 ID가 붙은 선수 리스트 반환
+
+        이번 프레임에 탐지와 연관되지 않은 확정 트랙은
+        TRACK_PREDICT_MAX_FRAMES 동안 predicted=True로 예측 위치를 보고
+        """
+        raise NotImplementedError
+
+    def apply_camera_motion(self, affine: np.ndarray):
+        """
+        이전 프레임 → 현재 프레임 카메라 변환(2x3)을 트랙 상태에 적용 (update 직전에 호출)
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """트랙 초기화 (카메라 전환 시)"""
+        raise NotImplementedError
+
+    def get_track_count(self) -> int:
+        """현재 추적 중인 트랙 수"""
+        raise NotImplementedError
+
+
+def create_tracker(backend: str = TRACKER_BACKEND) -> BaseTracker:
+    """설정된 백엔드의 추적기 생성"""
+    if backend == "bytetrack":
+        from byte_tracker import ByteTracker
+        return ByteTracker()
+    if backend == "deepsort":
+        return PlayerTracker()
+    raise ValueError(f"알 수 없는 추적 백엔드: {backend}")
+
+
+class PlayerTracker(BaseTracker):
     """
     DeepSORT를 사용한 선수 추적
 
     기능:
     - 프레임 간 선수 ID 일관성 유지
-    - 외형 기반 Re-Identification
-    - 카메라 전환 감지 및 자동 리셋
+    - 외형 기반 Re-Identification (lazy: 움직임만으로 애매한 탐지만 임베딩)
+    - 카메라 전환(샷 경계) 시 리셋 (판단은 shot_detector.py)
     """
 
     def __init__(
@@ -29,26 +126,47 @@ class PlayerTracker:
         max_age: int = 30,  # 30 프레임 동안 보이지 않으면 삭제
         n_init: int = 3,     # 3 프레임 연속 탐지되면 확정
         max_iou_distance: float = 0.7,
-        embedder: str = "mobilenet",  # 'mobilenet' | 'torchreid' | 'clip'
+        embedder: str = REID_EMBEDDER,  # 'onnx' | 'mobilenet' | 'torchreid' | 'clip'
+        lazy_reid: bool = REID_LAZY,
+        gallery_size: int = REID_GALLERY_SIZE,
     ):
         """
         Args:
             max_age: 트랙이 유지되는 최대 프레임 수 (보이지 않을 때)
             n_init: 트랙이 확정되기까지 필요한 연속 탐지 수
             max_iou_distance: IoU 임계값 (낮을수록 엄격)
-            embedder: ReID 모델 선택
+            embedder: ReID 모델 선택 ('onnx'는 reid.py의 배치 ONNX 임베더)
+            lazy_reid: 칼만 예측 박스와 IoU로 애매하지 않게 연관되는 탐지는
+                임베딩을 새로 계산하지 않고 트랙의 마지막 특징을 재사용
+            gallery_size: 트랙별로 보관하는 외형 특징 최대 개수 (오래된 것부터 버림)
         """
+        # DeepSORT는 torch 임베더를 함께 로드하므로 사용할 때만 import
+        from deep_sort_realtime.deepsort_tracker import DeepSort
+
+        # ONNX 임베더는 직접 실행하고 DeepSORT에는 특징만 전달
+        self.onnx_embedder = None
+        if embedder == "onnx":
+            from reid import OnnxReIDEmbedder
+            self.onnx_embedder = OnnxReIDEmbedder.shared()
+
         self.tracker = DeepSort(
             max_age=max_age,
             n_init=n_init,
             max_iou_distance=max_iou_distance,
-            embedder=embedder,
+            nn_budget=gallery_size,  # 트랙별 갤러리 상한 (90분 경기에도 메모리 고정)
+            embedder=None if self.onnx_embedder else embedder,
             embedder_gpu=False,  # CPU 사용 (속도 우선)
         )
 
-        # 카메라 전환 감지용
-        self.prev_detection_count = 0
-        self.camera_switch_threshold = 0.8  # 80% 이상 변화 시 전환으로 판단 (덜 민감하게)
+        # 트랙 ID → 마지막으로 연관된 선수 정보 (예측만 있는 프레임에서 팀/색상 유지용)
+        self.last_players: Dict[int, PlayerDetection] = {}
+
+        # Lazy ReID
+        self.lazy_reid = lazy_reid
+        self.reid_enabled = True  # False면 외형 캐스케이드 없이 칼만 예측 + IoU로만 연관 (적응형 품질/마감 시간)
+        self.frames_since_refresh = 0
+        self.embedded_count = 0  # 임베더로 계산한 탐지 수
+        self.reused_count = 0  # 트랙 특징을 재사용한 탐지 수
 
         logger.info(f"PlayerTracker 초기화 완료 (embedder={embedder})")
 
@@ -65,30 +183,32 @@ class PlayerTracker:
             frame: 원본 프레임 (BGR)
 
         Returns:
-            추적 ID가 업데이트된 선수 리스트
+            추적 ID가 업데이트된 선수 리스트 (탐지 없이 예측된 트랙은 predicted=True)
         """
-        # 카메라 전환 감지
-        if self._detect_camera_switch(len(players)):
-            logger.info("카메라 전환 감지 - 트랙 리셋")
-            self.reset()
-
         # DeepSORT 입력 형식으로 변환
         # Format: ([left, top, width, height], confidence, class_id)
-        detections = []
-        for player in players:
-            bbox = [
-                player.x - player.width / 2,   # left
-                player.y - player.height / 2,  # top
-                player.width,
-                player.height,
-            ]
-            detections.append((bbox, player.confidence, 0))  # class_id=0 (person)
-
-        # DeepSORT 업데이트
-        tracks = self.tracker.update_tracks(detections, frame=frame)
+        # DeepSORT는 너비/높이 0인 박스를 버리므로 미리 걸러서 others 인덱스를 맞춤
+        valid = [i for i, p in enumerate(players) if p.width > 0 and p.height > 0]
+        detections = [
+            (
+                [players[i].x - players[i].width / 2, players[i].y - players[i].height / 2,
+                 players[i].width, players[i].height],
+                players[i].confidence,
+                0,  # class_id=0 (person)
+            )
+            for i in valid
+        ]
+
+        # DeepSORT 업데이트 (탐지 인덱스를 others로 넘겨서 연관 결과에서 바로 꺼냄)
+        if self.reid_enabled:
+            embeds = self._embed(detections, frame)
+            tracks = self.tracker.update_tracks(detections, embeds=embeds, frame=frame, others=valid)
+        else:
+            tracks = self._update_by_motion(detections, valid, frame)
 
         # 추적 결과를 PlayerDetection에 반영
         tracked_players = []
+        live_ids = set()
 
         # 모든 트랙 사용 (confirmed + tentative)
         # n_init=3이므로 초기 프레임에서는 tentative 상태임
@@ -96,58 +216,178 @@ class PlayerTracker:
             if not track.is_confirmed() and not track.is_tentative():
                 continue
 
-            # DeepSORT의 바운딩 박스 (원본 detection과 매칭)
+            track_id = int(track.track_id)
+            live_ids.add(track_id)
+
+            # DeepSORT의 바운딩 박스 (칼만 보정 위치)
             ltwh = track.to_ltwh()
-            track_x = ltwh[0] + ltwh[2] / 2  # center x
-            track_y = ltwh[1] + ltwh[3] / 2  # center y
+            box = {
+                "id": track_id,
+                "x": float(ltwh[0] + ltwh[2] / 2),  # center x
+                "y": float(ltwh[1] + ltwh[3] / 2),  # center y
+                "width": float(ltwh[2]),
+                "height": float(ltwh[3]),
+                "vx": float(track.mean[4]),  # 칼만 상태 [cx, cy, a, h, vcx, vcy, va, vh]
+                "vy": float(track.mean[5]),
+            }
+
+            det_index = track.get_det_supplementary()
+            if det_index is not None:
+                # 이번 프레임에 탐지와 연관된 트랙 → 원본 선수 정보 복사
+                tracked_player = players[det_index].model_copy(update=box)
+                self.last_players[track_id] = tracked_player
+            elif track.is_confirmed() and track.time_since_update <= TRACK_PREDICT_MAX_FRAMES:
+                # 탐지 없이 예측 위치만 있는 트랙 (가림 등) → 명시적으로 표시
+                tracked_player = self.last_players[track_id].model_copy(
+                    update={**box, "predicted": True}
+                )
+            else:
+                continue
 
-            # 원본 players에서 가장 가까운 선수 찾기 (매칭)
-            min_dist = float('inf')
-            matched_player = None
+            tracked_players.append(tracked_player)
 
-            for player in players:
-                dist = np.sqrt((track_x - player.x)**2 + (track_y - player.y)**2)
-                if dist < min_dist:
-                    min_dist = dist
-                    matched_player = player
+        # 삭제된 트랙의 마지막 정보 정리
+        for track_id in self.last_players.keys() - live_ids:
+            del self.last_players[track_id]
 
-            if matched_player is None:
-                continue
+        return tracked_players
 
-            # 원본 선수 정보 복사
-            tracked_player = matched_player.model_copy()
+    def _embed(self, detections: List[tuple], frame: np.ndarray) -> List[np.ndarray]:
+        """
+        탐지별 외형 특징 (필요한 탐지만 한 번의 배치로 임베딩)
 
-            # 추적 ID 할당 (DeepSORT의 track_id를 int로 변환)
-            tracked_player.id = int(track.track_id)
+        임베딩하는 경우:
+        - 움직임(칼만 예측 IoU)만으로 연관이 애매하거나 후보 트랙이 없는 탐지
+        - 직전 프레임에 갱신되지 않은 트랙(가림 후 재등장)과 겹치는 탐지
+        - REID_REFRESH_INTERVAL 프레임마다 전체 (갤러리 갱신)
+        """
+        self.frames_since_refresh += 1
+        reuse = {}
+        if self.lazy_reid and self.frames_since_refresh < REID_REFRESH_INTERVAL:
+            reuse = self._reusable_features(detections)
+        else:
+            self.frames_since_refresh = 0
 
-            # 바운딩 박스 업데이트 (DeepSORT가 보정한 위치)
-            # numpy float32 → Python float 변환
-            tracked_player.x = float(track_x)
-            tracked_player.y = float(track_y)
-            tracked_player.width = float(ltwh[2])
-            tracked_player.height = float(ltwh[3])
+        embeds = [reuse.get(i) for i in range(len(detections))]
+        need = [i for i, e in enumerate(embeds) if e is None]
+        if need:
+            for i, feature in zip(need, self._compute_features([detections[i] for i in need], frame)):
+                embeds[i] = feature
 
-            tracked_players.append(tracked_player)
+        self.reused_count += len(reuse)
+        return embeds
 
-        self.prev_detection_count = len(players)
-        return tracked_players
+    def _compute_features(self, detections: List[tuple], frame: np.ndarray) -> List[np.ndarray]:
+        """임베더로 탐지 외형 특징 계산 (한 번의 배치)"""
+        if self.onnx_embedder is not None:
+            boxes = np.array([d[0] for d in detections], dtype=np.float32)
+            features = self.onnx_embedder(frame, boxes)
+        else:
+            features = self.tracker.generate_embeds(frame, detections)
+        self.embedded_count += len(detections)
+        return features
 
-    def _detect_camera_switch(self, current_count: int) -> bool:
+    def _update_by_motion(self, detections: List[tuple], valid: List[int], frame: np.ndarray) -> list:
         """
-        카메라 전환 감지
+        ReID 없이 칼만 예측 + IoU(마할라노비스 게이트)로만 연관 (적응형 품질/마감 시간 생략)
 
-        갑자기 탐지된 선수 수가 크게 변하면 카메라가 전환된 것으로 판단
+        DeepSORT의 외형 캐스케이드를 건너뛰므로 탐지 순서와 무관하게 위치로만 매칭됨
+        갤러리에는 실제 임베딩만 들어감:
+        - 연관된 트랙은 특징을 추가하지 않음 (자리표시 특징 없음)
+        - 새 트랙(연관되지 않은 탐지)만 임베딩해서 초기 특징으로 사용
+          → ReID를 다시 켰을 때 모든 확정 트랙이 갤러리를 가짐
         """
-        if self.prev_detection_count == 0:
-            return False
+        from deep_sort_realtime.deep_sort import iou_matching, linear_assignment
+
+        inner = self.tracker.tracker
+        dets = self.tracker.create_detections(detections, [None] * len(detections), others=valid)
+        inner.predict()
+
+        def gated_iou_cost(tracks, dets, track_indices, detection_indices):
+            cost = iou_matching.iou_cost(tracks, dets, track_indices, detection_indices)
+            return linear_assignment.gate_cost_matrix(
+                inner.kf, cost, tracks, dets, track_indices, detection_indices,
+                only_position=inner.gating_only_position,
+            )
+
+        matches, unmatched_tracks, unmatched_dets = linear_assignment.min_cost_matching(
+            gated_iou_cost, inner.max_iou_distance, inner.tracks, dets,
+            list(range(len(inner.tracks))), list(range(len(dets))),
+        )
+
+        for track_idx, det_idx in matches:
+            track = inner.tracks[track_idx]
+            track.update(inner.kf, dets[det_idx])
+            track.features.pop()  # update가 붙인 빈 특징 제거
+        for track_idx in unmatched_tracks:
+            inner.tracks[track_idx].mark_missed()
+        if unmatched_dets:
+            features = self._compute_features([detections[i] for i in unmatched_dets], frame)
+            for det_idx, feature in zip(unmatched_dets, features):
+                dets[det_idx].feature = feature
+                inner._initiate_track(dets[det_idx])
+        inner.tracks = [t for t in inner.tracks if not t.is_deleted()]
+
+        # 이번에 확정된 트랙의 초기 특징만 갤러리에 등록 (삭제된 트랙 갤러리는 정리)
+        metric = inner.metric
+        confirmed = [t for t in inner.tracks if t.is_confirmed()]
+        new = [t for t in confirmed if t.track_id not in metric.samples]
+        metric.partial_fit(
+            np.asarray([t.features[-1] for t in new]),
+            np.asarray([t.track_id for t in new]),
+            [t.track_id for t in confirmed],
+        )
+        return inner.tracks
+
+    def _reusable_features(self, detections: List[tuple]) -> Dict[int, np.ndarray]:
+        """
+        칼만 예측 박스와 일대일로만 겹치는 탐지 → 해당 트랙의 마지막 특징
+
+        Returns:
+            탐지 인덱스 → 재사용할 특징
+        """
+        tracks = self.tracker.tracker.tracks
+        if not tracks or not detections:
+            return {}
+
+        # 다음 프레임 예측 박스 (등속 모델: 위치 + 속도)
+        means = np.array([t.mean for t in tracks])
+        cx, cy, a, h = (means[:, :4] + means[:, 4:]).T
+        w = a * h
+        track_boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+        ltwh = np.array([d[0] for d in detections], dtype=np.float64)
+        det_boxes = np.concatenate([ltwh[:, :2], ltwh[:, :2] + ltwh[:, 2:]], axis=1)
+
+        iou = iou_matrix(det_boxes, track_boxes)  # (탐지, 트랙)
+        overlap = iou >= REID_AMBIGUITY_IOU
+        best = iou.argmax(axis=1)
+        # 직전 프레임에 갱신된 확정 트랙만 (재등장 트랙은 외형으로 다시 확인)
+        fresh = np.array([t.is_confirmed() and t.time_since_update == 0 for t in tracks])
+
+        unambiguous = (overlap.sum(axis=1) == 1) & (iou.max(axis=1) >= REID_GATE_IOU)
+        reuse = {}
+        for d in np.flatnonzero(unambiguous):
+            t = best[d]
+            if fresh[t] and overlap[:, t].sum() == 1:
+                reuse[int(d)] = tracks[t].features[-1]
+        return reuse
 
-        change_ratio = abs(current_count - self.prev_detection_count) / self.prev_detection_count
-        return change_ratio > self.camera_switch_threshold
+    def apply_camera_motion(self, affine: np.ndarray):
+        """DeepSORT 트랙들의 칼만 상태를 현재 프레임 좌표로 이동"""
+        tracks = self.tracker.tracker.tracks
+        if not tracks:
+            return
+        mean = np.array([t.mean for t in tracks], dtype=np.float64)
+        cov = np.array([t.covariance for t in tracks], dtype=np.float64)
+        warp_xyah_states(mean, cov, affine)
+        for track, m, c in zip(tracks, mean, cov):
+            track.mean, track.covariance = m, c
 
     def reset(self):
         """트랙 초기화 (카메라 전환 시)"""
         self.tracker.delete_all_tracks()
-        self.prev_detection_count = 0
+        self.last_players.clear()
         logger.info("트랙 리셋 완료")
 
     def get_track_count(self) -> int:
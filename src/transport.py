@@ -0,0 +1,174 @@
+"""
+게이트웨이 ↔ 추론 노드 전송 계층
+TCP 위에 길이 프리픽스 프레임으로 메시지를 주고받음
+
+메시지 형식:
+    [header 길이 4B][body 길이 4B][header JSON][body 바이트]
+
+header 예시:
+    {"type": "frame", "request_id": 3, "session_id": "..."}  + body = JPEG 바이트
+    {"type": "result", "request_id": 3, "load": {...}}        + body = 결과 JSON
+"""
+
+import json
+import struct
+import asyncio
+import itertools
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 네트워크 바이트 순서, 부호 없는 32비트 정수 2개
+FRAME_HEADER = struct.Struct("!II")
+
+# 비정상 길이로 메모리를 잡아먹지 않도록 상한 설정
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 32 * 1024 * 1024
+
+
+class TransportError(Exception):
+    """전송 계층 오류 (연결 끊김, 잘못된 프레임 등)"""
+
+
+async def write_message(
+    writer: asyncio.StreamWriter, header: dict, body: bytes = b""
+):
+    """메시지 하나를 길이 프리픽스 프레임으로 전송"""
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    writer.write(FRAME_HEADER.pack(len(header_bytes), len(body)))
+    writer.write(header_bytes)
+    if body:
+        writer.write(body)
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[dict, bytes]:
+    """
+    메시지 하나 수신
+
+    Raises:
+        TransportError: 연결이 끊겼거나 프레임이 잘못된 경우
+    """
+    try:
+        prefix = await reader.readexactly(FRAME_HEADER.size)
+        header_len, body_len = FRAME_HEADER.unpack(prefix)
+
+        if header_len > MAX_HEADER_SIZE or body_len > MAX_BODY_SIZE:
+            raise TransportError(
+                f"프레임 크기 초과 (header={header_len}, body={body_len})"
+            )
+
+        header = json.loads(await reader.readexactly(header_len))
+        body = await reader.readexactly(body_len) if body_len else b""
+    except asyncio.IncompleteReadError as e:
+        raise TransportError("연결 끊김") from e
+
+    return header, body
+
+
+class NodeClient:
+    """
+    추론 노드 하나에 대한 클라이언트 (게이트웨이 측)
+
+    하나의 TCP 연결에 여러 세션의 요청을 request_id로 다중화
+    노드가 응답마다 보내는 부하 정보를 `load`에 보관
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.address = f"{host}:{port}"
+
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.load: dict = {"sessions": 0, "utilization": 0.0}
+
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self):
+        """노드에 연결하고 응답 수신 루프 시작"""
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self._reader_task = asyncio.create_task(self._read_loop())
+        logger.info(f"추론 노드 연결됨: {self.address}")
+
+    async def close(self):
+        """연결 종료"""
+        if self.writer is not None:
+            self.writer.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self._fail_pending(TransportError("연결 종료"))
+        self.writer = None
+
+    async def request(
+        self, header: dict, body: bytes = b"", timeout: Optional[float] = None
+    ) -> Tuple[dict, bytes]:
+        """
+        요청 전송 후 같은 request_id의 응답을 기다림
+
+        Args:
+            timeout: 응답 대기 제한 (초, None이면 무제한)
+
+        Raises:
+            TransportError: 연결이 없거나 노드가 error 응답을 보낸 경우
+            asyncio.TimeoutError: timeout 안에 응답이 없는 경우
+        """
+        if not self.connected:
+            raise TransportError(f"노드 연결 없음: {self.address}")
+
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            async with self._write_lock:
+                await write_message(self.writer, {**header, "request_id": request_id}, body)
+            reply_header, reply_body = await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+        if reply_header.get("type") == "error":
+            raise TransportError(reply_header.get("message", "노드 처리 실패"))
+
+        return reply_header, reply_body
+
+    async def send(self, header: dict):
+        """응답이 필요 없는 메시지 전송 (예: 세션 종료 알림)"""
+        if not self.connected:
+            return
+        async with self._write_lock:
+            await write_message(self.writer, header)
+
+    async def _read_loop(self):
+        """응답을 읽어서 대기 중인 요청에 전달"""
+        try:
+            while True:
+                header, body = await read_message(self.reader)
+
+                if "load" in header:
+                    self.load = header["load"]
+
+                future = self._pending.get(header.get("request_id"))
+                if future is not None and not future.done():
+                    future.set_result((header, body))
+        except TransportError as e:
+            logger.warning(f"추론 노드 연결 끊김: {self.address} ({e})")
+            self._fail_pending(e)
+            self.writer = None
+        except asyncio.CancelledError:
+            pass
+
+    def _fail_pending(self, error: Exception):
+        """대기 중인 모든 요청을 실패 처리"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
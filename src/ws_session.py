@@ -0,0 +1,299 @@
+"""
+WebSocket 세션 처리
+단일 서버(main.py)와 게이트웨이(gateway.py)가 공유하는 프레임 수신/결과 전송 루프
+
+클라이언트는 연결 URL 쿼리로 우선순위와 원하는 FPS를 알림:
+    ws://localhost:8765/ws?priority=live&fps=5
+서버는 연결 직후, 그리고 허용 FPS나 서버 부하 단계가 바뀔 때마다 캡처 프로파일을 알림:
+    {"type": "profile", "max_width": 1280, "max_height": 768, "jpeg_quality": 70, "fps": 4.0, "loaded": false}
+
+프레임과 제어 메시지는 JSON 객체 문자열로 보냄 (Base64 문자열만 보내면 추적 정보 없는 프레임):
+    {"type": "frame", "frame_id": 42, "capture_ts": 1700000000.10, "image": "<Base64 JPEG>"}
+    → 결과에 frame_id, capture_ts와 서버 receive/start/end/send 시각을 담아 돌려줌
+    {"type": "ping", "t0": 1700000000.00, "offset": 0.012, "rtt": 0.020}
+    → {"type": "pong", "t0": ..., "t1": 서버 수신, "t2": 서버 전송} (NTP 방식)
+      클라이언트가 offset = ((t1 - t0) + (t2 - t3)) / 2 를 계산해서 다음 ping에 실어 보냄
+    {"type": "predict", "time": 1700000000.25}
+    → 마지막 결과를 그 시각으로 외삽한 {"type": "prediction", "players": [...], "ball": {...}}
+      (time은 결과의 reference_time과 같은 서버 시계, 생략하면 서버 현재 시각)
+
+모든 시각은 time.time() 기준 초, 구간별 지연(uplink, queue, inference, return, server)은 latency에 집계
+게이트웨이 구성에서 start/end는 추론 노드 시계이므로 노드와 게이트웨이 시계가 맞아야 함 (NTP)
+"""
+
+import json
+import time
+import uuid
+import base64
+import asyncio
+import logging
+import traceback
+from typing import Dict, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from scheduler import FrameScheduler
+from capture_profile import capture_profile, LoadLevel, DEFAULT_INPUT_SHAPE
+from models import CaptureProfile, DetectionResult
+from motion import predict
+from metrics import LatencyStats
+from config import TARGET_FPS, CAPTURE_PROFILE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# 세션 ID → WebSocket (캡처 프로파일 알림용)
+_connections: Dict[str, WebSocket] = {}
+# 세션 ID → 마지막으로 보낸 캡처 프로파일 (바뀔 때만 다시 전송)
+_profiles: Dict[str, CaptureProfile] = {}
+# 세션 ID → 마지막 결과 (예측 요청용)
+_last_results: Dict[str, dict] = {}
+# 세션 ID → 클라이언트 시계 차이 (서버 시계 - 클라이언트 시계, 초, ping으로 추정)
+_clock_offsets: Dict[str, float] = {}
+
+# 모든 세션의 구간별 지연 (/api/metrics)
+latency = LatencyStats()
+
+# 서버 부하 단계 (모든 세션 공통, CAPTURE_PROFILE_INTERVAL마다 백엔드에 조회)
+_load_level = LoadLevel()
+_last_load_check = 0.0
+_input_shape = DEFAULT_INPUT_SHAPE
+
+
+def decode_frame_message(data: str) -> bytes:
+    """Base64 (또는 data URL) 문자열을 JPEG 바이트로 디코딩"""
+    # "data:image/jpeg;base64," 프리픽스 제거
+    if data.startswith("data:image"):
+        data = data.split(",")[1]
+
+    return base64.b64decode(data)
+
+
+def parse_frame_message(message: dict) -> Tuple[bytes, dict]:
+    """
+    프레임 메시지 → (JPEG 바이트, 추적 정보)
+
+    Args:
+        message: {"type": "frame", "image": ..., "frame_id": ..., "capture_ts": ...}
+
+    Returns:
+        추적 정보는 {"frame_id", "capture_ts"} 중 클라이언트가 보낸 것만
+    """
+    trace = {}
+    if message.get("frame_id") is not None:
+        trace["frame_id"] = int(message["frame_id"])
+    if message.get("capture_ts") is not None:
+        trace["capture_ts"] = float(message["capture_ts"])
+    return decode_frame_message(message["image"]), trace
+
+
+def finish_result(session_id: str, result: dict, trace: dict):
+    """
+    전송 직전 결과에 추적 정보를 채우고 구간별 지연 기록
+
+    Args:
+        result: 백엔드 결과 dict (start_ts, end_ts는 파이프라인이 채움)
+        trace: 프레임 추적 정보 (frame_id, capture_ts, receive_ts)
+    """
+    result.update(trace)
+    result["send_ts"] = send = time.time()
+    receive, start, end = result["receive_ts"], result["start_ts"], result["end_ts"]
+
+    # 움직임 기준 시각을 캡처 시각(서버 시계)으로, 시계 차이를 모르면 서버 수신 시각
+    offset = _clock_offsets.get(session_id)
+    capture = result.get("capture_ts")
+    captured = capture + offset if (capture is not None and offset is not None) else None
+    result["reference_time"] = captured if captured is not None else receive
+
+    if captured is not None:
+        latency.record("uplink", receive - captured)  # 캡처 → 서버 수신 (인코딩 + 네트워크)
+    latency.record("queue", start - receive)  # 스케줄러/스테이지 큐 대기 (게이트웨이면 노드 전송 포함)
+    latency.record("inference", end - start)
+    latency.record("return", send - end)  # 결과 직렬화 (게이트웨이면 노드 → 게이트웨이 전송 포함)
+    latency.record("server", send - receive)
+
+
+def handle_control(session_id: str, message: dict, received: Optional[float] = None) -> dict:
+    """
+    제어 메시지 처리 → 응답 메시지
+
+    Args:
+        message: 클라이언트가 보낸 JSON 객체 ({"type": "ping" | "predict", ...})
+        received: 메시지 수신 시각 (ping 응답의 t1, None이면 현재 시각)
+    """
+    msg_type = message.get("type")
+    if msg_type == "ping":
+        # 클라이언트가 이전 ping으로 계산한 시계 차이/왕복 시간
+        if message.get("offset") is not None:
+            _clock_offsets[session_id] = float(message["offset"])
+        if message.get("rtt") is not None:
+            latency.record("rtt", float(message["rtt"]))
+        return {
+            "type": "pong",
+            "t0": message.get("t0"),
+            "t1": received if received is not None else time.time(),
+            "t2": time.time(),
+        }
+    if msg_type == "predict":
+        result = _last_results.get(session_id)
+        if result is None:
+            return {"error": "아직 탐지 결과가 없음", "status": "no_result"}
+        at = float(message.get("time", time.time()))
+        return predict(DetectionResult.model_validate(result), at).model_dump()
+    return {"error": f"알 수 없는 메시지 타입: {msg_type}", "status": "bad_request"}
+
+
+async def advertise_profile(session_id: str, fps: Optional[float] = None):
+    """
+    클라이언트에 캡처 프로파일 알림 (이전에 보낸 것과 같으면 생략)
+
+    Args:
+        fps: 새 허용 FPS (None이면 이전 프로파일의 FPS 유지)
+    """
+    websocket = _connections.get(session_id)
+    if websocket is None:
+        return
+
+    previous = _profiles.get(session_id)
+    if fps is None:
+        fps = previous.fps if previous is not None else float(TARGET_FPS)
+    profile = capture_profile(fps, _load_level.loaded, _input_shape)
+    if profile == previous:
+        return
+
+    _profiles[session_id] = profile
+    try:
+        await websocket.send_json(profile.model_dump())
+    except Exception as e:
+        logger.warning(f"캡처 프로파일 알림 실패 (세션 {session_id}): {e}")
+
+
+async def notify_grant(session_id: str, granted_fps: float):
+    """FrameScheduler의 on_grant 콜백: 허용 FPS가 바뀐 프로파일 알림"""
+    await advertise_profile(session_id, fps=granted_fps)
+
+
+async def refresh_load(backend):
+    """
+    주기적으로 백엔드 부하를 조회해서 과부하 단계가 바뀌면 모든 세션에 프로파일 재전송
+
+    Args:
+        backend: load() -> {"utilization": 0~1, ...} 를 제공하면 사용 (없으면 기본 프로파일 유지)
+    """
+    global _last_load_check
+    now = time.monotonic()
+    if now - _last_load_check < CAPTURE_PROFILE_INTERVAL or not hasattr(backend, "load"):
+        return
+    _last_load_check = now
+
+    if _load_level.update(backend.load().get("utilization", 0.0)):
+        for session_id in list(_connections):
+            await advertise_profile(session_id)
+
+
+async def run_session(websocket: WebSocket, backend, scheduler: FrameScheduler):
+    """
+    WebSocket 연결 하나를 처리
+
+    프레임은 수신 즉시 스케줄러에 제출하고, 처리가 끝나는 대로 결과를 전송
+    (세션 내 처리 순서는 스케줄러가 보장)
+
+    Args:
+        websocket: 클라이언트 WebSocket
+        backend: async process(session_id, frame_bytes, received) -> dict 와
+                 async close(session_id) 를 제공하는 처리 백엔드
+        scheduler: 전역 프레임 스케줄러
+    """
+    global _input_shape
+    await websocket.accept()
+    session_id = uuid.uuid4().hex
+    if hasattr(backend, "input_shape"):
+        _input_shape = backend.input_shape()
+
+    priority = websocket.query_params.get("priority", "live")
+    try:
+        requested_fps = float(websocket.query_params.get("fps", TARGET_FPS))
+    except ValueError:
+        requested_fps = float(TARGET_FPS)
+
+    logger.info(f"WebSocket 클라이언트 연결됨 (세션 {session_id}, {priority}, {requested_fps} FPS 요청)")
+
+    frame_count = 0
+
+    # 즉시 테스트 메시지 전송
+    await websocket.send_json({"test": "hello from server", "status": "connected"})
+
+    # 첫 캡처 프로파일 (등록 시 허용 FPS가 정해지며 notify_grant와 중복이면 한 번만 전송)
+    _connections[session_id] = websocket
+    granted_fps = scheduler.register(session_id, priority, requested_fps)
+    await advertise_profile(session_id, fps=granted_fps)
+
+    async def handle_frame(frame_number: int, frame_bytes: bytes, trace: dict):
+        try:
+            # YOLO 추론 (로컬 또는 추론 노드), 스케줄러가 순서와 속도 조절
+            result_json = await scheduler.submit(
+                session_id, lambda: backend.process(session_id, frame_bytes, received=trace["receive_ts"])
+            )
+            if result_json is None:
+                logger.info(f"프레임 #{frame_number} 폐기 (세션 큐 초과)")
+                return
+
+            logger.info(
+                f"프레임 #{frame_number} 처리 완료 - 선수: {len(result_json['players'])}명, "
+                f"공: {'O' if result_json['ball'] else 'X'}"
+            )
+            finish_result(session_id, result_json, trace)
+            _last_results[session_id] = result_json
+            await websocket.send_json(result_json)
+            await refresh_load(backend)
+
+        except Exception as e:
+            logger.error(f"프레임 처리 중 에러: {e}")
+            logger.error(traceback.format_exc())
+            try:
+                await websocket.send_json({"error": str(e), "status": "processing_failed"})
+            except Exception:
+                pass
+
+    try:
+        while True:
+            # 프레임 또는 제어 메시지 수신
+            data = await websocket.receive_text()
+            received = time.time()
+
+            if data.startswith("{"):
+                try:
+                    message = json.loads(data)
+                    if message.get("type") != "frame":
+                        await websocket.send_json(handle_control(session_id, message, received))
+                        continue
+                except Exception as e:
+                    logger.error(f"제어 메시지 처리 실패: {e}")
+                    await websocket.send_json({"error": str(e), "status": "bad_request"})
+                    continue
+            else:
+                message = {"image": data}  # 추적 정보 없는 Base64 프레임 (이전 클라이언트)
+
+            frame_count += 1
+            logger.info(f"프레임 #{frame_count} 수신 (크기: {len(data)} bytes)")
+
+            try:
+                frame_bytes, trace = parse_frame_message(message)
+            except Exception as e:
+                logger.error(f"프레임 디코딩 실패: {e}")
+                await websocket.send_json({"error": str(e), "status": "processing_failed"})
+                continue
+
+            trace["receive_ts"] = received
+            asyncio.create_task(handle_frame(frame_count, frame_bytes, trace))
+
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket 클라이언트 연결 끊김 (세션 {session_id})")
+    except Exception as e:
+        logger.error(f"WebSocket 에러: {e}")
+    finally:
+        _connections.pop(session_id, None)
+        _profiles.pop(session_id, None)
+        _last_results.pop(session_id, None)
+        _clock_offsets.pop(session_id, None)
+        scheduler.unregister(session_id)
+        await backend.close(session_id)
@@ -0,0 +1,200 @@
+"""
+공 칼만 추적기 테스트
+포물선 궤적 추적, 짧은 공백 예측, 게이트 밖 오탐 무시, ROI 탐지 영역 확인 (합성 좌표 사용)
+파이프라인이 뒤처진 공 예측으로 ROI를 잡지 않고, 일시정지 후 ROI로 돌아오는지 확인 (가짜 모델 사용)
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from ball_tracker import BallTracker
+from config import BALL_TRACK_MAX_GAP, BALL_ROI_MIN_SIZE, BALL_ROI_MAX_SIZE, BALL_ROI_MAX_STEPS
+
+
+def _box(x, y, size=12):
+    return np.array([[x - size / 2, y - size / 2, x + size / 2, y + size / 2]], dtype=np.float64)
+
+
+def _trajectory(t):
+    """오른쪽으로 차고 중력처럼 아래로 가속하는 공"""
+    return 200 + 15 * t, 500 - 20 * t + 0.6 * t ** 2
+
+
+NONE = np.zeros((0, 4)), np.zeros(0)
+
+
+def test_follows_and_predicts_gap():
+    tracker = BallTracker()
+    rng = np.random.default_rng(0)
+    for t in range(15):
+        x, y = _trajectory(t)
+        ball = tracker.update(_box(x + rng.normal(0, 1), y + rng.normal(0, 1)), np.array([0.6]))
+    assert ball is not None and not tracker.state().predicted
+    settled = tracker.uncertainty
+
+    # 3프레임 놓침 → 예측 위치로 계속 표시
+    for t in range(15, 18):
+        ball = tracker.update(*NONE)
+        x, y = _trajectory(t)
+        assert ball is not None, "짧은 공백은 예측으로 채워야 함"
+        assert np.hypot(ball.x - x, ball.y - y) < 6, (t, ball, (x, y))
+
+    state = tracker.state()
+    assert state.predicted and state.frames_since_seen == 3
+    assert state.uncertainty > settled, "놓친 동안 불확실성 증가"
+    assert abs(state.vx - 15) < 2 and 0 < state.ay < 3, state
+    print(f"✅ 포물선 추적 + 공백 예측 확인 (불확실성 {settled:.1f}px → {state.uncertainty:.1f}px)")
+
+
+def test_gating_rejects_false_positives():
+    tracker = BallTracker()
+    for t in range(6):
+        tracker.update(_box(*_trajectory(t)), np.array([0.6]))
+    assert tracker.confirmed and tracker.frames_since_seen == 0
+
+    # 멀리 있는 높은 신뢰도 오탐(관중 머리)보다 게이트 안 낮은 신뢰도 후보를 선택
+    x, y = _trajectory(6)
+    candidates = np.concatenate([_box(900, 100), _box(x + 1, y - 1)])
+    ball = tracker.update(candidates, np.array([0.9, 0.2]))
+    assert abs(ball.x - x) < 3, ball
+
+    # 게이트 밖 후보만 있으면 예측 유지
+    ball = tracker.update(_box(900, 100), np.array([0.9]))
+    assert tracker.state().predicted and abs(ball.x - _trajectory(7)[0]) < 5
+    print("✅ 게이트 밖 오탐 무시 확인")
+
+
+def test_init_threshold_and_lost_reset():
+    tracker = BallTracker()
+    assert tracker.update(_box(100, 100), np.array([0.2])) is None, "낮은 신뢰도로는 새 트랙을 만들지 않음"
+
+    for t in range(4):
+        tracker.update(_box(*_trajectory(t)), np.array([0.6]))
+    for _ in range(BALL_TRACK_MAX_GAP):
+        assert tracker.update(*NONE) is not None
+    assert tracker.update(*NONE) is None
+    assert tracker.state() is None, "오래 놓치면 추적 종료"
+    print("✅ 시작 임계값 + 추적 종료 확인")
+
+
+def test_search_window():
+    tracker = BallTracker()
+    assert tracker.search_window(1280, 720) is None, "추적 중이 아니면 전체 프레임 탐지"
+
+    for t in range(10):
+        tracker.update(_box(*_trajectory(t)), np.array([0.6]))
+    x1, y1, x2, y2 = tracker.search_window(1280, 720)
+    x, y = _trajectory(10)
+    assert x1 < x < x2 and y1 < y < y2, "다음 위치가 영역 안"
+    assert x2 - x1 == BALL_ROI_MIN_SIZE and (x2 - x1) % 32 == 0
+
+    # 여러 프레임 앞 예측일수록 넓어지고, 프레임 경계 안으로 밀림
+    far = tracker.search_window(1280, 720, steps=8)
+    assert BALL_ROI_MIN_SIZE < far[2] - far[0] <= BALL_ROI_MAX_SIZE, far
+    assert far[0] >= 0 and far[1] >= 0 and far[2] <= 1280 and far[3] <= 720, far
+    assert far[3] - far[1] == far[2] - far[0], "경계에 닿아도 크기 유지"
+    print(f"✅ ROI 탐지 영역 확인 (1프레임 {x2 - x1}px, 8프레임 {far[2] - far[0]}px)")
+
+
+def test_camera_motion_replaces_state():
+    """카메라 보정은 상태 배열을 새로 만들어 교체 (공 스테이지가 잡아 둔 상태는 그대로)"""
+    tracker = BallTracker()
+    for t in range(6):
+        tracker.update(_box(*_trajectory(t)), np.array([0.6]))
+    mean, cov = tracker.mean, tracker.cov
+    saved = mean.copy(), cov.copy()
+
+    angle = np.deg2rad(2)
+    affine = np.array([[np.cos(angle), -np.sin(angle), 30], [np.sin(angle), np.cos(angle), -10]])
+    tracker.apply_camera_motion(affine)
+    assert np.array_equal(mean, saved[0]) and np.array_equal(cov, saved[1])
+    assert np.allclose(tracker.mean[:2], affine[:, :2] @ saved[0][:2] + affine[:, 2])
+    assert np.allclose(tracker.mean[2:4], affine[:, :2] @ saved[0][2:4])
+    print("✅ 카메라 보정 상태 교체 확인")
+
+
+def _ball_pipeline(shot_types=None):
+    """공 하나가 오른쪽으로 움직이는 가짜 모델 + ROI 방식 기록 (shot_types: 프레임 순번 → 샷 유형)"""
+    import logging
+    from inference import InferencePipeline, ModelRunner
+    from test_cascade import FakeModel
+
+    logging.disable(logging.INFO)
+
+    def ball(call):
+        x = 100 + 4 * (call // 2)  # 모델 입력 좌표, 호출 2번(선수/공 패스)마다 이동
+        return [[x, 200, x + 8, 208, 0.8, 32]]
+
+    pipeline = InferencePipeline(enable_tracking=False, model=ModelRunner(FakeModel(ball)), keyframe_mode=False)
+    pipeline.fingerprint = None
+    pipeline.camera_motion = None
+    pipeline.quality = None
+
+    class FakeShots:
+        frames = 0
+
+        def classify(self, pitch, thumbnail=None):
+            self.frames += 1
+            return (shot_types or {}).get(self.frames - 1, "wide")
+
+    pipeline.shot_classifier = FakeShots()
+    searches = []
+    stages = dict(pipeline.stages)
+
+    def ball_stage(ctx):
+        stages["ball"](ctx)
+        searches.append("paused" if ctx.paused else ctx.ball_search)
+
+    pipeline.stages = [(name, ball_stage if name == "ball" else fn) for name, fn in pipeline.stages]
+    return pipeline, searches
+
+
+def test_stale_roi_falls_back():
+    """공 추적기에 반영된 프레임보다 BALL_ROI_MAX_STEPS 넘게 앞선 프레임은 ROI 대신 전체 프레임 탐지"""
+    from inference import FrameContext
+    from test_cascade import FRAME
+
+    pipeline, _ = _ball_pipeline()
+    for _ in range(4):
+        pipeline.process(FRAME)
+    assert pipeline.ball_tracker.active
+
+    ctx = FrameContext(FRAME)
+    ctx.frame_size = (1280, 720)
+    ctx.index = pipeline._ball_index + 1  # 추적기가 따라온 바로 다음 프레임
+    assert pipeline._ball_roi(ctx) is not None
+    ctx.index += BALL_ROI_MAX_STEPS
+    assert pipeline._ball_roi(ctx) is None, "너무 멀리 외삽한 ROI는 쓰지 않음"
+    print(f"✅ 뒤처진 공 예측 ROI 생략 확인 ({BALL_ROI_MAX_STEPS}프레임 초과)")
+
+
+def test_roi_resumes_after_pause():
+    """BALL_ROI_MAX_STEPS보다 긴 일시정지(클로즈업) 뒤에도 공을 다시 잡으면 ROI 탐지로 돌아옴"""
+    from test_cascade import FRAME
+
+    pause = range(4, 4 + BALL_ROI_MAX_STEPS + 6)
+    pipeline, searches = _ball_pipeline({i: "close" for i in pause})
+    for _ in range(pause.stop + 6):
+        pipeline.process(FRAME)
+
+    assert "roi" in searches[:pause.start], searches
+    assert searches[pause.start:pause.stop] == ["paused"] * len(pause), searches
+    assert searches[-1] == "roi", searches
+    print(f"✅ 일시정지 후 ROI 탐지 복귀 확인 ({' '.join(searches)})")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 공 추적기 테스트")
+    print("=" * 60)
+    test_follows_and_predicts_gap()
+    test_gating_rejects_false_positives()
+    test_init_threshold_and_lost_reset()
+    test_search_window()
+    test_camera_motion_replaces_state()
+    test_stale_roi_falls_back()
+    test_roi_resumes_after_pause()
@@ -0,0 +1,110 @@
+"""
+ByteTrack 추적기 테스트
+ID 유지, 낮은 신뢰도 탐지 연관, 리셋, 처리 시간 확인 (합성 탐지 사용)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from models import PlayerDetection
+from byte_tracker import ByteTracker, iou_matrix
+from tracker import create_tracker
+
+FRAME = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+def _players(positions, confidences=None):
+    confidences = confidences or [0.9] * len(positions)
+    return [
+        PlayerDetection(
+            id=i, x=float(x), y=float(y), width=30.0, height=70.0,
+            team="home", color=[255, 255, 255], confidence=conf,
+        )
+        for i, ((x, y), conf) in enumerate(zip(positions, confidences))
+    ]
+
+
+def test_iou_matrix():
+    a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float64)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10]], dtype=np.float64)
+    iou = iou_matrix(a, b)
+    assert np.allclose(iou, [[1.0, 50 / 150], [0.0, 0.0]]), iou
+    print("✅ IoU 행렬 확인")
+
+
+def test_ids_follow_moving_players():
+    """입력 순서가 바뀌어도 같은 선수는 같은 ID"""
+    tracker = ByteTracker()
+    starts = np.array([[100, 300], [400, 300], [700, 300]], dtype=float)
+    velocity = np.array([[6, 0], [-4, 2], [0, -5]], dtype=float)
+
+    ids_by_player = {}
+    for frame_idx in range(20):
+        positions = starts + velocity * frame_idx
+        order = np.roll(np.arange(3), frame_idx)  # 탐지 순서 섞기
+        tracked = tracker.update(_players(positions[order]), FRAME)
+        assert len(tracked) == 3, len(tracked)
+        for p in tracked:
+            player = int(np.argmin(np.linalg.norm(positions - [p.x, p.y], axis=1)))
+            ids_by_player.setdefault(player, set()).add(p.id)
+
+    assert all(len(ids) == 1 for ids in ids_by_player.values()), ids_by_player
+    print(f"✅ ID 유지 확인 {ids_by_player}")
+
+
+def test_low_confidence_keeps_track():
+    """가려져서 신뢰도가 낮아진 탐지도 기존 트랙에 연관 (새 트랙은 만들지 않음)"""
+    tracker = ByteTracker()
+    for i in range(5):
+        first = tracker.update(_players([(200 + i * 3, 300)]), FRAME)
+
+    occluded = tracker.update(_players([(215, 300)], [0.3]), FRAME)
+    assert [p.id for p in occluded] == [first[0].id], occluded
+
+    stranger = tracker.update(_players([(215, 300), (900, 500)], [0.3, 0.3]), FRAME)
+    assert [p.id for p in stranger] == [first[0].id], "낮은 신뢰도 탐지로 새 트랙이 생기면 안 됨"
+    print("✅ 낮은 신뢰도 연관 확인")
+
+
+def test_reset_and_factory():
+    tracker = create_tracker("bytetrack")
+    tracker.update(_players([(100, 100), (300, 300)]), FRAME)
+    assert tracker.get_track_count() == 2
+    tracker.reset()
+    assert tracker.get_track_count() == 0
+    print("✅ 리셋 + 백엔드 선택 확인")
+
+
+def test_tracker_is_cheap():
+    """선수 25명, 프레임당 1ms 안쪽"""
+    tracker = ByteTracker()
+    rng = np.random.default_rng(0)
+    starts = rng.uniform([50, 100], [1200, 650], size=(25, 2))
+    frames = [_players(starts + i * 2 + rng.normal(0, 1, size=starts.shape)) for i in range(200)]
+
+    for players in frames[:10]:
+        tracker.update(players, FRAME)
+    start = time.perf_counter()
+    for players in frames[10:]:
+        tracker.update(players, FRAME)
+    per_frame_ms = (time.perf_counter() - start) / (len(frames) - 10) * 1000
+    print(f"프레임당 {per_frame_ms:.3f}ms (트랙 {tracker.get_track_count()}개)")
+    assert tracker.get_track_count() == 25
+    assert per_frame_ms < 3.0, per_frame_ms  # CI 여유분 포함
+    print("✅ 추적 비용 확인")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 ByteTrack 추적기 테스트")
+    print("=" * 60)
+    test_iou_matrix()
+    test_ids_follow_moving_players()
+    test_low_confidence_keeps_track()
+    test_reset_and_factory()
+    test_tracker_is_cheap()
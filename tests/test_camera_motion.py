@@ -0,0 +1,93 @@
+"""
+카메라 움직임 보정 테스트
+배경 특징점으로 패닝을 추정하고, 보정된 추적기가 갑작스런 패닝에도 ID를 유지하는지 확인
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from camera_motion import CameraMotionEstimator
+from keyframe import prepare_flow_frame
+from byte_tracker import ByteTracker
+from models import PlayerDetection
+
+WIDTH, HEIGHT = 1280, 720
+TEXTURE = np.kron(
+    np.random.default_rng(0).integers(0, 255, size=(HEIGHT // 8, (WIDTH + 800) // 8, 3), dtype=np.uint8),
+    np.ones((8, 8, 1), dtype=np.uint8),
+)
+PLAYER_POSITIONS = np.array([[300, 300], [700, 400], [1000, 250]], dtype=np.float64)
+
+
+def _frame(pan: int, player_shift: int = 0) -> np.ndarray:
+    """카메라가 pan만큼 오른쪽으로 이동한 배경 + 배경과 다르게 움직이는 선수 블록"""
+    frame = np.ascontiguousarray(TEXTURE[:HEIGHT, pan:pan + WIDTH])
+    for x, y in PLAYER_POSITIONS - [pan, 0]:
+        x, y = int(x) + player_shift, int(y)
+        frame[y - 35:y + 35, x - 15:x + 15] = (255, 255, 255) if player_shift % 2 else (0, 0, 255)
+    return frame
+
+
+def _players(pan: int):
+    return [
+        PlayerDetection(id=i, x=float(x - pan), y=float(y), width=30.0, height=70.0,
+                        team="home", color=[0, 0, 0], confidence=0.9)
+        for i, (x, y) in enumerate(PLAYER_POSITIONS)
+    ]
+
+
+def _boxes(players):
+    return np.array([[p.x - 15, p.y - 35, p.x + 15, p.y + 35] for p in players], dtype=np.float32)
+
+
+def test_estimates_pan():
+    """화면이 왼쪽으로 24px 이동 → 이동 성분 -24 (선수 블록 움직임은 무시)"""
+    estimator = CameraMotionEstimator()
+    gray, scale = prepare_flow_frame(_frame(0))
+    assert estimator.update(gray, scale, _boxes(_players(0))) is None, "첫 프레임은 변환 없음"
+
+    gray, scale = prepare_flow_frame(_frame(24, player_shift=9))
+    affine = estimator.update(gray, scale, _boxes(_players(24)))
+    assert affine is not None
+    assert abs(affine[0, 2] + 24) < 1.5 and abs(affine[1, 2]) < 1.5, affine
+    assert np.allclose(affine[:, :2], np.eye(2), atol=0.02), affine
+    print(f"✅ 패닝 추정 확인 (tx={affine[0, 2]:.2f}, 인라이어 {estimator.last_inliers}개)")
+
+
+def _tracked_frames(compensate: bool) -> int:
+    """세 선수 모두 처음 ID로 탐지와 연관된 프레임 수"""
+    tracker = ByteTracker()
+    estimator = CameraMotionEstimator()
+    count = 0
+    pans = [0] * 5 + [40 * i for i in range(1, 6)]  # 정지 후 갑자기 빠른 패닝
+    for pan in pans:
+        players = _players(pan)
+        if compensate:
+            gray, scale = prepare_flow_frame(_frame(pan))
+            affine = estimator.update(gray, scale, _boxes(players))
+            if affine is not None:
+                tracker.apply_camera_motion(affine)
+        tracked = tracker.update(players, None)
+        count += {p.id for p in tracked if not p.predicted} == {1, 2, 3}
+    return count
+
+
+def test_compensation_keeps_ids():
+    """보정 없이는 패닝 시작부터 연관이 끊기고, 보정하면 모든 프레임에서 유지"""
+    without = _tracked_frames(compensate=False)
+    with_compensation = _tracked_frames(compensate=True)
+    assert without < 10, without
+    assert with_compensation == 10, with_compensation
+    print(f"✅ 보정 시 ID 유지 (연관 유지 프레임 보정 없음 {without}/10, 보정 {with_compensation}/10)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 카메라 움직임 보정 테스트")
+    print("=" * 60)
+    test_estimates_pan()
+    test_compensation_keeps_ids()
@@ -0,0 +1,127 @@
+"""
+캡처 프로파일 협상 테스트
+모델 입력 크기 기준 캡처 크기, 과부하 히스테리시스, 허용 FPS/부하 변화 시 재전송 확인
+(WebSocket 대신 보낸 메시지를 모으는 가짜 소켓 사용)
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import ws_session
+from capture_profile import capture_profile, min_capture_height, LoadLevel, DEFAULT_INPUT_SHAPE
+from config import (
+    JPEG_QUALITY,
+    CAPTURE_SCALE,
+    CAPTURE_LOADED_SCALE,
+    CAPTURE_LOADED_JPEG_QUALITY,
+    CAPTURE_LOADED_UTILIZATION,
+    CAPTURE_RELEASE_UTILIZATION,
+    BALL_SLICE_MIN_HEIGHT,
+    BALL_ROI_MAX_SIZE,
+)
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+class FakeBackend:
+    def __init__(self):
+        self.utilization = 0.0
+
+    def load(self) -> dict:
+        return {"utilization": self.utilization}
+
+
+def test_profile_size():
+    profile = capture_profile(5.0, input_shape=(384, 640), min_height=0)
+    assert (profile.max_width, profile.max_height) == (640 * CAPTURE_SCALE, 384 * CAPTURE_SCALE)
+    assert profile.jpeg_quality == JPEG_QUALITY and profile.fps == 5.0
+
+    loaded = capture_profile(5.0, loaded=True, input_shape=(384, 640), min_height=0)
+    assert (loaded.max_width, loaded.max_height) == (640 * CAPTURE_LOADED_SCALE, 384 * CAPTURE_LOADED_SCALE)
+    assert loaded.jpeg_quality == CAPTURE_LOADED_JPEG_QUALITY
+    print(f"✅ 캡처 크기 확인 ({profile.max_width}x{profile.max_height} → 과부하 {loaded.max_width}x{loaded.max_height})")
+
+
+def test_profile_keeps_high_res_stages():
+    """캡처 크기가 켜진 고해상도 스테이지를 막지 않음 (설정값 일관성)"""
+    for loaded in (False, True):
+        profile = capture_profile(5.0, loaded=loaded, min_height=min_capture_height(slice_search=True))
+        assert profile.max_height >= BALL_SLICE_MIN_HEIGHT, (loaded, profile)
+        h, w = DEFAULT_INPUT_SHAPE
+        assert abs(profile.max_width / profile.max_height - w / h) < 0.01, "비율 유지"
+    assert min_capture_height(slice_search=False) == 0
+
+    # 공 ROI는 모델 입력보다 큰 원본 해상도에서 의미가 있음
+    profile = capture_profile(5.0, min_height=0)
+    assert CAPTURE_SCALE > 1 and max(profile.max_width, profile.max_height) > BALL_ROI_MAX_SIZE
+    print(f"✅ 고해상도 스테이지 최소 크기 확인 (슬라이스 탐지 → 높이 {BALL_SLICE_MIN_HEIGHT} 이상)")
+
+
+def test_load_hysteresis():
+    level = LoadLevel()
+    assert not level.update(CAPTURE_LOADED_UTILIZATION - 0.05)
+    assert level.update(CAPTURE_LOADED_UTILIZATION) and level.loaded
+    # 진입 임계값 아래여도 해제 임계값 위면 유지
+    assert not level.update((CAPTURE_LOADED_UTILIZATION + CAPTURE_RELEASE_UTILIZATION) / 2)
+    assert level.loaded
+    assert level.update(CAPTURE_RELEASE_UTILIZATION - 0.05) and not level.loaded
+    print("✅ 과부하 히스테리시스 확인")
+
+
+def test_readvertise():
+    """같은 프로파일은 다시 보내지 않고, 허용 FPS나 부하 단계가 바뀌면 모든 세션에 재전송"""
+
+    async def run():
+        sockets = {"a": FakeSocket(), "b": FakeSocket()}
+        ws_session._connections.update(sockets)
+        ws_session._load_level = LoadLevel()
+        ws_session._last_load_check = 0.0
+        try:
+            await ws_session.advertise_profile("a", fps=5.0)
+            await ws_session.notify_grant("a", 5.0)  # 같은 값 → 생략
+            await ws_session.advertise_profile("b", fps=5.0)
+            assert len(sockets["a"].sent) == 1 and sockets["a"].sent[0]["type"] == "profile"
+
+            await ws_session.notify_grant("a", 3.0)
+            assert sockets["a"].sent[-1]["fps"] == 3.0 and len(sockets["b"].sent) == 1
+
+            backend = FakeBackend()
+            backend.utilization = 0.95
+            await ws_session.refresh_load(backend)
+            for sid, sock in sockets.items():
+                assert sock.sent[-1]["loaded"], sid
+            assert sockets["a"].sent[-1]["fps"] == 3.0, "부하 변경 시 허용 FPS는 유지"
+
+            # 확인 주기 전에는 부하를 다시 조회하지 않음
+            backend.utilization = 0.0
+            await ws_session.refresh_load(backend)
+            assert sockets["a"].sent[-1]["loaded"]
+        finally:
+            for sid in sockets:
+                ws_session._connections.pop(sid, None)
+                ws_session._profiles.pop(sid, None)
+        return {sid: len(sock.sent) for sid, sock in sockets.items()}
+
+    counts = asyncio.run(run())
+    assert counts == {"a": 3, "b": 2}, counts
+    print(f"✅ 프로파일 재전송 확인 (세션별 메시지 {counts})")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 캡처 프로파일 테스트")
+    print("=" * 60)
+    test_profile_size()
+    test_profile_keeps_high_res_stages()
+    test_load_hysteresis()
+    test_readvertise()
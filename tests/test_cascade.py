@@ -0,0 +1,89 @@
+"""
+탐지기 캐스케이드 테스트
+쉬운 프레임은 nano 결과 사용, 불확실한 프레임만 small로 승격, 단계별 적중률 집계 확인
+(가짜 모델 사용 - 모델 파일 없이 실행)
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import logging
+import cv2
+import numpy as np
+import torch
+from inference import InferencePipeline, ModelRunner
+from metrics import shares
+
+logging.disable(logging.INFO)
+
+
+class FakeBoxes:
+    def __init__(self, rows):
+        rows = torch.tensor(rows, dtype=torch.float32).reshape(-1, 6)
+        self.xyxy, self.conf, self.cls = rows[:, :4], rows[:, 4], rows[:, 5]
+
+    def __len__(self):
+        return len(self.conf)
+
+
+class FakeModel:
+    """호출마다 script에서 다음 결과를 꺼냄 (선수 패스 / 공 패스 구분 없이 같은 결과)"""
+
+    def __init__(self, script):
+        self.script = script
+        self.calls = 0
+
+    def __call__(self, source, **kwargs):
+        rows = self.script(self.calls)
+        self.calls += 1
+        if kwargs.get("classes"):
+            rows = [r for r in rows if r[5] in kwargs["classes"]]
+        return [type("Result", (), {"boxes": FakeBoxes(rows)})()]
+
+
+def _players(n, conf):
+    """모델 입력(384x640) 좌표의 선수 박스 n개"""
+    return [[40 + 50 * i, 150, 70 + 50 * i, 230, conf, 0] for i in range(n)]
+
+
+FRAME = cv2.imencode(".jpg", np.full((720, 1280, 3), (60, 60, 60), dtype=np.uint8))[1].tobytes()
+
+
+def test_cascade_escalation():
+    nano_script = {
+        # 평소 10명 (높은 신뢰도) → 쉬운 프레임
+        **{i: _players(10, 0.8) for i in range(0, 8)},
+        8: _players(4, 0.8),  # 선수 수 급감
+        9: _players(10, 0.3),  # 대부분 낮은 신뢰도
+    }
+    nano = FakeModel(lambda call: nano_script[min(call // 2, 9)] if call // 2 < 10 else _players(10, 0.8))
+    small = FakeModel(lambda call: _players(10, 0.9))
+
+    pipeline = InferencePipeline(
+        enable_tracking=False, model=ModelRunner(small), cascade_model=ModelRunner(nano),
+        keyframe_mode=False,
+    )
+    pipeline.ball_tracker = None  # 공 조건은 제외
+    pipeline.pitch_region = None
+    pipeline.fingerprint = None  # 같은 프레임을 반복해서 보냄
+
+    for _ in range(10):
+        result = pipeline.process(FRAME)
+        assert len(result.players) == 10, len(result.players)
+
+    counts = pipeline.metrics.snapshot()
+    assert counts["detector.nano"] == 8 and counts["detector.small"] == 2, counts
+    assert counts["escalation.player_drop"] == 1 and counts["escalation.low_confidence"] == 1, counts
+    assert small.calls == 4, "승격된 프레임만 small로 선수/공 패스 (2 x 2)"
+    assert shares(counts, "detector") == {"nano": 0.8, "small": 0.2}
+    print(f"✅ 캐스케이드 승격 확인 ({shares(counts, 'detector')})")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 탐지기 캐스케이드 테스트")
+    print("=" * 60)
+    test_cascade_escalation()
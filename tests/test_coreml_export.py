@@ -50,6 +50,32 @@ def export_to_coreml(model_name='yolov8s'):
         print()
         return None
 
+def export_shape_variants(model_name='yolov8s'):
+    """
+    직사각형 입력 크기별 CoreML 변형 내보내기 (config.EXPORT_SHAPES)
+
+    CoreML 입력은 크기가 고정이라 16:9 방송 화면용 384x640을 따로 내보냄
+    → yolov8s_384x640.mlpackage (inference.load_shape_variants가 로드)
+    """
+    import shutil
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from config import EXPORT_SHAPES, INPUT_SIZE
+
+    paths = []
+    for h, w in EXPORT_SHAPES:
+        if h == w == INPUT_SIZE:
+            continue  # 정사각형은 export_to_coreml 결과 그대로 사용
+        print(f"CoreML {h}x{w} 변형 변환 중...")
+        # 내보내기 결과 이름은 가중치 파일 이름을 따르므로 복사본에서 내보냄 (정사각형 결과 덮어쓰기 방지)
+        weights = Path(f"{model_name}_{h}x{w}.pt")
+        shutil.copy(f'{model_name}.pt', weights)
+        output_path = YOLO(str(weights)).export(format='coreml', nms=True, imgsz=(h, w))
+        weights.unlink()
+        print(f"✓ 변환 완료: {output_path}")
+        paths.append(output_path)
+    return paths
+
 def test_coreml_inference(coreml_path):
     """CoreML 모델 추론 테스트"""
     print("=" * 60)
@@ -171,6 +197,8 @@ def main():
     # 2. 추론 테스트
     if coreml_path:
         test_coreml_inference(coreml_path)
+        # 16:9 직사각형 입력 변형
+        export_shape_variants(model_name)
 
     # 3. 성능 비교
     benchmark_pytorch_vs_coreml(model_name, coreml_path)
@@ -0,0 +1,118 @@
+"""
+프레임 마감 시간 테스트
+여유가 있으면 모든 스테이지 실행, 마감이 지나면 선택 스테이지(공 패스, 색상 분류, 명단 매칭) 생략,
+생략한 프레임도 트랙의 이전 팀 유지, 느린 탐지기에서도 선택 스테이지가 굶지 않는지 확인
+(가짜 모델 사용 - 모델 파일 없이 실행)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import logging
+import inference
+from inference import InferencePipeline, ModelRunner, FrameContext
+from config import FRAME_DEADLINE, DEADLINE_MAX_SKIP
+from test_cascade import FakeModel, FRAME, _players
+
+logging.disable(logging.INFO)
+
+
+class SlowModel(FakeModel):
+    """CPU급 탐지기 (호출마다 80ms)"""
+
+    def __call__(self, source, **kwargs):
+        time.sleep(0.08)
+        return super().__call__(source, **kwargs)
+
+
+def _pipeline(model_class=FakeModel):
+    model = model_class(lambda call: _players(6, 0.9))
+    pipeline = InferencePipeline(enable_tracking=True, model=ModelRunner(model), keyframe_mode=False)
+    pipeline.ball_tracker = None
+    pipeline.pitch_region = None
+    pipeline.fingerprint = None
+    pipeline.quality = None
+    return pipeline, model
+
+
+def test_all_stages_with_time():
+    pipeline, model = _pipeline()
+    result = pipeline.process(FRAME, deadline=time.time() + 10)
+    assert result.stages_run == ["decode", "person", "ball", "colors", "tracking", "roster"], result.stages_run
+    assert model.calls == 2
+    assert pipeline.metrics.snapshot()["deadline.met"] == 1
+    print(f"✅ 여유 있는 프레임: {result.stages_run}")
+
+
+def test_skip_optional_stages():
+    pipeline, model = _pipeline()
+    first = pipeline.process(FRAME, deadline=time.time() + 10)
+    teams = {p.id: p.team for p in first.players}
+
+    # 마감이 이미 지남 → 필수 스테이지만
+    result = pipeline.process(FRAME, deadline=time.time() - 1)
+    assert result.stages_run == ["decode", "person", "tracking"], result.stages_run
+    assert model.calls == 3, "공 패스 생략"
+    assert {p.id: p.team for p in result.players} == teams, "색상 분류를 생략해도 트랙의 팀 유지"
+
+    counts = pipeline.metrics.snapshot()
+    assert counts["skipped.ball"] == 1 and counts["skipped.colors"] == 1 and counts["skipped.roster"] == 1, counts
+    assert counts["deadline.missed"] == 1
+    print(f"✅ 마감 지난 프레임: {result.stages_run}")
+
+
+def test_skip_by_cost():
+    """남은 시간보다 오래 걸렸던 스테이지만 생략"""
+    pipeline, _ = _pipeline()
+    pipeline.process(FRAME, deadline=time.time() + 10)
+    pipeline._stage_costs["ball"] = 5.0
+    result = pipeline.process(FRAME, deadline=time.time() + 1)
+    assert "ball" not in result.stages_run and "colors" in result.stages_run, result.stages_run
+    print(f"✅ 예상 비용으로 생략: {result.stages_run}")
+
+
+def test_no_starvation():
+    """탐지기만으로 마감을 넘는 노드: 팀 색상을 알 때까지 색상 분류, 선택 스테이지는 주기적으로 재측정"""
+    pipeline, _ = _pipeline(SlowModel)
+    runs = {"ball": [], "colors": [], "roster": []}
+    n_frames = 2 * (DEADLINE_MAX_SKIP + 1) + 1
+    for _ in range(n_frames):
+        result = pipeline.process(FRAME, deadline=time.time() + FRAME_DEADLINE)
+        for stage in runs:
+            runs[stage].append(stage in result.stages_run)
+
+    assert all(p.team != "unknown" for p in result.players), [p.team for p in result.players]
+    for stage, ran in runs.items():
+        assert sum(ran) >= 2, (stage, ran)
+        gaps = "".join("1" if r else "0" for r in ran).split("1")[1:-1]
+        assert all(len(gap) <= DEADLINE_MAX_SKIP for gap in gaps), (stage, ran)
+    print(f"✅ 느린 탐지기에서도 선택 스테이지 실행 (공 패스 {sum(runs['ball'])}/{n_frames}프레임)")
+
+
+def test_deadline_from_receive():
+    """마감 시간은 서버 수신(스케줄러 큐 대기 포함) 기준"""
+    enabled = inference.DEADLINE_SCHEDULING
+    inference.DEADLINE_SCHEDULING = True
+    try:
+        received = time.time() - 1.0
+        assert FrameContext(FRAME, received=received).deadline == received + FRAME_DEADLINE
+        ctx = FrameContext(FRAME)
+        assert ctx.deadline == ctx.start_time + FRAME_DEADLINE
+    finally:
+        inference.DEADLINE_SCHEDULING = enabled
+    print("✅ 수신 시각 기준 마감 확인")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 프레임 마감 시간 테스트")
+    print("=" * 60)
+    test_all_stages_with_time()
+    test_skip_optional_stages()
+    test_skip_by_cost()
+    test_no_starvation()
+    test_deadline_from_receive()
@@ -0,0 +1,82 @@
+"""
+축소 JPEG 디코딩 테스트
+헤더 크기 파싱, 축소 배율 선택, 축소 프레임의 letterbox/피치 좌표가 원본 기준으로 복원되는지 확인
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import cv2
+import numpy as np
+from decode import jpeg_size, plan_reduction, decode
+from pitch import PitchRegionEstimator
+from preprocess import letterbox
+from config import INPUT_SIZE
+
+GRASS = (40, 140, 50)
+STANDS = (120, 110, 130)
+
+
+def _jpeg(frame, progressive=False):
+    params = [cv2.IMWRITE_JPEG_QUALITY, 90, cv2.IMWRITE_JPEG_PROGRESSIVE, int(progressive)]
+    return cv2.imencode(".jpg", frame, params)[1].tobytes()
+
+
+def test_jpeg_size():
+    for w, h in [(1920, 1080), (1281, 719), (640, 360)]:
+        frame = np.zeros((h, w, 3), dtype=np.uint8)
+        assert jpeg_size(_jpeg(frame)) == (w, h)
+        assert jpeg_size(_jpeg(frame, progressive=True)) == (w, h)
+    assert jpeg_size(b"not a jpeg") is None
+    assert jpeg_size(b"\xff\xd8\xff\xe0\x00\x10") is None  # SOF 전에 잘림
+    print("✅ JPEG 헤더 크기 파싱 확인 (baseline/progressive)")
+
+
+def test_plan_reduction():
+    assert plan_reduction(3840, INPUT_SIZE) == 4  # 4K → 960
+    assert plan_reduction(1920, INPUT_SIZE) == 2  # 1080p → 960 (1/4이면 480 < 640)
+    assert plan_reduction(1280, INPUT_SIZE) == 2  # 720p → 640
+    assert plan_reduction(1000, INPUT_SIZE) == 1
+    for factor in (1, 2, 4):
+        frame = decode(_jpeg(np.zeros((1080, 1920, 3), dtype=np.uint8)), factor)
+        assert frame.shape == (1080 // factor, 1920 // factor, 3), frame.shape
+    print("✅ 축소 배율 선택 확인")
+
+
+def test_reduced_coordinates():
+    """축소 디코딩 프레임으로 만든 letterbox/피치 영역도 원본 좌표로 복원"""
+    frame = np.full((1080, 1920, 3), STANDS, dtype=np.uint8)
+    frame[400:] = GRASS
+    cv2.rectangle(frame, (1000, 600), (1100, 800), (255, 255, 255), -1)  # 선수 자리
+    data = _jpeg(frame)
+
+    full = decode(data, 1)
+    reduced = decode(data, 2)
+    region = PitchRegionEstimator().update(full)
+    assert PitchRegionEstimator().update(reduced, frame_scale=0.5) == region, "피치 영역은 원본 좌표"
+
+    full_input, full_info = letterbox(full, INPUT_SIZE, region=region)
+    reduced_input, reduced_info = letterbox(reduced, INPUT_SIZE, region=region, frame_scale=0.5)
+    assert full_input.shape == reduced_input.shape
+    assert abs(full_info.scale - reduced_info.scale) < 1e-6
+    assert (reduced_info.frame_w, reduced_info.frame_h) == (1920, 1080)
+
+    # 모델 입력 좌표의 선수 박스 → 원본 좌표 (양쪽 같은 위치)
+    ys, xs = np.nonzero(reduced_input[..., 0] > 200)
+    box = np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]], dtype=np.float32)
+    restored = reduced_info.to_frame(box)[0]
+    assert np.allclose(restored, [1000, 600, 1101, 801], atol=4), restored
+    assert np.allclose(full_info.to_frame(box)[0], restored, atol=1)
+    print(f"✅ 축소 디코딩 좌표 복원 확인 (박스 {restored.round().tolist()})")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 축소 JPEG 디코딩 테스트")
+    print("=" * 60)
+    test_jpeg_size()
+    test_plan_reduction()
+    test_reduced_coordinates()
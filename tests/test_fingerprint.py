@@ -0,0 +1,71 @@
+"""
+정지/중복 프레임 감지 테스트
+같은 프레임/재인코딩된 같은 프레임은 생략, 바뀐 프레임은 처리, 파이프라인 결과 재사용 확인
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import logging
+import cv2
+import numpy as np
+from fingerprint import FrameFingerprint
+from inference import InferencePipeline, ModelRunner
+from test_cascade import FakeModel, _players
+
+logging.disable(logging.INFO)
+
+
+def _jpeg(frame, quality=90):
+    return cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def _frame(shift=0):
+    rng = np.random.default_rng(0)
+    frame = cv2.GaussianBlur(rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8), (31, 31), 0)
+    frame[500:560, 300 + shift:340 + shift] = 255  # 움직이는 선수
+    return frame
+
+
+def test_duplicate_detection():
+    fingerprint = FrameFingerprint(max_skip=3)
+    assert not fingerprint.is_duplicate(_jpeg(_frame()))
+    assert fingerprint.is_duplicate(_jpeg(_frame())), "같은 바이트"
+    assert fingerprint.is_duplicate(_jpeg(_frame(), quality=85)), "재인코딩된 같은 화면"
+    assert not fingerprint.is_duplicate(_jpeg(_frame(shift=200))), "선수가 움직이면 처리"
+
+    # 연속 생략이 max_skip만큼 쌓이면 한 번은 처리
+    same = _jpeg(_frame(shift=200))
+    assert [fingerprint.is_duplicate(same) for _ in range(4)] == [True, True, True, False]
+    print("✅ 중복 프레임 판단 확인")
+
+
+def test_pipeline_reuses_result():
+    model = FakeModel(lambda call: _players(10, 0.9))
+    pipeline = InferencePipeline(enable_tracking=False, model=ModelRunner(model), keyframe_mode=False)
+    pipeline.shot_classifier = None
+
+    first = pipeline.process(_jpeg(_frame()))
+    calls = model.calls
+    for _ in range(5):
+        result = pipeline.process(_jpeg(_frame()))
+        assert [p.x for p in result.players] == [p.x for p in first.players]
+        assert result.timestamp >= first.timestamp
+    assert model.calls == calls, "중복 프레임은 모델을 호출하지 않음"
+
+    pipeline.process(_jpeg(_frame(shift=200)))
+    assert model.calls > calls
+    counts = pipeline.metrics.snapshot()
+    assert counts["frames.duplicate"] == 5 and counts["frames.processed"] == 2, counts
+    print(f"✅ 파이프라인 결과 재사용 확인 ({counts['frames.duplicate']}프레임 생략)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 중복 프레임 테스트")
+    print("=" * 60)
+    test_duplicate_detection()
+    test_pipeline_reuses_result()
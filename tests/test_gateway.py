@@ -0,0 +1,194 @@
+"""
+게이트웨이 + 추론 노드 테스트
+한 머신에서 노드 2개를 띄워서 sticky 라우팅과 부하 기반 배정,
+명단/매칭 요청 전달, 응답 없는 노드 연결 해제 확인
+(YOLO 모델 없이 가짜 백엔드 사용)
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import gateway
+from node import InferenceNode
+from gateway import NodeRouter
+
+
+class EchoBackend:
+    """처리한 세션과 노드 이름을 돌려주는 가짜 백엔드"""
+
+    def __init__(self, name: str, utilization: float = 0.0):
+        self.name = name
+        self.utilization = utilization
+        self.sessions = {}
+        self.home, self.away = [], []
+        self.matched = None
+
+    async def process(self, session_id: str, frame_bytes: bytes, received=None) -> dict:
+        self.sessions[session_id] = self.sessions.get(session_id, 0) + 1
+        return {
+            "node": self.name,
+            "session_id": session_id,
+            "frame_size": len(frame_bytes),
+            "players": [],
+            "ball": None,
+        }
+
+    async def close(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    def load(self) -> dict:
+        return {"sessions": len(self.sessions), "utilization": self.utilization}
+
+    def set_roster(self, home, away):
+        self.home, self.away = home, away
+
+    def match_player(self, track_id, team, number):
+        self.matched = (track_id, team, number)
+
+    def roster(self) -> dict:
+        return {"roster": {"home": self.home, "away": self.away}, "node": self.name}
+
+
+async def _start_nodes(backends):
+    servers = []
+    addresses = []
+    for backend in backends:
+        node = InferenceNode(backend)
+        server = await asyncio.start_server(node.handle_connection, "127.0.0.1", 0)
+        servers.append(server)
+        addresses.append(("127.0.0.1", server.sockets[0].getsockname()[1]))
+    return servers, addresses
+
+
+def test_sticky_routing():
+    """같은 세션의 프레임은 항상 같은 노드로 전달"""
+
+    async def run():
+        backends = [EchoBackend("node-a"), EchoBackend("node-b")]
+        servers, addresses = await _start_nodes(backends)
+        router = NodeRouter(addresses)
+        await router.start()
+
+        results = {}
+        for i in range(6):
+            session_id = f"session-{i % 3}"
+            result = await router.process(session_id, b"x" * (i + 1))
+            assert result["frame_size"] == i + 1
+            results.setdefault(session_id, set()).add(result["node"])
+
+        for session_id, nodes in results.items():
+            assert len(nodes) == 1, f"{session_id}가 여러 노드로 분산됨: {nodes}"
+
+        # 세션이 두 노드에 나뉘어 배정되었는지
+        assert all(backend.sessions for backend in backends)
+
+        # 세션 종료 시 노드 상태도 정리
+        await router.close("session-0")
+        await asyncio.sleep(0.05)
+        assert all("session-0" not in b.sessions for b in backends)
+
+        await router.stop()
+        for server in servers:
+            server.close()
+
+    asyncio.run(run())
+    print("✅ sticky 라우팅 확인")
+
+
+def test_load_based_assignment():
+    """새 세션은 보고된 사용률이 낮은 노드로 배정"""
+
+    async def run():
+        backends = [EchoBackend("busy", utilization=0.9), EchoBackend("idle", utilization=0.1)]
+        servers, addresses = await _start_nodes(backends)
+        router = NodeRouter(addresses)
+        await router.start()
+
+        # 부하 보고 받기
+        for node in router.nodes:
+            await node.request({"type": "load"})
+
+        result = await router.process("new-session", b"frame")
+        assert result["node"] == "idle", f"부하 높은 노드로 배정됨: {result['node']}"
+
+        await router.stop()
+        for server in servers:
+            server.close()
+
+    asyncio.run(run())
+    print("✅ 부하 기반 배정 확인")
+
+
+def test_roster_proxy():
+    """명단은 모든 노드로, 세션을 지정한 매칭/조회는 그 세션의 노드로만 전달"""
+
+    async def run():
+        backends = [EchoBackend("node-a"), EchoBackend("node-b")]
+        servers, addresses = await _start_nodes(backends)
+        router = NodeRouter(addresses)
+        await router.start()
+
+        home = [{"name": "손흥민", "number": 7, "position": "FW"}]
+        assert await router.set_roster({"home": home, "away": []}) == 2
+        assert all(b.home == home for b in backends)
+
+        owner = (await router.process("s1", b"frame"))["node"]
+        assert await router.match_player(5, "home", 7, session_id="s1") == 1
+        assert [b.matched for b in backends if b.name == owner] == [(5, "home", 7)]
+        assert all(b.matched is None for b in backends if b.name != owner)
+        roster = await router.get_roster("s1")
+        assert roster["node"] == owner and roster["roster"]["home"] == home
+
+        await router.stop()
+        for server in servers:
+            server.close()
+
+    asyncio.run(run())
+    print("✅ 명단/매칭 요청 전달 확인")
+
+
+def test_unresponsive_node_dropped():
+    """부하 조회에 응답하지 않는 노드는 연결을 끊어서 새 세션이 배정되지 않음"""
+
+    async def silent(reader, writer):
+        await reader.read()  # 받기만 하고 응답하지 않음
+
+    async def run():
+        servers, addresses = await _start_nodes([EchoBackend("ok")])
+        stuck = await asyncio.start_server(silent, "127.0.0.1", 0)
+        addresses.append(("127.0.0.1", stuck.sockets[0].getsockname()[1]))
+        router = NodeRouter(addresses)
+        await router.start()
+        ok_node, stuck_node = router.nodes
+        stuck_node.load = {"utilization": 0.0}
+        ok_node.load = {"utilization": 0.5}
+
+        timeout = gateway.NODE_REQUEST_TIMEOUT
+        gateway.NODE_REQUEST_TIMEOUT = 0.1
+        try:
+            await router._poll_node(stuck_node)
+        finally:
+            gateway.NODE_REQUEST_TIMEOUT = timeout
+        assert not stuck_node.connected, "응답 없는 노드는 연결 해제"
+        assert (await router.process("s", b"frame"))["node"] == "ok"
+
+        await router.stop()
+        for server in servers + [stuck]:
+            server.close()
+
+    asyncio.run(run())
+    print("✅ 응답 없는 노드 연결 해제 확인")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 게이트웨이 / 추론 노드 테스트")
+    print("=" * 60)
+    test_sticky_routing()
+    test_load_based_assignment()
+    test_roster_proxy()
+    test_unresponsive_node_dropped()
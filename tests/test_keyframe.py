@@ -0,0 +1,69 @@
+"""
+키프레임 모드 테스트
+광학 흐름 박스 전파와 키프레임 간격 조정 확인 (모델 없이 합성 프레임 사용)
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from keyframe import MotionPropagator, KeyframeScheduler, prepare_flow_frame
+
+
+def _textured_frame(offset_x: int, width: int = 1280, height: int = 720) -> np.ndarray:
+    """카메라가 offset_x만큼 패닝한 것처럼 보이는 텍스처 프레임"""
+    rng = np.random.default_rng(0)
+    texture = rng.integers(0, 255, size=(height // 8, (width + 400) // 8, 3), dtype=np.uint8)
+    texture = np.kron(texture, np.ones((8, 8, 1), dtype=np.uint8))
+    return np.ascontiguousarray(texture[:height, offset_x:offset_x + width])
+
+
+def test_propagation_follows_motion():
+    """화면이 왼쪽으로 6px씩 움직이면 박스도 -6px씩 따라감"""
+    propagator = MotionPropagator()
+    boxes = np.array([[200, 200, 260, 340], [600, 300, 650, 420]], dtype=np.float32)
+
+    gray, _ = prepare_flow_frame(_textured_frame(0))
+    propagator.reset(gray, boxes, np.array([0.9, 0.8], dtype=np.float32))
+
+    for step in range(1, 5):
+        gray, scale = prepare_flow_frame(_textured_frame(step * 6))
+        moved, confidences, valid_ratio = propagator.propagate(gray, scale)
+
+    expected = boxes.copy()
+    expected[:, 0::2] -= 24
+    assert valid_ratio == 1.0, valid_ratio
+    assert np.abs(moved - expected).max() < 3.0, moved
+    assert (confidences < np.array([0.9, 0.8])).all(), "전파할수록 신뢰도가 줄어야 함"
+    assert 4.0 < propagator.motion < 8.0, propagator.motion
+    print(f"✅ 박스 전파 확인 (전역 움직임 {propagator.motion:.1f}px/frame)")
+
+
+def test_keyframe_interval_adapts():
+    """움직임이 작으면 키프레임 간격이 늘고, 신뢰도가 떨어지면 즉시 키프레임"""
+    scheduler = KeyframeScheduler(min_interval=2, max_interval=5)
+    assert scheduler.next_is_keyframe(), "첫 프레임은 키프레임"
+
+    scheduler.update(motion=0.5, valid_ratio=1.0, confidence=0.9)
+    assert scheduler.interval == 5
+    pattern = [scheduler.next_is_keyframe() for _ in range(10)]
+    assert pattern == [False, False, False, False, True] * 2, pattern
+
+    scheduler.update(motion=30.0, valid_ratio=1.0, confidence=0.9)
+    assert scheduler.interval == 2
+
+    scheduler.update(motion=0.5, valid_ratio=0.2, confidence=0.9)
+    assert scheduler.next_is_keyframe(), "흐름 추적 실패 후에는 키프레임"
+
+    print(f"✅ 키프레임 간격 조정 확인 (YOLO 호출 비율 {scheduler.detector_call_ratio:.2f})")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 키프레임 모드 테스트")
+    print("=" * 60)
+    test_propagation_follows_motion()
+    test_keyframe_interval_adapts()
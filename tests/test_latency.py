@@ -0,0 +1,131 @@
+"""
+지연 추적 테스트
+프레임 ID/캡처 시각 왕복, NTP 방식 ping 응답, 구간별 지연 집계, 파이프라인 처리 시각 확인
+(WebSocket/스케줄러/백엔드 대신 가짜 객체 사용 - 모델 파일 없이 실행)
+"""
+
+import sys
+import json
+import time
+import asyncio
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import logging
+import base64
+from fastapi import WebSocketDisconnect
+
+import ws_session
+from metrics import LatencyStats
+from models import DetectionResult
+from inference import InferencePipeline, ModelRunner
+from test_cascade import FakeModel, FRAME, _players
+
+logging.disable(logging.INFO)
+
+OFFSET = 2.0  # 서버 시계 - 클라이언트 시계
+
+
+class FakeSocket:
+    """messages를 차례로 받고, 다 받으면 연결 끊김"""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+        self.query_params = {}
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self):
+        await asyncio.sleep(0.01)  # 이전 프레임 처리 태스크가 돌 시간
+        if not self.messages:
+            raise WebSocketDisconnect()
+        return self.messages.pop(0)
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+class FakeScheduler:
+    def register(self, session_id, priority, fps):
+        return fps
+
+    async def submit(self, session_id, job):
+        return await job()
+
+    def unregister(self, session_id):
+        pass
+
+
+class FakeBackend:
+    async def process(self, session_id, frame_bytes, received=None):
+        start = time.time()
+        await asyncio.sleep(0.005)
+        return DetectionResult(timestamp=time.time(), fps=0, players=[], start_ts=start, end_ts=time.time()).model_dump()
+
+    async def close(self, session_id):
+        pass
+
+
+def test_latency_stats():
+    stats = LatencyStats(window=4)
+    for seconds in [0.01, 0.02, 0.03, 0.04, 0.05]:
+        stats.record("queue", seconds)
+    summary = stats.summary()["queue"]
+    assert summary["count"] == 5 and summary["max_ms"] == 50.0
+    assert summary["mean_ms"] == 35.0, "최근 window개만 평균"
+    print(f"✅ 구간 지연 요약 확인 ({summary})")
+
+
+def test_session_round_trip():
+    """ping → pong, 다음 ping의 시계 차이 저장, 프레임 추적 정보가 결과에 돌아옴"""
+    image = base64.b64encode(b"jpeg").decode()
+    capture_ts = time.time() - OFFSET - 0.03  # 클라이언트 시계로 30ms 전 캡처
+    messages = [
+        json.dumps({"type": "ping", "t0": 100.0}),
+        json.dumps({"type": "ping", "t0": 105.0, "offset": OFFSET, "rtt": 0.02}),
+        json.dumps({"type": "frame", "frame_id": 7, "capture_ts": capture_ts, "image": image}),
+        image,  # 추적 정보 없는 이전 형식
+    ]
+    socket = FakeSocket(messages)
+    ws_session.latency = LatencyStats()
+    asyncio.run(ws_session.run_session(socket, FakeBackend(), FakeScheduler()))
+
+    pongs = [m for m in socket.sent if m.get("type") == "pong"]
+    assert [p["t0"] for p in pongs] == [100.0, 105.0]
+    assert all(p["t1"] <= p["t2"] for p in pongs)
+
+    results = [m for m in socket.sent if "players" in m]
+    assert len(results) == 2, socket.sent
+    traced, plain = results
+    assert traced["frame_id"] == 7 and traced["capture_ts"] == capture_ts
+    assert traced["receive_ts"] <= traced["start_ts"] <= traced["end_ts"] <= traced["send_ts"]
+    assert traced["reference_time"] == capture_ts + OFFSET, "움직임 기준 = 캡처 시각 (서버 시계)"
+    assert plain["frame_id"] is None and plain["reference_time"] == plain["receive_ts"]
+
+    summary = ws_session.latency.summary()
+    assert summary["uplink"]["count"] == 1 and 20 < summary["uplink"]["mean_ms"] < 200, summary["uplink"]
+    assert summary["server"]["count"] == 2 and summary["rtt"]["count"] == 1
+    assert summary["inference"]["mean_ms"] >= 5
+    print(f"✅ 세션 추적 정보 왕복 확인 (uplink {summary['uplink']['mean_ms']}ms, server {summary['server']['mean_ms']}ms)")
+
+
+def test_pipeline_timestamps():
+    pipeline = InferencePipeline(enable_tracking=False, model=ModelRunner(FakeModel(lambda call: _players(4, 0.9))), keyframe_mode=False)
+    pipeline.fingerprint = None
+    before = time.time()
+    result = pipeline.process(FRAME)
+    assert before <= result.start_ts <= result.end_ts == result.timestamp
+    print(f"✅ 파이프라인 처리 시각 확인 ({(result.end_ts - result.start_ts) * 1000:.1f}ms)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 지연 추적 테스트")
+    print("=" * 60)
+    test_latency_stats()
+    test_session_round_trip()
+    test_pipeline_timestamps()
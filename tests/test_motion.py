@@ -0,0 +1,96 @@
+"""
+움직임 상태 보간 테스트
+결과의 선수 속도/공 가속도/카메라 이동으로 임의 시각 위치 외삽, 외삽 범위 제한,
+파이프라인 결과에 트랙 속도와 기준 시각이 담기는지 확인 (가짜 모델 사용 - 모델 파일 없이 실행)
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import logging
+import numpy as np
+import ws_session
+from motion import predict
+from models import BallDetection, BallState, DetectionResult, PlayerDetection
+from inference import InferencePipeline, ModelRunner
+from config import PREDICT_MAX_AHEAD
+from test_cascade import FakeModel, FRAME
+
+logging.disable(logging.INFO)
+
+
+def _result(**update):
+    player = PlayerDetection(
+        id=1, x=100, y=200, width=20, height=50, team="home", color=[255, 0, 0], confidence=0.9,
+        vx=4, vy=-2,
+    )
+    result = DetectionResult(
+        timestamp=10.05, fps=10, players=[player],
+        ball=BallDetection(x=300, y=300, width=8, height=8, confidence=0.8),
+        ball_state=BallState(x=300, y=300, vx=10, vy=0, ax=0, ay=2, uncertainty=2),
+        reference_time=10.0, frame_interval=0.1, camera_shift=[1.0, 0.0],
+    )
+    return result.model_copy(update=update)
+
+
+def test_predict():
+    prediction = predict(_result(), 10.2)  # 2스텝 뒤
+    player = prediction.players[0]
+    assert np.allclose((player.x, player.y), (100 + 4 * 2 + 2, 200 - 2 * 2)), (player.x, player.y)
+    assert (player.width, player.team) == (20, "home")
+    ball = prediction.ball
+    assert np.allclose((ball.x, ball.y), (300 + 10 * 2 + 2, 300 + 0.5 * 2 * 4)), (ball.x, ball.y)
+
+    # 멀리 있는 시각은 외삽 범위에서 멈춤, 간격을 모르면 그대로
+    far = predict(_result(), 100.0).players[0]
+    assert np.isclose(far.x, 100 + (4 + 1) * PREDICT_MAX_AHEAD / 0.1)
+    still = predict(_result(frame_interval=0.0), 10.2).players[0]
+    assert (still.x, still.y) == (100, 200)
+    print(f"✅ 위치 외삽 확인 (선수 {player.x:.0f},{player.y:.0f} / 공 {ball.x:.0f},{ball.y:.0f})")
+
+
+def test_predict_message():
+    ws_session._last_results["s"] = _result().model_dump()
+    try:
+        reply = ws_session.handle_control("s", {"type": "predict", "time": 10.1})
+        assert reply["type"] == "prediction" and np.isclose(reply["players"][0]["x"], 105), reply
+        assert ws_session.handle_control("other", {"type": "predict"})["status"] == "no_result"
+        assert ws_session.handle_control("s", {"type": "nope"})["status"] == "bad_request"
+    finally:
+        ws_session._last_results.pop("s", None)
+    print("✅ predict 메시지 확인")
+
+
+def test_pipeline_motion_state():
+    """모델 입력에서 프레임마다 5px(원본 10px) 오른쪽으로 움직이는 선수 → 트랙 속도 약 10px/프레임"""
+
+    def moving(call):
+        dx = 5 * (call // 2)
+        return [[40 + 60 * i + dx, 150, 70 + 60 * i + dx, 230, 0.9, 0] for i in range(4)]
+
+    pipeline = InferencePipeline(enable_tracking=True, model=ModelRunner(FakeModel(moving)), keyframe_mode=False)
+    pipeline.ball_tracker = None
+    pipeline.pitch_region = None
+    pipeline.fingerprint = None
+    pipeline.quality = None
+    pipeline.camera_motion = None
+
+    for _ in range(12):
+        result = pipeline.process(FRAME)
+    assert len(result.players) == 4
+    for player in result.players:
+        assert abs(player.vx - 10) < 1 and abs(player.vy) < 1, (player.vx, player.vy)
+    assert result.frame_interval > 0 and result.reference_time <= result.timestamp
+    print(f"✅ 결과 움직임 상태 확인 (vx {result.players[0].vx:.1f}px/프레임, 간격 {result.frame_interval * 1000:.1f}ms)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 움직임 상태 보간 테스트")
+    print("=" * 60)
+    test_predict()
+    test_predict_message()
+    test_pipeline_motion_state()
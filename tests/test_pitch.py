@@ -0,0 +1,153 @@
+"""
+피치 영역 크롭 테스트
+잔디 영역 박스 추정, 샷 단위 캐시(카메라 이동 시 무효화), 크롭 letterbox 좌표 복원,
+피치 밖 발 위치 판단 확인 (합성 프레임 사용)
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import threading
+
+import cv2
+import numpy as np
+from pitch import PitchMask, PitchRegionEstimator, GRASS_LUT
+from preprocess import letterbox
+from config import PITCH_CROP_MARGIN, PITCH_CROP_REFRESH, PITCH_CROP_MOTION, PITCH_HSV_LOWER, PITCH_HSV_UPPER
+
+STANDS = (120, 110, 130)
+GRASS = (40, 140, 50)
+
+
+def _broadcast_frame(pitch_top=400):
+    """위쪽은 관중석, 왼쪽 위에 스코어보드, pitch_top 아래는 잔디"""
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    frame[:] = STANDS
+    frame[pitch_top:] = GRASS
+    frame[40:100, 60:400] = (255, 255, 255)
+    return frame
+
+
+def test_bounding_box():
+    x1, y1, x2, y2 = PitchMask.from_frame(_broadcast_frame()).bounding_box(1920, 1080)
+    assert (x1, x2, y2) == (0, 1920, 1080), (x1, y1, x2, y2)
+    expected_top = 400 - PITCH_CROP_MARGIN * 1080
+    assert abs(y1 - expected_top) <= 12, y1
+
+    # 잔디가 거의 없는 클로즈업은 크롭하지 않음
+    closeup = np.full((1080, 1920, 3), STANDS, dtype=np.uint8)
+    assert PitchMask.from_frame(closeup).bounding_box(1920, 1080) is None
+    print(f"✅ 피치 영역 추정 확인 (위쪽 {y1}px 잘라냄)")
+
+
+def test_cached_per_shot():
+    estimator = PitchRegionEstimator()
+    first = estimator.update(_broadcast_frame(400))
+
+    # 같은 샷 안에서는 새로 계산 주기 전까지 재사용
+    assert estimator.update(_broadcast_frame(600)) == first
+    # 컷이면 바로 다시 계산
+    after_cut = estimator.update(_broadcast_frame(600), shot_cut=True)
+    assert after_cut[1] > first[1], (first, after_cut)
+
+    for _ in range(PITCH_CROP_REFRESH - 1):
+        assert estimator.update(_broadcast_frame(400)) == after_cut
+    assert estimator.update(_broadcast_frame(400)) == first, "주기마다 다시 계산 (패닝 반영)"
+    print("✅ 샷 단위 캐시 확인")
+
+
+def test_refresh_on_camera_motion():
+    """주기 전이라도 누적 카메라 이동이 크면 다시 계산 (작은 흔들림은 무시)"""
+    estimator = PitchRegionEstimator()
+    first = estimator.update(_broadcast_frame(400))
+
+    estimator.add_camera_motion(PITCH_CROP_MOTION / 4)
+    assert estimator.update(_broadcast_frame(600)) == first
+    for _ in range(3):
+        estimator.add_camera_motion(PITCH_CROP_MOTION / 4)
+    panned = estimator.update(_broadcast_frame(600))
+    assert panned[1] > first[1], (first, panned)
+    assert estimator.motion_since_update == 0.0
+    print("✅ 카메라 이동 시 피치 마스크 갱신 확인")
+
+
+def test_camera_motion_from_other_thread():
+    """후처리 스레드가 누적하는 카메라 이동이 디코딩 스레드의 갱신과 겹쳐도 사라지지 않음"""
+    estimator = PitchRegionEstimator()
+    estimator.update(_broadcast_frame(400))
+    step = PITCH_CROP_MOTION / 1000
+
+    def add_motion():
+        for _ in range(500):
+            estimator.add_camera_motion(step)
+
+    threads = [threading.Thread(target=add_motion) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert abs(estimator.motion_since_update - 2000 * step) < 1e-9, estimator.motion_since_update
+
+    estimator.update(_broadcast_frame(400))
+    assert estimator.motion_since_update == 0.0
+    print("✅ 다른 스레드의 카메라 이동 누적 확인")
+
+
+def test_cropped_letterbox_roundtrip():
+    frame = _broadcast_frame()
+    region = (0, 320, 1920, 1080)
+    image, info = letterbox(frame, 640, region=region)
+    assert image.shape == (256, 640, 3), image.shape  # 1920x760 → 640x253 (+패딩)
+
+    # 크롭 안 박스 → 모델 좌표 → 전체 프레임 좌표 복원
+    frame_box = np.array([[900, 600, 960, 720]], dtype=np.float32)
+    model_box = (frame_box - [0, 320, 0, 320]) * info.scale
+    model_box[:, 0::2] += info.pad_x
+    model_box[:, 1::2] += info.pad_y
+    assert np.allclose(info.to_frame(model_box), frame_box, atol=1e-2)
+    print("✅ 크롭 letterbox 좌표 복원 확인 (입력 384x640 → 256x640)")
+
+
+def test_lut_matches_hsv_range():
+    rng = np.random.default_rng(0)
+    colors = rng.integers(0, 256, size=(200, 200, 3), dtype=np.uint8)
+    expected = cv2.inRange(cv2.cvtColor(colors, cv2.COLOR_BGR2HSV), PITCH_HSV_LOWER, PITCH_HSV_UPPER)
+    q = colors >> 3
+    lut = GRASS_LUT[q[..., 0], q[..., 1], q[..., 2]]
+    agreement = (lut == expected).mean()
+    assert agreement > 0.97, agreement  # 구간 경계 색만 다를 수 있음
+    print(f"✅ HSV 룩업 테이블 확인 (inRange와 {agreement:.1%} 일치)")
+
+
+def test_feet_on_pitch():
+    frame = _broadcast_frame(pitch_top=400)
+    # 잔디를 가리는 선수들 (발 위치는 선수 자신 때문에 잔디 픽셀이 아님)
+    frame[600:800, 900:960] = (30, 30, 200)
+    frame[850:1060, 300:360] = (200, 30, 30)
+    pitch = PitchMask.from_frame(frame)
+    assert pitch.is_wide
+
+    feet = np.array([
+        [930, 800],   # 선수 (잔디 위)
+        [330, 1060],  # 선수 (화면 아래쪽)
+        [700, 250],   # 관중석
+        [1500, 380],  # 터치라인 바로 위 (여유 안)
+    ], dtype=np.float32)
+    assert list(pitch.contains(feet)) == [True, True, False, True], pitch.contains(feet)
+    print("✅ 발 위치 피치 판단 확인")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 피치 영역 크롭 테스트")
+    print("=" * 60)
+    test_bounding_box()
+    test_cached_per_shot()
+    test_refresh_on_camera_motion()
+    test_camera_motion_from_other_thread()
+    test_cropped_letterbox_roundtrip()
+    test_lut_matches_hsv_range()
+    test_feet_on_pitch()
@@ -0,0 +1,135 @@
+"""
+적응형 품질 조절 테스트
+지속 과부하 시 단계 하강, 히스테리시스 복귀, 단계별 파이프라인 동작(입력 크기, 공 패스 격프레임) 확인
+(가짜 모델 사용 - 모델 파일 없이 실행)
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import logging
+import time
+from quality import QualityController, RUNGS
+import inference
+from inference import InferencePipeline, ModelRunner
+from test_cascade import FakeModel, FRAME, _players
+
+logging.disable(logging.INFO)
+
+TARGET = 0.05
+
+
+class ShapeModel(FakeModel):
+    """마지막 호출의 입력 크기 기록"""
+
+    def __call__(self, source, **kwargs):
+        self.imgsz = kwargs.get("imgsz")
+        return super().__call__(source, **kwargs)
+
+
+def _controller():
+    return QualityController(RUNGS, target=TARGET, window=5, down_frames=3, up_frames=10)
+
+
+def _adaptive_pipeline(model):
+    """QUALITY_ADAPTIVE를 켠 파이프라인 (기본 설정은 꺼져 있음)"""
+    enabled = inference.QUALITY_ADAPTIVE
+    inference.QUALITY_ADAPTIVE = True
+    try:
+        return InferencePipeline(enable_tracking=False, model=ModelRunner(model), keyframe_mode=False)
+    finally:
+        inference.QUALITY_ADAPTIVE = enabled
+
+
+def test_steps_down_under_sustained_load():
+    quality = _controller()
+    # 짧은 스파이크 (창 평균이 목표를 넘지 않음) → 유지
+    for latency in [0.02, 0.02, 0.1, 0.02, 0.02] * 4:
+        quality.update(latency)
+    assert quality.level == 0
+
+    # 지속 과부하 → 창을 채우고 DOWN 횟수만큼 초과해야 한 단계
+    quality = _controller()
+    changes = [quality.update(0.1) for _ in range(7)]
+    assert changes == [False] * 6 + [True], changes
+    assert quality.level == 1 and quality.active == {"input_shape"}
+
+    for _ in range(100):
+        quality.update(0.1)
+    assert quality.level == len(RUNGS), "최하 단계에서 멈춤"
+    print(f"✅ 지속 과부하 → 단계 하강 확인 ({sorted(quality.active)})")
+
+
+def test_hysteresis():
+    quality = _controller()
+    quality.level = 2
+
+    # 목표 바로 아래 (여유 비율 밖) → 복귀하지 않음
+    for _ in range(50):
+        quality.update(TARGET * 0.9)
+    assert quality.level == 2
+
+    # 충분한 여유가 UP 횟수만큼 이어져야 한 단계 복귀
+    frames = 0
+    while quality.level == 2:
+        quality.update(TARGET * 0.3)
+        frames += 1
+    # 창 평균이 여유 구간에 들어가는 데 3프레임 (창에 이전 지연이 남아 있음) + 10번 연속
+    assert quality.level == 1 and frames == 2 + 10, frames
+    print(f"✅ 히스테리시스 확인 ({frames}프레임 여유 후 복귀)")
+
+
+def test_pipeline_rungs():
+    """레벨 2: 작은 입력 + 홀수 프레임 공 패스 생략, 결과에 레벨 표시"""
+    model = ShapeModel(lambda call: _players(10, 0.9))
+    pipeline = _adaptive_pipeline(model)
+    pipeline.ball_tracker = None
+    pipeline.pitch_region = None
+    pipeline.fingerprint = None
+    assert pipeline.quality.rungs == ("input_shape", "ball_every_other", "keyframes"), pipeline.quality.rungs
+
+    result = pipeline.process(FRAME)
+    assert result.quality_level == 0 and model.calls == 2
+    assert model.imgsz == [384, 640]
+
+    pipeline.quality.level = 2
+    pipeline.quality.target = float("inf")  # 테스트 중 레벨 유지
+    calls = []
+    for _ in range(4):
+        before = model.calls
+        result = pipeline.process(FRAME)
+        calls.append(model.calls - before)
+        assert result.quality_level == 2
+    assert calls == [1, 2, 1, 2], calls
+    assert model.imgsz == [288, 480], model.imgsz
+
+    counts = pipeline.metrics.snapshot()
+    assert counts["quality.level_0"] == 1 and counts["quality.level_2"] == 4, counts
+    print(f"✅ 품질 단계 적용 확인 (프레임별 모델 호출 {calls})")
+
+
+def test_latency_from_receive():
+    """컨트롤러는 처리 시간이 아니라 수신 → 결과 지연(스케줄러 큐 대기 포함)을 받음"""
+    model = ShapeModel(lambda call: _players(10, 0.9))
+    pipeline = _adaptive_pipeline(model)
+    pipeline.ball_tracker = None
+    pipeline.pitch_region = None
+    pipeline.fingerprint = None
+
+    pipeline.process(FRAME, received=time.time() - 1.0)
+    latency = pipeline.quality.latencies[-1]
+    assert 1.0 <= latency < 2.0, latency
+    print(f"✅ 수신 기준 지연 측정 확인 ({latency:.2f}s)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 적응형 품질 테스트")
+    print("=" * 60)
+    test_steps_down_under_sustained_load()
+    test_hysteresis()
+    test_pipeline_rungs()
+    test_latency_from_receive()
@@ -0,0 +1,142 @@
+"""
+ReID 임베더 / 갤러리 테스트
+ONNX 배치 전처리(미리 할당한 버퍼), 트랙별 갤러리 상한 확인
+(onnxruntime 없이 가짜 세션 사용)
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from reid import OnnxReIDEmbedder
+from models import PlayerDetection
+from tracker import PlayerTracker
+
+
+class FakeInput:
+    def __init__(self, batch):
+        self.name = "images"
+        self.shape = [batch, 3, 256, 128]
+
+
+class FakeSession:
+    """입력 텐서의 채널별 평균을 특징으로 돌려주는 세션"""
+
+    def __init__(self, batch="N"):
+        self.batch = batch
+        self.calls = []
+
+    def get_inputs(self):
+        return [FakeInput(self.batch)]
+
+    def run(self, outputs, feeds):
+        batch = feeds["images"]
+        self.calls.append(batch)
+        return [batch.mean(axis=(2, 3))]
+
+
+def _frame():
+    """왼쪽 절반 빨강, 오른쪽 절반 파랑 (BGR)"""
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    frame[:, :640] = (0, 0, 255)
+    frame[:, 640:] = (255, 0, 0)
+    return frame
+
+
+def test_onnx_batch_preprocess():
+    """크롭이 한 번의 배치로, 같은 버퍼에 RGB 정규화되어 들어감"""
+    session = FakeSession()
+    embedder = OnnxReIDEmbedder(session=session, max_batch=8)
+    tensor_id = id(embedder.tensor)
+
+    boxes = np.array([[100, 100, 40, 90], [900, 200, 40, 90], [-20, 650, 60, 120]], dtype=np.float32)
+    features = embedder(_frame(), boxes)
+
+    assert len(session.calls) == 1 and session.calls[0].shape == (3, 3, 256, 128)
+    assert np.shares_memory(session.calls[0], embedder.tensor), "미리 할당한 텐서를 써야 함"
+    assert id(embedder.tensor) == tensor_id
+    assert all(abs(np.linalg.norm(f) - 1.0) < 1e-5 for f in features)
+
+    # 빨강 크롭은 R 채널(0번)이, 파랑 크롭은 B 채널(2번)이 가장 큼
+    assert np.argmax(features[0]) == 0 and np.argmax(features[2]) == 0
+    assert np.argmax(features[1]) == 2
+    print("✅ ONNX 배치 전처리 확인")
+
+
+def test_onnx_fixed_batch_chunks():
+    """배치 크기가 고정된 모델은 그 크기로 나눠 실행 (남는 칸은 버림)"""
+    session = FakeSession(batch=4)
+    embedder = OnnxReIDEmbedder(session=session)
+    boxes = np.tile(np.array([[100, 100, 40, 90]], dtype=np.float32), (6, 1))
+
+    features = embedder(_frame(), boxes)
+    assert len(features) == 6
+    assert [c.shape[0] for c in session.calls] == [4, 4]
+    print("✅ 고정 배치 분할 확인")
+
+
+def test_gallery_is_bounded():
+    """트랙별 외형 특징은 gallery_size개까지만 보관"""
+    tracker = PlayerTracker(embedder="mobilenet", lazy_reid=False, gallery_size=4)
+    frame = np.random.default_rng(0).integers(0, 255, size=(720, 1280, 3), dtype=np.uint8)
+    players = [
+        PlayerDetection(id=i, x=200.0 + i * 300, y=300.0, width=30.0, height=70.0,
+                        team="home", color=[0, 0, 0], confidence=0.9)
+        for i in range(3)
+    ]
+    for _ in range(20):
+        tracker.update(players, frame)
+
+    samples = tracker.tracker.tracker.metric.samples
+    assert len(samples) == 3
+    assert all(len(s) <= 4 for s in samples.values()), {k: len(s) for k, s in samples.items()}
+    print("✅ 갤러리 상한 확인")
+
+
+def test_reid_off_swapped_order():
+    """
+    ReID를 끄면 위치로만 연관: 붙어 있는 두 선수의 탐지 순서가 바뀌어도 ID 유지,
+    갤러리에는 자리표시 특징이 들어가지 않고 새 트랙은 실제 임베딩으로 시작
+    """
+    tracker = PlayerTracker(embedder="mobilenet", lazy_reid=False)
+    frame = np.random.default_rng(0).integers(0, 255, size=(720, 1280, 3), dtype=np.uint8)
+
+    def player(x):
+        return PlayerDetection(id=0, x=x, y=300.0, width=30.0, height=70.0,
+                               team="home", color=[0, 0, 0], confidence=0.9)
+
+    for _ in range(5):
+        tracker.update([player(300.0), player(318.0)], frame)
+    metric = tracker.tracker.tracker.metric
+    gallery = {k: len(s) for k, s in metric.samples.items()}
+
+    tracker.reid_enabled = False
+    for k in range(10):
+        players = [player(300.0 + k % 2), player(318.0 - k % 2)]
+        if k % 2:
+            players.reverse()
+        tracked = sorted((p.x, p.id) for p in tracker.update(players, frame) if not p.predicted)
+        assert [i for _, i in tracked] == [1, 2], (k, tracked)
+    assert {k: len(s) for k, s in metric.samples.items()} == gallery, "ReID를 끈 동안 갤러리가 바뀌면 안 됨"
+
+    # ReID를 끈 동안 확정된 새 트랙도 실제 특징을 갖고, 다시 켜도 연관이 이어짐
+    for _ in range(4):
+        tracker.update([player(300.0), player(318.0), player(800.0)], frame)
+    assert len(metric.samples) == 3 and all(len(s) >= 1 for s in metric.samples.values())
+    tracker.reid_enabled = True
+    tracked = tracker.update([player(800.0), player(318.0), player(300.0)], frame)
+    assert [i for _, i in sorted((p.x, p.id) for p in tracked)] == [1, 2, 3], tracked
+    print("✅ ReID 끔: 탐지 순서가 바뀌어도 ID 유지, 갤러리 보존")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 ReID 임베더 테스트")
+    print("=" * 60)
+    test_onnx_batch_preprocess()
+    test_onnx_fixed_batch_chunks()
+    test_gallery_is_bounded()
+    test_reid_off_swapped_order()
@@ -0,0 +1,127 @@
+"""
+전역 프레임 스케줄러 테스트
+허용 FPS 분배, 우선순위, DRR 공정성 확인 (모델 없이 실행)
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from scheduler import FrameScheduler
+
+
+def test_granted_fps_allocation():
+    """예산 40 FPS에 클라이언트 20개가 30 FPS씩 요청 → 각자 2 FPS"""
+
+    async def run():
+        scheduler = FrameScheduler(budget_fps=40)
+        for i in range(20):
+            scheduler.register(f"s{i}", "live", 30)
+
+        grants = [scheduler.granted_fps(f"s{i}") for i in range(20)]
+        assert all(abs(g - 2.0) < 0.01 for g in grants), grants
+
+        # 적게 요청한 세션은 요청만큼, 남은 예산은 나머지가 나눔
+        scheduler = FrameScheduler(budget_fps=40)
+        scheduler.register("small", "live", 4)
+        scheduler.register("big1", "live", 30)
+        scheduler.register("big2", "live", 30)
+        assert scheduler.granted_fps("small") == 4.0
+        assert scheduler.granted_fps("big1") == 18.0
+        assert scheduler.granted_fps("big2") == 18.0
+
+    asyncio.run(run())
+    print("✅ 허용 FPS 분배 확인")
+
+
+def test_priority_classes():
+    """live가 예산을 먼저 쓰고 background는 남는 만큼만"""
+
+    async def run():
+        scheduler = FrameScheduler(budget_fps=40)
+        scheduler.register("offline", "background", 30)
+        assert scheduler.granted_fps("offline") == 30.0
+
+        scheduler.register("viewer1", "live", 20)
+        scheduler.register("viewer2", "live", 15)
+        assert scheduler.granted_fps("viewer1") == 20.0
+        assert scheduler.granted_fps("viewer2") == 15.0
+        assert scheduler.granted_fps("offline") == 5.0
+
+        # live 세션이 나가면 background 허용량 복구
+        scheduler.unregister("viewer1")
+        assert scheduler.granted_fps("offline") == 25.0
+
+    asyncio.run(run())
+    print("✅ 우선순위 클래스 확인")
+
+
+def test_drr_fairness():
+    """과부하 상황에서 세션별 처리량이 가중치에 비례"""
+
+    async def run():
+        scheduler = FrameScheduler(budget_fps=1000, queue_size=100, max_in_flight=1)
+        scheduler.register("a", "live", 30, weight=1.0)
+        scheduler.register("b", "live", 30, weight=2.0)
+        scheduler.register("bg", "background", 30)
+
+        order = []
+
+        def job(name):
+            async def run_job():
+                order.append(name)
+                return name
+            return run_job
+
+        futures = []
+        for _ in range(30):
+            for name in ("a", "b", "bg"):
+                futures.append(scheduler.submit(name, job(name)))
+
+        scheduler.start()
+        await asyncio.gather(*futures)
+        await scheduler.stop()
+
+        # background는 live 큐가 모두 빌 때까지 밀림
+        assert order[60:] == ["bg"] * 30, order
+
+        # b(가중치 2)는 a(가중치 1)보다 2배 자주 처리
+        first = order[:30]
+        assert first.count("b") == 2 * first.count("a"), first
+
+    asyncio.run(run())
+    print("✅ DRR 공정성 확인")
+
+
+def test_queue_overflow_drops_oldest():
+    """세션 큐가 넘치면 가장 오래된 프레임 폐기 (결과 None)"""
+
+    async def run():
+        scheduler = FrameScheduler(budget_fps=1000, queue_size=2)
+        scheduler.register("s", "live", 30)
+
+        async def job():
+            return "done"
+
+        futures = [scheduler.submit("s", job) for _ in range(4)]
+        scheduler.start()
+        results = await asyncio.gather(*futures)
+        await scheduler.stop()
+
+        assert results == [None, None, "done", "done"], results
+
+    asyncio.run(run())
+    print("✅ 큐 초과 시 오래된 프레임 폐기 확인")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 프레임 스케줄러 테스트")
+    print("=" * 60)
+    test_granted_fps_allocation()
+    test_priority_classes()
+    test_drr_fairness()
+    test_queue_overflow_drops_oldest()
@@ -0,0 +1,78 @@
+"""
+샷 유형 분류 테스트
+와이드/클로즈업/관중 샷 구분, 같은 마스크 재사용, CNN 경로 확인 (합성 프레임 사용)
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from pitch import PitchMask
+from shot_classifier import ShotClassifier, WIDE, CLOSE, OTHER
+
+GRASS = (40, 140, 50)
+STANDS = (120, 110, 130)
+
+
+def _wide_frame():
+    """잔디 위에 작은 선수 20명"""
+    frame = np.full((720, 1280, 3), GRASS, dtype=np.uint8)
+    frame[:200] = STANDS
+    rng = np.random.default_rng(0)
+    for x, y in zip(rng.integers(50, 1200, 20), rng.integers(250, 650, 20)):
+        frame[y:y + 50, x:x + 20] = (200, 30, 30)
+    return frame
+
+
+def _close_frame():
+    """잔디 배경에 화면 대부분을 가리는 선수 한 명"""
+    frame = np.full((720, 1280, 3), GRASS, dtype=np.uint8)
+    frame[80:720, 380:900] = (30, 30, 200)
+    return frame
+
+
+def test_heuristic_shot_types():
+    classifier = ShotClassifier(model_path=Path("/nonexistent.onnx"))
+    assert classifier.classify(PitchMask.from_frame(_wide_frame())) == WIDE
+    assert classifier.classify(PitchMask.from_frame(_close_frame())) == CLOSE
+    crowd = np.full((720, 1280, 3), STANDS, dtype=np.uint8)
+    assert classifier.classify(PitchMask.from_frame(crowd)) == OTHER
+    print("✅ 잔디 비율 기반 샷 분류 확인 (wide / close / other)")
+
+
+def test_cached_per_mask_and_cnn():
+    class FakeSession:
+        def __init__(self):
+            self.calls = 0
+
+        def get_inputs(self):
+            return [type("Input", (), {"name": "images"})()]
+
+        def run(self, outputs, feeds):
+            self.calls += 1
+            assert feeds["images"].shape == (1, 3, 36, 64)
+            return [np.array([[0.1, 2.0]], dtype=np.float32)]  # close
+
+    session = FakeSession()
+    classifier = ShotClassifier(session=session)
+    pitch = PitchMask.from_frame(_wide_frame())
+    thumbnail = np.zeros((36, 64, 3), dtype=np.uint8)
+
+    assert classifier.classify(pitch, thumbnail) == CLOSE, "잔디가 충분하면 CNN이 와이드/클로즈업 판단"
+    assert classifier.classify(pitch, thumbnail) == CLOSE
+    assert session.calls == 1, "같은 마스크(샷 캐시)면 다시 분류하지 않음"
+
+    crowd = PitchMask.from_frame(np.full((720, 1280, 3), STANDS, dtype=np.uint8))
+    assert classifier.classify(crowd, thumbnail) == OTHER and session.calls == 1, "잔디가 없으면 CNN 생략"
+    print("✅ 마스크 단위 캐시 + CNN 분류 확인")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 샷 유형 분류 테스트")
+    print("=" * 60)
+    test_heuristic_shot_types()
+    test_cached_per_mask_and_cnn()
@@ -0,0 +1,86 @@
+"""
+샷 경계 감지 테스트
+패닝은 컷으로 보지 않고, 하드 컷만 감지하는지 확인 (합성 프레임 사용)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+import cv2
+from shot_detector import ShotBoundaryDetector
+
+
+def _pitch_frame(offset_x: int, width: int = 1920, height: int = 1080) -> np.ndarray:
+    """잔디 위에 선수(흰/빨강 블롭)가 있는 와이드 샷, offset_x만큼 패닝"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:] = (40, 140, 50)  # 잔디 (BGR)
+    frame[: height // 5] = (90, 90, 90)  # 관중석
+    rng = np.random.default_rng(1)
+    for x, y in rng.integers(0, [width + 800, height - 200], size=(22, 2)):
+        x -= offset_x
+        color = (240, 240, 240) if x % 2 else (30, 30, 200)
+        cv2.rectangle(frame, (int(x), int(y) + 200), (int(x) + 30, int(y) + 270), color, -1)
+    return frame
+
+
+def _closeup_frame(width: int = 1920, height: int = 1080) -> np.ndarray:
+    """선수 클로즈업 (피부/유니폼 색이 화면 대부분)"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:] = (60, 60, 70)
+    cv2.rectangle(frame, (500, 100), (1400, 1080), (30, 30, 200), -1)
+    cv2.circle(frame, (950, 250), 180, (140, 170, 220), -1)
+    return frame
+
+
+def test_pan_is_not_cut():
+    """빠른 패닝은 컷이 아님"""
+    detector = ShotBoundaryDetector()
+    cuts = [detector.update(_pitch_frame(step * 25)) for step in range(30)]
+    assert not any(cuts), cuts
+    assert detector.shot_id == 0
+    print("✅ 패닝 → 컷 아님")
+
+
+def test_hard_cut_detected():
+    """와이드 → 클로즈업 → 와이드 전환을 각각 한 번씩 감지"""
+    detector = ShotBoundaryDetector()
+    frames = (
+        [_pitch_frame(i * 5) for i in range(10)]
+        + [_closeup_frame()] * 10
+        + [_pitch_frame(i * 5) for i in range(10)]
+    )
+    cuts = [i for i, frame in enumerate(frames) if detector.update(frame)]
+    assert cuts == [10, 20], cuts
+    assert detector.shot_id == 2
+    print(f"✅ 하드 컷 감지 (프레임 {cuts})")
+
+
+def test_detector_is_cheap():
+    """1080p 프레임당 1ms 안쪽"""
+    detector = ShotBoundaryDetector()
+    frames = [_pitch_frame(i * 5) for i in range(5)]
+    for frame in frames:
+        detector.update(frame)
+
+    n = 100
+    start = time.perf_counter()
+    for i in range(n):
+        detector.update(frames[i % len(frames)])
+    per_frame_ms = (time.perf_counter() - start) / n * 1000
+    print(f"프레임당 {per_frame_ms:.3f}ms")
+    assert per_frame_ms < 3.0, per_frame_ms  # CI 여유분 포함
+    print("✅ 샷 감지 비용 확인")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 샷 경계 감지 테스트")
+    print("=" * 60)
+    test_pan_is_not_cut()
+    test_hard_cut_detected()
+    test_detector_is_cheap()
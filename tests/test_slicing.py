@@ -0,0 +1,66 @@
+"""
+슬라이스 탐지 보조 함수 테스트
+타일 배치(겹침, 프레임 덮기), 교차 타일 NMS, 잔디 마스크로 타일 건너뛰기 확인
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from slicing import tile_grid, nms
+from pitch import PitchMask
+
+
+def test_tile_grid_covers_frame():
+    tiles = tile_grid(1920, 1080, 640, 0.2)
+    assert len(tiles) == 8, tiles  # 가로 4 x 세로 2
+
+    covered = np.zeros((1080, 1920), dtype=bool)
+    for x1, y1, x2, y2 in tiles:
+        assert (x2 - x1, y2 - y1) == (640, 640), "한 배치로 묶을 수 있도록 모두 같은 크기"
+        covered[y1:y2, x1:x2] = True
+    assert covered.all(), "프레임 전체를 덮어야 함"
+
+    # 인접 타일은 최소 겹침 이상 겹침 (경계의 공이 한 타일에 온전히 포함)
+    xs = sorted({t[0] for t in tiles})
+    assert all(640 - (b - a) >= 128 for a, b in zip(xs, xs[1:])), xs
+
+    # 타일보다 작은 프레임은 stride 배수로 내린 타일로 덮음
+    small = tile_grid(600, 400, 640, 0.2)
+    assert {(x2 - x1, y2 - y1) for x1, y1, x2, y2 in small} == {(576, 384)}, small
+    assert max(t[2] for t in small) == 600 and max(t[3] for t in small) == 400
+    print(f"✅ 타일 배치 확인 (1080p → {len(tiles)}개)")
+
+
+def test_cross_tile_nms():
+    # 겹치는 두 타일에서 같은 공이 잡힘 + 떨어진 다른 후보
+    xyxy = np.array([[600, 300, 612, 312], [601, 300, 613, 312], [1500, 800, 1510, 810]], dtype=np.float32)
+    conf = np.array([0.3, 0.6, 0.2], dtype=np.float32)
+    keep = nms(xyxy, conf, 0.4)
+    assert list(keep) == [1, 2], keep
+    print("✅ 교차 타일 NMS 확인")
+
+
+def test_pitch_mask_skips_stands():
+    # 위쪽 1/3은 관중석(회색), 아래는 잔디(초록)
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    frame[:360] = (120, 120, 120)
+    frame[360:] = (40, 140, 50)
+    pitch = PitchMask.from_frame(frame)
+
+    assert pitch.ratio((0, 0, 1920, 300)) == 0.0
+    assert pitch.ratio((0, 500, 640, 1080)) == 1.0
+    assert 0.4 < pitch.ratio((0, 0, 640, 640)) < 0.5
+    print("✅ 잔디 마스크 확인")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 슬라이스 탐지 테스트")
+    print("=" * 60)
+    test_tile_grid_covers_frame()
+    test_cross_tile_nms()
+    test_pitch_mask_skips_stands()
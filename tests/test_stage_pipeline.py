@@ -0,0 +1,147 @@
+"""
+스테이지 파이프라인 테스트
+순서 보장, 스테이지 겹침(처리량), 가득 찬 큐 제출 거절, letterbox 좌표 복원,
+입력 크기별 모델 변형 확인 (모델 없이 실행)
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from stages import StagePipeline, StageQueueFull
+from preprocess import letterbox, letterbox_shape
+from inference import ModelRunner
+from config import STAGE_QUEUE_SIZE, SCHEDULER_SESSION_IN_FLIGHT
+
+
+class Ctx:
+    def __init__(self, index):
+        self.index = index
+        self.trace = []
+
+
+def _sleep_stage(name, seconds):
+    def stage(ctx):
+        time.sleep(seconds)
+        ctx.trace.append(name)
+    return stage
+
+
+def test_order_and_overlap():
+    """결과는 제출 순서대로, 처리 시간은 가장 느린 스테이지에 수렴"""
+    stage_time = 0.02
+    stages = [(f"s{i}", _sleep_stage(f"s{i}", stage_time)) for i in range(4)]
+    pipeline = StagePipeline(stages, queue_size=2, name="test")
+
+    n_frames = 20
+    start = time.perf_counter()
+    futures = [pipeline.submit(Ctx(i)) for i in range(n_frames)]
+    results = [f.result(timeout=10) for f in futures]
+    elapsed = time.perf_counter() - start
+    pipeline.close()
+
+    assert [r.index for r in results] == list(range(n_frames))
+    assert all(r.trace == ["s0", "s1", "s2", "s3"] for r in results)
+
+    sequential = n_frames * 4 * stage_time
+    print(f"파이프라인: {elapsed:.2f}s / 순차 실행 예상: {sequential:.2f}s")
+    assert elapsed < sequential * 0.6, "스테이지가 겹쳐 실행되지 않음"
+    print("✅ 순서 보장 + 스테이지 겹침 확인")
+
+
+def test_stage_failure_isolated():
+    """한 프레임이 실패해도 다음 프레임은 계속 처리"""
+
+    def fail_on_odd(ctx):
+        if ctx.index % 2:
+            raise ValueError("odd frame")
+
+    pipeline = StagePipeline([("check", fail_on_odd), ("done", lambda ctx: None)])
+    futures = [pipeline.submit(Ctx(i)) for i in range(4)]
+
+    assert futures[0].result(timeout=5).index == 0
+    assert isinstance(futures[1].exception(timeout=5), ValueError)
+    assert futures[2].result(timeout=5).index == 2
+    pipeline.close()
+    print("✅ 스테이지 실패 격리 확인")
+
+
+def test_nonblocking_submit_rejects():
+    """대기하지 않는 제출은 첫 스테이지 큐가 가득 차면 바로 실패한 Future (이벤트 루프를 막지 않음)"""
+    release = threading.Event()
+    pipeline = StagePipeline([("wait", lambda ctx: release.wait(5))], queue_size=2, name="test")
+
+    first = pipeline.submit(Ctx(0), block=False)
+    time.sleep(0.05)  # 첫 프레임이 스테이지에 들어가서 큐가 빔
+    queued = [pipeline.submit(Ctx(i), block=False) for i in (1, 2)]
+    start = time.perf_counter()
+    rejected = pipeline.submit(Ctx(3), block=False)
+    assert time.perf_counter() - start < 0.05
+    assert isinstance(rejected.exception(timeout=0), StageQueueFull)
+
+    release.set()
+    assert [f.result(timeout=5).index for f in [first] + queued] == [0, 1, 2]
+    pipeline.close()
+
+    # 스케줄러가 세션당 동시에 보내는 프레임이 모두 큐에 들어가야 평소에는 거절되지 않음
+    assert SCHEDULER_SESSION_IN_FLIGHT <= STAGE_QUEUE_SIZE
+    print("✅ 가득 찬 큐 제출 거절 확인")
+
+
+def test_letterbox_roundtrip():
+    """16:9 프레임 → 640x384 입력, 박스 좌표 복원"""
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    image, info = letterbox(frame, 640)
+    assert image.shape == (384, 640, 3), image.shape
+
+    # 프레임 좌표 (960, 540) 중심 박스를 모델 좌표로 옮긴 뒤 복원
+    frame_box = np.array([[900, 480, 1020, 600]], dtype=np.float32)
+    model_box = frame_box * info.scale
+    model_box[:, 0::2] += info.pad_x
+    model_box[:, 1::2] += info.pad_y
+
+    restored = info.to_frame(model_box)
+    assert np.allclose(restored, frame_box, atol=1e-3), restored
+    print("✅ letterbox 좌표 복원 확인")
+
+
+def test_fixed_shape_variants():
+    """고정 입력 크기 모델: 담을 수 있는 가장 작은 변형으로 letterbox + 실행"""
+    calls = []
+
+    def fake(name):
+        return lambda source, **kwargs: calls.append((name, kwargs["imgsz"])) or []
+
+    runner = ModelRunner(fake("square"), {(384, 640): fake("wide"), (640, 640): fake("square")})
+    assert letterbox_shape(1920, 1080) == (384, 640)
+    assert runner.input_shape(letterbox_shape(1920, 1080)) == (384, 640)
+    assert runner.input_shape(letterbox_shape(1440, 1080)) == (640, 640), "4:3은 정사각형 변형"
+    assert ModelRunner(fake("pt")).input_shape((480, 640)) == (480, 640), "변형이 없으면 그대로"
+
+    # 4:3 프레임을 640x640에 letterbox해도 좌표 복원
+    frame = np.zeros((1080, 1440, 3), dtype=np.uint8)
+    image, info = letterbox(frame, 640, runner.input_shape(letterbox_shape(1440, 1080)))
+    assert image.shape == (640, 640, 3) and info.pad_y == 80, (image.shape, info.pad_y)
+    restored = info.to_frame(np.array([[info.pad_x, info.pad_y, 640 - info.pad_x, 640 - info.pad_y]]))
+    assert np.allclose(restored, [[0, 0, 1440, 1080]], atol=1e-3), restored
+
+    runner(image, imgsz=[384, 640])
+    runner(image, imgsz=[256, 256])
+    assert calls == [("wide", [384, 640]), ("square", [256, 256])], calls
+    print("✅ 입력 크기별 모델 변형 확인")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 스테이지 파이프라인 테스트")
+    print("=" * 60)
+    test_order_and_overlap()
+    test_stage_failure_isolated()
+    test_nonblocking_submit_rejects()
+    test_letterbox_roundtrip()
+    test_fixed_shape_variants()
@@ -0,0 +1,101 @@
+"""
+추적기 연관 결과 테스트 (두 백엔드 공통)
+트랙 ↔ 탐지 일대일 대응, 탐지 없는 트랙의 predicted 표시, DeepSORT lazy ReID 확인
+"""
+
+import sys
+from pathlib import Path
+
+# src 폴더를 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from models import PlayerDetection
+from tracker import create_tracker, PlayerTracker
+from config import TRACK_PREDICT_MAX_FRAMES, REID_REFRESH_INTERVAL
+
+# DeepSORT 임베더가 쓸 수 있도록 텍스처가 있는 프레임
+FRAME = np.random.default_rng(0).integers(0, 255, size=(720, 1280, 3), dtype=np.uint8)
+
+
+def _players(positions):
+    return [
+        PlayerDetection(
+            id=i, x=float(x), y=float(y), width=30.0, height=70.0,
+            team="home" if i % 2 == 0 else "away", color=[i, i, i], confidence=0.9,
+        )
+        for i, (x, y) in enumerate(positions)
+    ]
+
+
+def _check_backend(backend: str):
+    tracker = create_tracker(backend)
+
+    # 붙어 있는 두 선수 → 각자 다른 탐지에 연관 (같은 탐지를 두 트랙이 공유하지 않음)
+    positions = [(200, 300), (215, 300), (600, 300)]
+    for _ in range(5):
+        tracked = tracker.update(_players(positions), FRAME)
+    assert len(tracked) == 3, tracked
+    assert len({p.id for p in tracked}) == 3
+    assert sorted(p.color[0] for p in tracked) == [0, 1, 2], "탐지 하나가 두 트랙에 중복 연관됨"
+    assert not any(p.predicted for p in tracked)
+
+    # 한 선수가 사라지면 그 트랙은 예측 위치로 보고 (다른 탐지에 붙이지 않음)
+    hidden_id = next(p.id for p in tracked if p.color[0] == 2)
+    for _ in range(TRACK_PREDICT_MAX_FRAMES):
+        tracked = tracker.update(_players(positions[:2]), FRAME)
+        hidden = [p for p in tracked if p.id == hidden_id]
+        assert len(hidden) == 1 and hidden[0].predicted, tracked
+        assert abs(hidden[0].x - 600) < 5, hidden[0]
+        assert hidden[0].team == "home", "예측 트랙은 마지막 선수 정보를 유지"
+        assert sum(not p.predicted for p in tracked) == 2
+
+    # 예측 허용 프레임이 지나면 보고하지 않음
+    tracked = tracker.update(_players(positions[:2]), FRAME)
+    assert hidden_id not in {p.id for p in tracked}
+    print(f"✅ {backend}: 일대일 연관 + 예측 트랙 표시 확인")
+
+
+def test_bytetrack_association():
+    _check_backend("bytetrack")
+
+
+def test_deepsort_association():
+    _check_backend("deepsort")
+
+
+def test_lazy_reid():
+    """떨어져 있는 선수는 트랙 특징 재사용, 겹친 선수만 임베딩"""
+    tracker = PlayerTracker(lazy_reid=True)
+    calls = []
+    generate = tracker.tracker.generate_embeds
+
+    def counting(frame, dets, **kwargs):
+        calls.append(len(dets))
+        return generate(frame, dets, **kwargs)
+
+    tracker.tracker.generate_embeds = counting
+
+    # 0,1번은 붙어 있고(애매) 2,3번은 떨어져 있음
+    positions = [(200, 300), (215, 300), (600, 300), (900, 400)]
+    n_frames = REID_REFRESH_INTERVAL * 2
+    for _ in range(n_frames):
+        tracked = tracker.update(_players(positions), FRAME)
+    assert len({p.id for p in tracked}) == 4
+
+    assert len(calls) == n_frames, "프레임당 임베더 호출은 최대 한 번 (배치)"
+    assert max(calls) == 4 and min(calls) == 2, calls
+    assert tracker.reused_count > 0
+    print(
+        f"✅ Lazy ReID 확인 (임베딩 {tracker.embedded_count}개, 재사용 {tracker.reused_count}개, "
+        f"프레임별 {calls})"
+    )
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 추적기 연관 테스트")
+    print("=" * 60)
+    test_bytetrack_association()
+    test_deepsort_association()
+    test_lazy_reid()